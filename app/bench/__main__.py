@@ -0,0 +1,83 @@
+import json
+import logging
+import argparse
+from datetime import datetime
+from core.config_manager import config
+from core.cop_protocol import PROTOCOL_TEXT, PROTOCOL_BINARY
+from bench.latency import run_benchmark, DEFAULT_RATES
+
+# ---------------------
+# File: __main__.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Command line entry point of the benchmarks (run from app/).
+
+    python -m bench latency [--rates 100 500 1000] [--duration 5] [--output FILE]
+    python -m bench compare BASELINE.json CANDIDATE.json
+
+`latency` writes its results as JSON (by default
+`bench_latency_<host>_<timestamp>.json`). `compare` prints the end-to-end
+latency and throughput of two result files side by side, rate by rate, so
+releases can be compared on the same Pi.
+"""
+
+def compare(baseline_path, candidate_path):
+    """
+    Prints the end-to-end p50/p99 latency and the delivered fraction of two runs.
+
+    Args:
+        baseline_path (str): Result file of the reference release.
+        candidate_path (str): Result file of the release under test.
+    """
+    with open(baseline_path) as f:
+        baseline = {run['rate_hz']: run for run in json.load(f)['runs']}
+    with open(candidate_path) as f:
+        candidate_results = json.load(f)
+    candidate = {run['rate_hz']: run for run in candidate_results['runs']}
+
+    def metric(run, name):
+        latency = run['latency_ms']['end_to_end'] if run else None
+        return latency[name] if latency else float('nan')
+
+    print(f"{'rate':>8} | {'p50 base':>9} {'p50 new':>9} | {'p99 base':>9} {'p99 new':>9} | {'delivered':>17}")
+    for rate in sorted(set(baseline) | set(candidate)):
+        base, new = baseline.get(rate), candidate.get(rate)
+        delivered = [f"{run['delivered_fraction']:.1%}" if run else '-' for run in (base, new)]
+        print(f"{rate:>8g} | {metric(base, 'p50'):>9.2f} {metric(new, 'p50'):>9.2f} | "
+              f"{metric(base, 'p99'):>9.2f} {metric(new, 'p99'):>9.2f} | {delivered[0]:>8} {delivered[1]:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LEGARD pipeline benchmarks.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    latency = subparsers.add_parser('latency', help="Serial byte to rendered frame latency at increasing input rates")
+    latency.add_argument('--rates', type=float, nargs='+', default=list(DEFAULT_RATES), help="Input rates in Hz")
+    latency.add_argument('--duration', type=float, default=5.0, help="Seconds of input per rate")
+    latency.add_argument('--protocol', choices=[PROTOCOL_TEXT, PROTOCOL_BINARY], default=PROTOCOL_TEXT)
+    latency.add_argument('--no-render', action='store_true', help="Drain the plot channel without drawing frames")
+    latency.add_argument('--keep-sessions', action='store_true', help="Keep the session files the runs write")
+    latency.add_argument('--output', help="Result file (default: bench_latency_<host>_<timestamp>.json)")
+
+    comparison = subparsers.add_parser('compare', help="Compare two latency result files")
+    comparison.add_argument('baseline')
+    comparison.add_argument('candidate')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=config.get('Logging', 'level', fallback='INFO').upper(),
+                        format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+
+    if args.command == 'compare':
+        compare(args.baseline, args.candidate)
+    else:
+        results = run_benchmark(args.rates, duration=args.duration, protocol=args.protocol, render=not args.no_render,
+                                keep_sessions=args.keep_sessions)
+        output = args.output or f"bench_latency_{results['host']['node']}_{datetime.now():%Y%m%d_%H%M%S}.json"
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Throughput ceiling: {results['ceiling_hz']:g} Hz")
+        print(output)
@@ -0,0 +1,436 @@
+import os
+import sys
+import time
+import queue
+import shutil
+import logging
+import platform
+import tempfile
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+from core.config_manager import config
+from core.channels import channel_from_config
+from core.cop_protocol import parse_cop, PROTOCOL_TEXT
+from core.data_inputs import SerialThread, SensorThread
+from core.processing import DataProcessor
+from sim.motion import SimClock, LegRaiseMotion
+from sim.sensor import FakeBNO055
+from sim.serial_device import VirtualSerialDevice
+
+# ---------------------
+# File: latency.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the end-to-end latency benchmark of the acquisition pipeline.
+
+Every synthetic sample carries its index in its CoP coordinates, so it can be
+followed through each stage of the real code path:
+
+    emit        the virtual board writes it to the pty (sim.serial_device)
+    acquired    SerialThread's acquisition timestamp (its own estimate)
+    dequeued    DataProcessor takes it from the serial channel
+    plotted     DataProcessor puts the processed packet on the plot channel
+    frame       RoutineWindow.animate_plot takes it from the plot channel
+    drawn       the frame containing it has been drawn
+
+The channels are wrapped to record the get/put times; the production code
+runs unchanged. The render stage runs RoutineWindow.animate_plot with the
+matplotlib live renderer (ui.live_plot) blitting into an off-screen Agg
+buffer; Tk cannot run on the frame thread, so the canvas renderer is not
+measured. Without matplotlib/Tk the plot channel is drained every frame
+instead and the render stage is reported as unavailable.
+
+For each input rate, `run_rate` reports per-stage latency percentiles, the
+number of samples that reached every stage, and the channel drop counters.
+`run_benchmark` sweeps increasing rates and records the throughput ceiling:
+the highest rate at which at least `SUSTAINED_FRACTION` of the samples were
+rendered.
+"""
+
+FRAME_INTERVAL = 0.016 # The RoutineWindow animation interval
+SUSTAINED_FRACTION = 0.99
+DEFAULT_RATES = (100, 250, 500, 1000, 2000, 4000)
+STAGES = (
+    ('serial', 'emit', 'acquired'),
+    ('data_queue', 'acquired', 'dequeued'),
+    ('processing', 'dequeued', 'plotted'),
+    ('plot_queue', 'plotted', 'frame'),
+    ('render', 'frame', 'drawn'),
+    ('end_to_end', 'emit', 'drawn'),
+)
+TAG_SCALE = 10000 # Four decimals, as printed by the text protocol
+TAG_MODULO = 100000
+
+
+def encode_tag(index):
+    """
+    Encodes a sample index as CoP coordinates in [0, 10).
+
+    Args:
+        index (int): The sample index.
+
+    Returns:
+        tuple: (x, y) exactly representable with four decimals.
+    """
+    return (index % TAG_MODULO) / TAG_SCALE, (index // TAG_MODULO % TAG_MODULO) / TAG_SCALE
+
+
+def decode_tag(x, y):
+    """
+    Recovers the sample index from tagged CoP coordinates.
+
+    Args:
+        x (float): CoP x coordinate.
+        y (float): CoP y coordinate.
+
+    Returns:
+        int: The sample index.
+    """
+    return int(round(y * TAG_SCALE)) * TAG_MODULO + int(round(x * TAG_SCALE))
+
+
+class TaggedMotion:
+    """Scripted leg raises whose CoP coordinates carry the sample index."""
+    def __init__(self, rate, duration):
+        """
+        Args:
+            rate (float): Samples per second; sample i is due at i / rate.
+            duration (float): Seconds after which the board stops sending.
+        """
+        self.sample_rate = rate
+        self.duration = duration
+        self._legs = LegRaiseMotion()
+        self.max_angle = self._legs.max_angle
+
+    def sample(self, t):
+        """
+        Args:
+            t (float): Simulation time in seconds.
+
+        Returns:
+            tuple: (angle, x, y), with (x, y) encoding round(t * rate).
+        """
+        return (self._legs.angle(t),) + encode_tag(round(t * self.sample_rate))
+
+
+class StageRecorder:
+    """
+    Wraps a channel and records when items are put on it and taken from it,
+    forwarding everything else to the wrapped channel.
+    """
+    def __init__(self, channel):
+        """
+        Args:
+            channel (RingChannel or queue.Queue): The wrapped channel.
+        """
+        self._channel = channel
+        self.puts = []
+        self.gets = []
+
+    def put(self, item, *args, **kwargs):
+        self._channel.put(item, *args, **kwargs)
+        self.puts.append((time.monotonic(), item))
+
+    def put_nowait(self, item):
+        self._channel.put_nowait(item)
+        self.puts.append((time.monotonic(), item))
+
+    def get(self, *args, **kwargs):
+        item = self._channel.get(*args, **kwargs)
+        self.gets.append((time.monotonic(), item))
+        return item
+
+    def get_nowait(self):
+        item = self._channel.get_nowait()
+        self.gets.append((time.monotonic(), item))
+        return item
+
+    def __getattr__(self, name):
+        return getattr(self._channel, name)
+
+
+class _Counter:
+    """Stand-in for the window's tk.StringVar."""
+    def __init__(self):
+        self.value = "0"
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessView:
+    """
+    The state RoutineWindow.animate_plot works on, with the matplotlib live
+    renderer drawing off-screen with Agg.
+    """
+    def __init__(self, plot_queue, target_angle_threshold):
+        """
+        Args:
+            plot_queue (StageRecorder): The recorded plot channel.
+            target_angle_threshold (float, optional): Draws the target line like the window.
+
+        Raises:
+            ImportError: If matplotlib or the routine window cannot be imported.
+        """
+        from ui.live_plot import MatplotlibLivePlot
+        from ui.windows.routine_window import RoutineWindow
+
+        self._animate = RoutineWindow.animate_plot
+        self.plot_queue = plot_queue
+        self.is_streaming = True
+        self.rep_count_var = _Counter()
+        self.PLOT_HISTORY_LENGTH = config.getint('Plotting', 'plot_history_length', fallback=100)
+        self.TIME_WINDOW_SECONDS = config.getint('Plotting', 'time_window_seconds', fallback=5)
+        self.x_cop_history = deque(maxlen=self.PLOT_HISTORY_LENGTH)
+        self.y_cop_history = deque(maxlen=self.PLOT_HISTORY_LENGTH)
+        self.time_history = deque()
+        self.angle_history = deque()
+        self.max_samples_per_frame = plot_queue.stats()['capacity'] if config.getboolean('Plotting', 'adaptive_frames', fallback=True) else 20
+        self.live_plot = MatplotlibLivePlot(
+            None,
+            (config.getfloat('Plotting', 'cop_x_limit', fallback=1.0), config.getfloat('Plotting', 'cop_y_limit', fallback=1.0)),
+            (config.getfloat('Plotting', 'angle_y_min', fallback=-1.0), config.getfloat('Plotting', 'angle_y_max', fallback=25.0)),
+            self.TIME_WINDOW_SECONDS, target_angle_threshold,
+            decimate=config.getboolean('Plotting', 'adaptive_frames', fallback=True))
+
+    def handle_queue_command(self, command):
+        """SET_START/SET_END only reset the display; the benchmark ignores them."""
+
+    def frame(self, number):
+        """Runs one animation frame; the renderer blits it into the Agg buffer."""
+        self._animate(self, number)
+
+
+class DrainView:
+    """Fallback frame loop that drains the plot channel without drawing."""
+    def __init__(self, plot_queue):
+        self.plot_queue = plot_queue
+
+    def frame(self, number):
+        while True:
+            try:
+                self.plot_queue.get_nowait()
+            except queue.Empty:
+                break
+
+
+def _percentiles(values):
+    """Summarizes latencies in seconds as milliseconds."""
+    if len(values) == 0:
+        return None
+    ms = np.asarray(values) * 1e3
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return {
+        'p50': round(float(p50), 3), 'p90': round(float(p90), 3), 'p99': round(float(p99), 3),
+        'max': round(float(ms.max()), 3), 'mean': round(float(ms.mean()), 3), 'count': int(len(ms)),
+    }
+
+
+def _tagged(payload):
+    """Returns the index of a serial payload or plot packet, or None for other items."""
+    if isinstance(payload, tuple) and len(payload) == 7:
+        return decode_tag(payload[3], payload[4])
+    cop = parse_cop(payload)
+    return decode_tag(*cop) if cop else None
+
+
+def run_rate(rate, duration=5.0, warmup=0.5, protocol=PROTOCOL_TEXT, render=True):
+    """
+    Pushes tagged samples through the pipeline at one input rate.
+
+    Args:
+        rate (float): Input samples per second.
+        duration (float): Seconds of input.
+        warmup (float): Seconds at the start excluded from the latency statistics.
+        protocol (str): The serial protocol of the virtual board.
+        render (bool): Draw frames off-screen when matplotlib is available.
+
+    Returns:
+        dict: The per-stage latencies (ms), stage counts, losses and channel statistics.
+    """
+    stamps = {name: {} for name in ('emit', 'acquired', 'dequeued', 'plotted', 'frame', 'drawn')}
+    emit = stamps['emit']
+
+    def on_write(first, count, write_time):
+        for index in range(first, first + count):
+            emit[index] = write_time
+
+    clock = SimClock(1.0)
+    motion = TaggedMotion(rate, duration)
+    device = VirtualSerialDevice(motion, clock, protocol=protocol, rate=rate, write_interval=0.002, on_write=on_write)
+    data_queue = StageRecorder(channel_from_config(config, 'serial', 256))
+    plot_queue = StageRecorder(channel_from_config(config, 'plot', 512, protect=lambda item: isinstance(item, str)))
+
+    sensor_thread = SensorThread(FakeBNO055(motion, clock, noise=0.0), rate=config.getfloat('Sensor', 'rate', fallback=100.0))
+    serial_thread = SerialThread(device.port, 115200, data_queue, protocol,
+                                 read_mode=config.get('Serial', 'read_mode', fallback='chunk'),
+                                 read_interval=config.getfloat('Serial', 'read_interval', fallback=0.01))
+    processor = DataProcessor(sensor_thread, data_queue, plot_queue, 'bench', None, motion.max_angle)
+    processor.discard_data()
+
+    view = None
+    render_note = "disabled"
+    if render:
+        try:
+            view = HeadlessView(plot_queue, processor.target_angle_threshold)
+            render_note = "agg blit"
+        except ImportError as e:
+            render_note = f"unavailable ({e})"
+    if view is None:
+        view = DrainView(plot_queue)
+
+    frames = []
+    stop_frames = threading.Event()
+
+    def frame_loop():
+        number = 0
+        deadline = time.monotonic()
+        while not stop_frames.is_set():
+            first_get = len(plot_queue.gets)
+            view.frame(number)
+            frames.append((first_get, len(plot_queue.gets), time.monotonic()))
+            number += 1
+            deadline += FRAME_INTERVAL
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+    sensor_thread.start()
+    serial_thread.start()
+    processor.start()
+    time.sleep(0.2) # Let the port open and the sensor history fill
+    processor.start_set()
+    renderer = threading.Thread(target=frame_loop, name="BenchFrames", daemon=True)
+    renderer.start()
+    clock.reset()
+    started = time.monotonic()
+    device.start()
+
+    time.sleep(duration + 0.5) # Input, then time to drain the pipeline
+    stop_frames.set()
+    renderer.join()
+    processor.stop(); processor.join()
+    serial_thread.stop(); serial_thread.join(timeout=2)
+    sensor_thread.stop(); sensor_thread.join()
+    device_stats = device.stats()
+    device.stop()
+
+    # Serial rates over the streaming window only; the port receives nothing
+    # before the board starts, and the drain time above is not input time
+    streamed = max(device_stats['elapsed_s'], 1e-9)
+    serial_stats = serial_thread.stats()
+    serial_stats['bytes_per_sec'] = round(serial_stats['bytes_read'] / streamed, 1)
+    serial_stats['samples_per_sec'] = round(serial_stats['samples_read'] / streamed, 1)
+    del serial_stats['time']
+
+    # Attribute the recorded times to sample indices
+    for got_at, item in data_queue.gets:
+        for acquired, payload in (item if isinstance(item, list) else [item]):
+            index = _tagged(payload)
+            if index is not None:
+                stamps['acquired'].setdefault(index, acquired)
+                stamps['dequeued'].setdefault(index, got_at)
+    for put_at, item in plot_queue.puts:
+        if not isinstance(item, str):
+            stamps['plotted'].setdefault(_tagged(item), put_at)
+    for first_get, last_get, drawn_at in frames:
+        for got_at, item in plot_queue.gets[first_get:last_get]:
+            if not isinstance(item, str):
+                index = _tagged(item)
+                stamps['frame'].setdefault(index, got_at)
+                stamps['drawn'].setdefault(index, drawn_at)
+
+    measured = [index for index, t in emit.items() if t >= started + warmup]
+    latency = {}
+    for stage, start, end in STAGES:
+        latency[stage] = _percentiles([stamps[end][i] - stamps[start][i] for i in measured
+                                       if i in stamps[start] and i in stamps[end]])
+
+    # Counted after the warm-up too, which also skips the detector's filter warm-up
+    emitted = len(measured)
+    counts = {name: sum(1 for i in measured if i in stamps[name]) for name in ('emit', 'acquired', 'plotted', 'drawn')}
+    return {
+        'rate_hz': rate,
+        'duration_s': duration,
+        'protocol': protocol,
+        'render': render_note,
+        'counts': counts,
+        'lost': {
+            'before_processing': emitted - counts['acquired'],
+            'before_plotting': counts['acquired'] - counts['plotted'],
+            'before_drawing': counts['plotted'] - counts['drawn'],
+        },
+        'delivered_fraction': round(counts['drawn'] / emitted, 4) if emitted else 0.0,
+        'throughput_hz': round(counts['drawn'] / (duration - warmup), 1),
+        'frames': len(frames),
+        'latency_ms': latency,
+        'channels': {'serial': data_queue.stats(), 'plot': plot_queue.stats()},
+        'virtual_board': device_stats,
+        'serial_thread': serial_stats,
+    }
+
+
+def run_benchmark(rates=DEFAULT_RATES, duration=5.0, protocol=PROTOCOL_TEXT, render=True, keep_sessions=False):
+    """
+    Runs `run_rate` for increasing input rates.
+
+    Args:
+        rates (iterable of float): Input rates in Hz.
+        duration (float): Seconds of input per rate.
+        protocol (str): The serial protocol of the virtual board.
+        render (bool): Draw frames off-screen when matplotlib is available.
+        keep_sessions (bool): Keep the directory with the session files the runs
+                              wrote instead of deleting it.
+
+    Returns:
+        dict: Machine metadata, one result per rate, and the throughput ceiling (Hz).
+    """
+    # Session files go to a throwaway directory, removed at the end unless kept
+    sessions_dir = tempfile.mkdtemp(prefix='legard_bench_')
+    previous_dir = config.get('Paths', 'sessions_base_dir', fallback=None)
+    config.set('Paths', 'sessions_base_dir', sessions_dir)
+
+    runs = []
+    try:
+        for rate in sorted(rates):
+            logging.info(f"Benchmarking {rate:g} Hz for {duration:g} s...")
+            result = run_rate(rate, duration=duration, protocol=protocol, render=render)
+            runs.append(result)
+            end_to_end = result['latency_ms']['end_to_end'] or {}
+            logging.info(f"{rate:g} Hz: delivered {result['delivered_fraction']:.1%}, "
+                         f"end-to-end p50 {end_to_end.get('p50')} ms, p99 {end_to_end.get('p99')} ms")
+    finally:
+        if previous_dir is not None:
+            config.set('Paths', 'sessions_base_dir', previous_dir)
+        if keep_sessions:
+            logging.info(f"Benchmark session files kept in {sessions_dir}")
+        else:
+            shutil.rmtree(sessions_dir, ignore_errors=True)
+
+    sustained = [run['rate_hz'] for run in runs if run['delivered_fraction'] >= SUSTAINED_FRACTION]
+    return {
+        'benchmark': 'latency',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'host': {
+            'node': platform.node(),
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'python': sys.version.split()[0],
+            'cpus': os.cpu_count(),
+        },
+        'config': {
+            'serial_read_mode': config.get('Serial', 'read_mode', fallback='chunk'),
+            'serial_capacity': config.getint('Channels', 'serial_capacity', fallback=256),
+            'plot_capacity': config.getint('Channels', 'plot_capacity', fallback=512),
+            'sensor_rate': config.getfloat('Sensor', 'rate', fallback=100.0),
+        },
+        'ceiling_hz': max(sustained) if sustained else 0,
+        'runs': runs,
+    }
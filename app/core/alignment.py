@@ -0,0 +1,239 @@
+import threading
+from collections import deque
+
+# ---------------------
+# File: alignment.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the helpers used to align the CoP and angle streams in time.
+
+Every sample is stamped with the host's `time.monotonic()` clock when it is
+acquired, not when it is processed:
+
+    * SensorThread keeps recent quaternions in a `TimestampedRing`, so the
+      angle can be interpolated at any recent instant.
+    * Binary CoP frames carry the board's microsecond counter, which
+      `ClockSync` maps onto the host clock.
+    * Text lines have no device time, so the lines of one serial chunk are
+      spread evenly over the interval in which they arrived (`spread_timestamps`).
+
+DataProcessor then pairs each CoP sample with the angle interpolated at the
+CoP timestamp, so queue latency no longer skews pairing, velocity or rep timing.
+"""
+
+class TimestampedRing:
+    """
+    A small thread-safe ring of (timestamp, value) pairs with linear interpolation.
+
+    Values are tuples of floats (e.g. quaternions) and timestamps must be
+    appended in increasing order.
+    """
+    def __init__(self, capacity=64):
+        """
+        Initializes an empty ring.
+
+        Args:
+            capacity (int): Number of most recent samples kept.
+        """
+        self._samples = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, timestamp, value):
+        """
+        Stores a new sample.
+
+        Args:
+            timestamp (float): Acquisition time on the monotonic clock.
+            value (tuple): The sample's components.
+        """
+        with self._lock:
+            self._samples.append((timestamp, value))
+
+    def latest(self):
+        """
+        Returns:
+            tuple or None: The newest (timestamp, value) pair, or None if empty.
+        """
+        with self._lock:
+            return self._samples[-1] if self._samples else None
+
+    def snapshot(self):
+        """
+        Returns:
+            list: A copy of the stored (timestamp, value) pairs, oldest first.
+        """
+        with self._lock:
+            return list(self._samples)
+
+    def interpolate(self, timestamp):
+        """
+        Estimates the value at a given instant.
+
+        Queries normally concern the last few samples, so the ring is scanned
+        from the newest sample backwards.
+
+        Args:
+            timestamp (float): The instant on the monotonic clock.
+
+        Returns:
+            tuple or None: The linearly interpolated value, the nearest sample's
+                           value if `timestamp` is outside the stored range, or
+                           None if the ring is empty.
+        """
+        with self._lock:
+            samples = self._samples
+            if not samples:
+                return None
+            newer_t, newer_v = samples[-1]
+            if timestamp >= newer_t:
+                return newer_v
+            for i in range(len(samples) - 2, -1, -1):
+                older_t, older_v = samples[i]
+                if older_t <= timestamp:
+                    span = newer_t - older_t
+                    if span <= 0:
+                        return newer_v
+                    w = (timestamp - older_t) / span
+                    return tuple(a + (b - a) * w for a, b in zip(older_v, newer_v))
+                newer_t, newer_v = older_t, older_v
+            return newer_v
+
+    def clear(self):
+        """Removes every stored sample."""
+        with self._lock:
+            self._samples.clear()
+
+
+class ClockSync:
+    """
+    Maps a device's wrapping microsecond counter onto the host's monotonic clock.
+
+    Each observation pairs a device timestamp with the host time at which it was
+    received. Transport delay only ever makes the host time later, so the
+    smallest (host - device) difference over a sliding window is the best
+    estimate of the clock offset, and the window lets it follow slow drift.
+    """
+    def __init__(self, counter_bits=32, window=256):
+        """
+        Initializes the mapping.
+
+        Args:
+            counter_bits (int): Width of the device counter before it wraps.
+            window (int): Number of recent observations used for the offset.
+        """
+        self._modulo = 1 << counter_bits
+        self._offsets = deque(maxlen=window)
+        self._offset = None
+        self._last_raw = None
+        self._epoch = 0 # Accumulated counter wraps, in microseconds
+
+    def unwrap(self, device_us):
+        """
+        Converts a raw counter value into seconds on a continuous device timeline.
+
+        Must be called with timestamps in stream order.
+
+        Args:
+            device_us (int): The raw device counter value.
+
+        Returns:
+            float: Device time in seconds.
+        """
+        if self._last_raw is not None and device_us < self._last_raw - self._modulo // 2:
+            self._epoch += self._modulo
+        self._last_raw = device_us
+        return (self._epoch + device_us) / 1e6
+
+    def observe(self, device_s, host_time):
+        """
+        Records that the sample stamped `device_s` had arrived by `host_time`.
+
+        Args:
+            device_s (float): Unwrapped device time in seconds.
+            host_time (float): Host monotonic time at which it was read.
+        """
+        self._offsets.append(host_time - device_s)
+        self._offset = min(self._offsets)
+
+    def to_host(self, device_s):
+        """
+        Args:
+            device_s (float): Unwrapped device time in seconds.
+
+        Returns:
+            float or None: The corresponding host monotonic time, or None before
+                           the first observation.
+        """
+        if self._offset is None:
+            return None
+        return device_s + self._offset
+
+    def reset(self):
+        """Forgets the offset and wrap state (e.g. after the device restarted)."""
+        self._offsets.clear()
+        self._offset = None
+        self._last_raw = None
+        self._epoch = 0
+
+
+class ChunkTimestamper:
+    """
+    Pairs the samples of each serial chunk with their acquisition times.
+
+    Binary frames use their device timestamps mapped onto the host clock; the
+    newest frame of a chunk arrived just before the read that returned it,
+    which makes it the observation for the clock mapping. Text lines are
+    spread evenly between the previous read and this one.
+    """
+    def __init__(self):
+        """Initializes the clock mapping."""
+        self.clock = ClockSync()
+        self._last_frame_time = 0.0
+
+    def stamp(self, samples, previous_read, read_time, binary):
+        """
+        Args:
+            samples (list): The decoded samples of one chunk.
+            previous_read (float): Monotonic time of the previous read.
+            read_time (float): Monotonic time of the read that returned the chunk.
+            binary (bool): True for binary frames (objects with a `timestamp_us`).
+
+        Returns:
+            list: (acquisition_time, sample) tuples.
+        """
+        if not binary:
+            return list(zip(spread_timestamps(len(samples), previous_read, read_time), samples))
+
+        unwrap = self.clock.unwrap
+        device_times = [unwrap(frame.timestamp_us) for frame in samples]
+        self.clock.observe(device_times[-1], read_time)
+        stamped = []
+        last_time = self._last_frame_time
+        for device_time, frame in zip(device_times, samples):
+            # A refined clock offset must never move time backwards
+            last_time = max(self.clock.to_host(device_time), last_time)
+            stamped.append((last_time, frame))
+        self._last_frame_time = last_time
+        return stamped
+
+
+def spread_timestamps(count, start, end):
+    """
+    Spreads `count` samples that arrived between two reads evenly over that interval.
+
+    Args:
+        count (int): Number of samples.
+        start (float): Time of the previous read.
+        end (float): Time of the read that returned the samples.
+
+    Returns:
+        list: The timestamps, the last one equal to `end`.
+    """
+    if count <= 0:
+        return []
+    step = max(end - start, 0.0) / count
+    return [end - step * (count - 1 - i) for i in range(count)]
@@ -0,0 +1,558 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Generic, List, Optional, Tuple, TypeVar
+import serial
+from core.config_manager import config
+from core.cop_protocol import (FrameDecoder, LineDecoder, detect_protocol, PROTOCOL_AUTO,
+                               PROTOCOL_TEXT, PROTOCOL_BINARY)
+from core.alignment import TimestampedRing, ChunkTimestamper
+from core.scheduler import DeadlineScheduler
+from core.data_inputs import (SERIAL_SAMPLES, SERIAL_BYTES, SERIAL_CONNECTION_FAILURES, SERIAL_DISCONNECTS,
+                              SENSOR_READS, SENSOR_READ_ERRORS, SENSOR_READ_TIME, count_connection)
+
+# ---------------------
+# File: async_core.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing an asyncio acquisition core, an alternative to the
+SerialThread / SensorThread / DataProcessor thread trio.
+
+Every component runs as a task on one event loop hosted by a background
+thread (`AsyncCore`); the Tk thread only talks to it through thread-safe calls:
+
+    AsyncSerialSource   non-blocking serial reads, woken by the OS when bytes
+                        arrive (`loop.add_reader`) instead of timeout=1 polling
+    AsyncSensorPoller   I2C reads scheduled at a fixed period and run in a
+                        one-thread executor, so a slow read never stalls the loop
+    AsyncProcessor      feeds the DataProcessor's smoothing, rep detection and
+                        logging from an `AsyncChannel`
+
+Shutdown is ordered: the sources stop first (closing the port), the processor
+then drains its channel and closes the session files, and the loop exits last.
+Further devices are added as sources with `AsyncCore.add_source`; any object
+with an async `run()` and a `stop()` method qualifies.
+
+`AsyncPipeline` wires the standard devices together and exposes the DataProcessor
+methods used by the RoutineWindow (`[Pipeline] mode = asyncio`).
+"""
+
+T = TypeVar('T')
+
+# A serial sample and its acquisition time on the monotonic clock
+StampedSample = Tuple[float, object]
+
+
+class AsyncChannel(Generic[T]):
+    """
+    A bounded channel between tasks of one event loop.
+
+    Producers never wait: when the channel is full, the oldest item is dropped.
+    Consumers take everything queued in one `get_batch` call, so a burst costs
+    a single wakeup.
+    """
+    def __init__(self, capacity: int, name: str = "channel"):
+        """
+        Args:
+            capacity (int): Maximum number of queued items.
+            name (str): Name used in statistics.
+        """
+        self.capacity = max(1, capacity)
+        self.name = name
+        self._items: deque = deque()
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        # Statistics
+        self.puts = 0
+        self.gets = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    def put_nowait(self, item: T):
+        """
+        Queues an item, dropping the oldest one if the channel is full.
+
+        Args:
+            item: The item to queue.
+        """
+        if len(self._items) >= self.capacity:
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(item)
+        self.puts += 1
+        self.high_water = max(self.high_water, len(self._items))
+        self._ready.set()
+
+    async def get_batch(self, max_items: int = 256) -> List[T]:
+        """
+        Waits for at least one item and returns up to `max_items` of them.
+
+        Args:
+            max_items (int): The maximum number of items to return.
+
+        Returns:
+            list: The items, oldest first; empty once the channel is closed and drained.
+        """
+        while not self._items:
+            if self.closed:
+                return []
+            self._ready.clear()
+            await self._ready.wait()
+        count = min(max_items, len(self._items))
+        self.gets += count
+        return [self._items.popleft() for _ in range(count)]
+
+    def close(self):
+        """Marks the end of the stream; consumers drain what is left and then get []."""
+        self.closed = True
+        self._ready.set()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Counters describing the channel's load and losses.
+        """
+        return {
+            'name': self.name,
+            'capacity': self.capacity,
+            'size': len(self._items),
+            'high_water': self.high_water,
+            'puts': self.puts,
+            'gets': self.gets,
+            'dropped': self.dropped,
+        }
+
+
+class AsyncSerialSource:
+    """
+    Reads CoP samples from a serial port without blocking the event loop and
+    queues each chunk's samples as one list of (acquisition_time, payload) tuples.
+    """
+    DETECT_LIMIT = 1024 # Bytes inspected by auto-detection before falling back to text
+
+    def __init__(self, port, baudrate, channel: AsyncChannel, protocol=PROTOCOL_AUTO, read_interval=0.01):
+        """
+        Args:
+            port (str): The serial port path.
+            baudrate (int): The baud rate for the serial connection.
+            channel (AsyncChannel): Destination of the sample batches.
+            protocol (str): 'text', 'binary', or 'auto'.
+            read_interval (float): Minimum seconds between reads, so each wakeup
+                                   handles a batch of samples.
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.channel = channel
+        self.protocol = protocol
+        self.read_interval = max(0.0, read_interval)
+        self.decoder = None
+        self.timestamper = ChunkTimestamper()
+        self.connection = None
+        self.running = False
+        self._readable = None
+        self.bytes_read = 0
+        self.samples_read = 0
+        self.wakeups = 0
+
+    async def run(self):
+        """Opens the port and reads until `stop()` is called."""
+        loop = asyncio.get_running_loop()
+        try:
+            self.connection = serial.Serial(self.port, self.baudrate, timeout=0)
+        except serial.SerialException as e:
+            SERIAL_CONNECTION_FAILURES.inc()
+            logging.error(f"Failed to connect to {self.port}.\n{e}")
+            return
+        count_connection()
+        logging.info(f"Serial connected to {self.port} (asyncio).")
+        self.running = True
+
+        readable = self._readable = asyncio.Event()
+        try:
+            fd = self.connection.fileno()
+            loop.add_reader(fd, readable.set)
+        except (AttributeError, NotImplementedError, OSError):
+            fd = None # No selectable handle (e.g. Windows): poll at the read interval
+
+        try:
+            probe = b''
+            previous_read = time.monotonic()
+            while self.running:
+                if fd is not None:
+                    await readable.wait()
+                    readable.clear()
+                else:
+                    await asyncio.sleep(self.read_interval)
+                data = self.connection.read(self.connection.in_waiting)
+                read_time = time.monotonic()
+                self.wakeups += 1
+                if not self.running:
+                    break
+                if not data:
+                    continue
+                self.bytes_read += len(data)
+                SERIAL_BYTES.inc(len(data))
+
+                if self.decoder is None:
+                    probe += data
+                    data = b''
+                    if self.protocol == PROTOCOL_AUTO:
+                        detected = detect_protocol(probe)
+                        if not detected and len(probe) < self.DETECT_LIMIT:
+                            continue
+                        self.protocol = detected or PROTOCOL_TEXT
+                        logging.info(f"Serial protocol detected: {self.protocol}.")
+                    self.decoder = FrameDecoder() if self.protocol == PROTOCOL_BINARY else LineDecoder()
+                    data, probe = probe, b''
+
+                samples = self.decoder.feed(data)
+                if samples:
+                    self.channel.put_nowait(self.timestamper.stamp(
+                        samples, previous_read, read_time, self.protocol == PROTOCOL_BINARY))
+                    self.samples_read += len(samples)
+                    SERIAL_SAMPLES.inc(len(samples))
+                previous_read = read_time
+
+                # Let a few samples accumulate so each wakeup handles a batch
+                await asyncio.sleep(self.read_interval)
+        except (serial.SerialException, OSError) as e:
+            SERIAL_DISCONNECTS.inc()
+            logging.error(f"Serial read failed on {self.port}: {e}")
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+            self.connection.close()
+            logging.info(f"Serial statistics: bytes_read={self.bytes_read}, "
+                         f"samples_read={self.samples_read}, wakeups={self.wakeups}")
+
+    def stop(self):
+        """Stops reading (call on the loop thread); the port is closed when `run()` returns."""
+        self.running = False
+        if self._readable:
+            self._readable.set() # Wake the reader even if no bytes arrive
+
+
+class AsyncSensorPoller:
+    """
+    Polls an I2C sensor's quaternion at a fixed rate and keeps timestamped
+    readings, with the same accessors as SensorThread.
+    """
+    def __init__(self, sensor_object, rate=100.0, history_size=64):
+        """
+        Args:
+            sensor_object (Adafruit_BNO055 or similar): An object with a '.quaternion' property,
+                or a core.bno055.BNO055Burst read with `read()`.
+            rate (float): Polling rate in Hz.
+            history_size (int): Number of timestamped readings kept for interpolation.
+        """
+        self.sensor = sensor_object
+        self.scheduler = DeadlineScheduler(rate)
+        self.history = TimestampedRing(history_size)
+        self._latest_quaternion = (1.0, 0.0, 0.0, 0.0)
+        self._latest_reading = None
+        self._burst = hasattr(sensor_object, 'read')
+        # One worker keeps the I2C reads serialized and off the event loop
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="i2c")
+        self.running = False
+        self.reads = 0
+        self.read_errors = 0
+
+    def _read(self):
+        """Reads the sensor (runs in the executor) and returns (acquired, quaternion, reading)."""
+        read_start = time.monotonic()
+        if self._burst:
+            reading = self.sensor.read()
+            q = reading.quaternion
+        else:
+            reading = None
+            q = self.sensor.quaternion
+        read_end = time.monotonic()
+        SENSOR_READ_TIME.observe(read_end - read_start)
+        return (read_start + read_end) / 2, q, reading
+
+    async def run(self):
+        """Polls the sensor until `stop()` is called."""
+        loop = asyncio.get_running_loop()
+        self.running = True
+        scheduler = self.scheduler
+        scheduler.start(loop.time())
+        try:
+            while self.running:
+                try:
+                    acquired, q, reading = await loop.run_in_executor(self._executor, self._read)
+                    self.reads += 1
+                    SENSOR_READS.inc()
+                    if reading is not None:
+                        self._latest_reading = reading
+                    if q is not None:
+                        self._latest_quaternion = q
+                        if None not in q:
+                            self.history.append(acquired, q)
+                except Exception:
+                    self.read_errors += 1
+                    SENSOR_READ_ERRORS.inc()
+                # Absolute deadlines, so read time does not stretch the period
+                await asyncio.sleep(scheduler.next_delay(loop.time()))
+                scheduler.woke(loop.time())
+        finally:
+            self._executor.shutdown(wait=True)
+            logging.info(f"Sensor statistics: {self.stats()}")
+
+    def stats(self):
+        """
+        Returns:
+            dict: Scheduler statistics plus the number of reads and failed reads
+                  and, with a burst driver, its bus usage under 'bus'.
+        """
+        stats = self.scheduler.stats()
+        stats.update(reads=self.reads, read_errors=self.read_errors)
+        if hasattr(self.sensor, 'stats'):
+            stats['bus'] = self.sensor.stats()
+        return stats
+
+    def get_quaternion(self):
+        """
+        Returns:
+            tuple: The latest quaternion reading (w, x, y, z).
+        """
+        return self._latest_quaternion
+
+    def get_quaternion_at(self, timestamp):
+        """
+        Estimates the quaternion at a past instant by interpolating the stored readings.
+
+        Args:
+            timestamp (float): The instant on the monotonic clock.
+
+        Returns:
+            tuple: The interpolated (w, x, y, z), or the latest reading if no
+                   history is available yet.
+        """
+        q = self.history.interpolate(timestamp)
+        return q if q is not None else self._latest_quaternion
+
+    def get_reading(self):
+        """
+        Returns:
+            BNO055Reading: The latest burst reading, or None (see SensorThread.get_reading).
+        """
+        return self._latest_reading
+
+    def stop(self):
+        """Stops polling after the current read."""
+        self.running = False
+
+
+class AsyncProcessor:
+    """Feeds a DataProcessor (used without its thread) from an AsyncChannel."""
+    def __init__(self, processor, channel: AsyncChannel):
+        """
+        Args:
+            processor (DataProcessor): The processor; its thread is never started.
+            channel (AsyncChannel): Source of serial sample batches.
+        """
+        self.processor = processor
+        self.channel = channel
+
+    async def run(self):
+        """Processes batches until the channel is closed and drained, then closes the session files."""
+        loop = asyncio.get_running_loop()
+        processor = self.processor
+        processor.setup_csv()
+        try:
+            while True:
+                batch = await self.channel.get_batch()
+                if not batch:
+                    break
+                for item in batch:
+                    processor.handle_item(item)
+                if processor.summary_pending:
+                    processor.write_summary()
+        finally:
+            logging.info(f"Channel statistics: {self.channel.stats()}")
+            # Joins the log writer thread, so keep it off the loop
+            await loop.run_in_executor(None, processor.close_csv)
+
+    def stop(self):
+        """Nothing to do: the processor stops when its channel is closed."""
+
+
+class AsyncCore:
+    """
+    Hosts an asyncio event loop on a background thread and runs the sources
+    and consumers registered on it as tasks.
+    """
+    def __init__(self, name="AsyncCore"):
+        """
+        Args:
+            name (str): Name of the loop thread.
+        """
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._sources = []   # (name, component), stopped first
+        self._consumers = [] # (name, component, channel), stopped after the sources
+        self._tasks = {}
+        self._shutdown_future = None
+
+    def add_source(self, name, component):
+        """
+        Registers a device; its `run()` coroutine is started with the core.
+
+        Args:
+            name (str): Name used in logs.
+            component (object): An object with an async `run()` and a `stop()`.
+        """
+        self._sources.append((name, component))
+
+    def add_consumer(self, name, component, channel):
+        """
+        Registers a consumer that exits once `channel` is closed and drained.
+
+        Args:
+            name (str): Name used in logs.
+            component (object): An object with an async `run()`.
+            channel (AsyncChannel): The channel it consumes.
+        """
+        self._consumers.append((name, component, channel))
+
+    def start(self):
+        """Starts the loop thread and every registered component."""
+        self._thread.start()
+        for name, component in self._sources:
+            self._spawn(name, component)
+        for name, component, _ in self._consumers:
+            self._spawn(name, component)
+
+    def _spawn(self, name, component):
+        """Schedules a component's run() on the loop."""
+        async def supervised():
+            try:
+                await component.run()
+            except Exception:
+                logging.exception(f"Async component '{name}' failed.")
+        self._tasks[name] = asyncio.run_coroutine_threadsafe(supervised(), self.loop)
+
+    def call(self, func, *args):
+        """
+        Runs `func(*args)` on the loop thread (from any thread).
+
+        Args:
+            func (callable): The function to run.
+        """
+        if not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def stop(self):
+        """Requests the ordered shutdown without waiting for it (see `join`)."""
+        if self._shutdown_future is None and self._thread.is_alive():
+            self._shutdown_future = asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop)
+
+    async def _shutdown(self):
+        """Stops the sources, then lets the consumers drain, then stops the loop."""
+        for name, component in self._sources:
+            component.stop()
+        for name, _ in self._sources:
+            await asyncio.wrap_future(self._tasks[name])
+        for name, _, channel in self._consumers:
+            channel.close()
+            await asyncio.wrap_future(self._tasks[name])
+        self.loop.call_soon(self.loop.stop)
+
+    def _run_loop(self):
+        """Body of the loop thread."""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def is_alive(self):
+        """
+        Returns:
+            bool: True while the loop thread is running.
+        """
+        return self._thread.is_alive()
+
+    def join(self, timeout=None):
+        """
+        Waits for the shutdown to complete.
+
+        Args:
+            timeout (float, optional): Maximum wait in seconds.
+        """
+        self._thread.join(timeout)
+
+
+class AsyncPipeline:
+    """
+    The standard acquisition and processing setup on an AsyncCore, driven by the
+    RoutineWindow like a DataProcessor thread.
+    """
+    def __init__(self, username, serial_settings, sensor, plot_queue, initial_angle=None, max_angle=None):
+        """
+        Args:
+            username (str): Current user's username for file logging.
+            serial_settings (dict, optional): 'port', 'baudrate', 'protocol' and
+                                              'read_interval', or None without a device.
+            sensor (object, optional): The BNO055 sensor object.
+            plot_queue (RingChannel): Output channel to the RoutineWindow.
+            initial_angle (float, optional): Zeroed angle from calibration.
+            max_angle (float, optional): Max angle from calibration.
+        """
+        from core.processing import DataProcessor
+
+        self.core = AsyncCore()
+        self.serial_channel: AsyncChannel[List[StampedSample]] = AsyncChannel(
+            config.getint('Channels', 'serial_capacity', fallback=256), 'serial')
+
+        self.sensor_poller: Optional[AsyncSensorPoller] = None
+        if sensor:
+            self.sensor_poller = AsyncSensorPoller(sensor, rate=config.getfloat('Sensor', 'rate', fallback=100.0))
+            self.core.add_source('sensor', self.sensor_poller)
+        if serial_settings:
+            self.core.add_source('serial', AsyncSerialSource(
+                serial_settings['port'], serial_settings['baudrate'], self.serial_channel,
+                serial_settings.get('protocol', PROTOCOL_AUTO), serial_settings.get('read_interval', 0.01)))
+
+        self.processor = DataProcessor(self.sensor_poller, self.serial_channel, plot_queue,
+                                       username, initial_angle, max_angle)
+        self.core.add_consumer('processor', AsyncProcessor(self.processor, self.serial_channel), self.serial_channel)
+
+    def start(self):
+        """Starts the event loop and every component."""
+        self.core.start()
+
+    def start_set(self):
+        """Starts the next set (on the loop thread)."""
+        self.core.call(self.processor.start_set)
+
+    def end_set(self, reason=""):
+        """Ends the current set (on the loop thread)."""
+        self.core.call(self.processor.end_set, reason)
+
+    def discard_data(self):
+        """Deletes the session files when they are closed."""
+        self.core.call(self.processor.discard_data)
+
+    def stop(self):
+        """Requests the ordered shutdown."""
+        self.core.stop()
+
+    def is_alive(self):
+        """
+        Returns:
+            bool: True while the event loop is running.
+        """
+        return self.core.is_alive()
+
+    def join(self, timeout=None):
+        """Waits for the shutdown to complete."""
+        self.core.join(timeout)
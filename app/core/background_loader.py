@@ -0,0 +1,234 @@
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------------------
+# File: background_loader.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the BackgroundLoader, which runs file I/O and parsing for the
+UI on a small worker pool and hands the results back to the Tk thread.
+
+    task = loader.submit('history', open_session_index, path,
+                         on_done=self.show_session, on_progress=self.show_progress)
+
+The worker function receives the `LoadTask` as its first argument. It calls
+`task.report(done, total)` to publish progress, which also raises
+`LoadCancelled` once the task has been cancelled, so long loops stop at the
+next report. Submitting a task under a key that is still running cancels the
+previous task (e.g. the user picked another session). A cancelled task's
+result is discarded even if it already finished.
+
+Tk is not thread-safe, so workers never touch widgets: finished results and
+the latest progress of each task are delivered by `poll()`, which the loader
+schedules with `after()` on the attached widget while tasks are outstanding.
+The callbacks therefore always run on the Tk thread.
+"""
+
+POLL_INTERVAL_MS = 50
+
+
+class LoadCancelled(Exception):
+    """Raised inside a worker when its task has been cancelled."""
+
+
+class LoadTask:
+    """One unit of background work and its callbacks."""
+    def __init__(self, key, on_done=None, on_error=None, on_progress=None):
+        """
+        Args:
+            key (str): Tasks with the same key replace each other.
+            on_done (callable, optional): Called with the worker's return value.
+            on_error (callable, optional): Called with the exception if the worker failed.
+            on_progress (callable, optional): Called with (done, total) when progress changes.
+        """
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.future = None
+        self.progress = None  # Latest (done, total), written by the worker
+        self._delivered_progress = None
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        """True once the task has been cancelled."""
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancels the task; a task that has not started yet never runs."""
+        self._cancelled.set()
+        if self.future:
+            self.future.cancel()
+
+    def check(self):
+        """
+        Raises:
+            LoadCancelled: If the task has been cancelled.
+        """
+        if self._cancelled.is_set():
+            raise LoadCancelled()
+
+    def report(self, done, total):
+        """
+        Publishes the worker's progress (from the worker thread).
+
+        Args:
+            done (int or float): Units of work completed.
+            total (int or float): Total units of work.
+
+        Raises:
+            LoadCancelled: If the task has been cancelled.
+        """
+        self.check()
+        self.progress = (done, total)
+
+
+class BackgroundLoader:
+    """A worker pool whose results are delivered on the Tk thread."""
+    def __init__(self, max_workers=2, widget=None):
+        """
+        Args:
+            max_workers (int): Number of worker threads.
+            widget (tk.Widget, optional): Widget whose `after()` schedules the polling;
+                                          see `attach`.
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Loader")
+        self._results = queue.SimpleQueue()
+        self._tasks = {} # key -> the task whose result is still wanted
+        self._widget = widget
+        self._poll_job = None
+
+    def attach(self, widget):
+        """
+        Args:
+            widget (tk.Widget): Widget whose `after()` schedules the polling.
+        """
+        self._widget = widget
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None, on_progress=None):
+        """
+        Runs `fn(task, *args)` on the pool, cancelling any running task with the same key.
+
+        Must be called from the Tk thread.
+
+        Args:
+            key (str): The task key (e.g. 'history').
+            fn (callable): The worker function.
+            *args: Arguments after the task.
+            on_done, on_error, on_progress (callable, optional): See LoadTask.
+
+        Returns:
+            LoadTask: The submitted task.
+        """
+        self.cancel(key)
+        task = LoadTask(key, on_done, on_error, on_progress)
+        self._tasks[key] = task
+        task.future = self._executor.submit(self._run, task, fn, args)
+        self._schedule_poll()
+        return task
+
+    def _run(self, task, fn, args):
+        """Worker body: runs the function and queues its outcome."""
+        if task.cancelled:
+            return
+        try:
+            result = fn(task, *args)
+        except LoadCancelled:
+            return
+        except Exception as e:
+            self._results.put((task, None, e))
+            return
+        self._results.put((task, result, None))
+
+    def cancel(self, key):
+        """
+        Cancels the task running under a key, if any.
+
+        Args:
+            key (str): The task key.
+        """
+        task = self._tasks.pop(key, None)
+        if task:
+            task.cancel()
+
+    def busy(self, key=None):
+        """
+        Args:
+            key (str, optional): A task key; None checks every task.
+
+        Returns:
+            bool: True if a task (with that key) is outstanding.
+        """
+        return key in self._tasks if key is not None else bool(self._tasks)
+
+    def poll(self):
+        """
+        Delivers finished results and progress updates on the calling thread.
+
+        Returns:
+            bool: True while tasks are still outstanding.
+        """
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if task.cancelled or self._tasks.get(task.key) is not task:
+                continue
+            del self._tasks[task.key]
+            if error is not None:
+                if task.on_error:
+                    task.on_error(error)
+                else:
+                    logging.error(f"Background task '{task.key}' failed: {error}")
+            elif task.on_done:
+                task.on_done(result)
+
+        for task in list(self._tasks.values()):
+            progress = task.progress
+            if task.on_progress and progress is not None and progress != task._delivered_progress:
+                task._delivered_progress = progress
+                task.on_progress(*progress)
+        return bool(self._tasks)
+
+    def _schedule_poll(self):
+        """Schedules the next poll on the attached widget, once."""
+        if self._widget is None or self._poll_job is not None:
+            return
+        try:
+            self._poll_job = self._widget.after(POLL_INTERVAL_MS, self._poll_loop)
+        except Exception:
+            self._poll_job = None # The widget has been destroyed
+
+    def _poll_loop(self):
+        """Polls, and keeps polling while tasks are outstanding."""
+        self._poll_job = None
+        if self.poll():
+            self._schedule_poll()
+
+    def shutdown(self):
+        """Cancels every task and stops the workers without waiting for them."""
+        for key in list(self._tasks):
+            self.cancel(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def loader_from_config(config, widget=None):
+    """
+    Creates the loader sized by `[Storage] loader_workers`.
+
+    Args:
+        config (configparser.ConfigParser): The application configuration.
+        widget (tk.Widget, optional): Widget whose `after()` schedules the polling.
+
+    Returns:
+        BackgroundLoader: The loader.
+    """
+    return BackgroundLoader(max(1, config.getint('Storage', 'loader_workers', fallback=2)), widget)
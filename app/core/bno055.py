@@ -0,0 +1,231 @@
+import struct
+import time
+import logging
+from collections import namedtuple
+from core import metrics
+
+# ---------------------
+# File: bno055.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing a burst-read driver layer for the BNO055 IMU.
+
+The adafruit `quaternion` property costs two I2C transactions per call: one
+to read the operating mode register and one to read the quaternion. The
+BNO055 keeps its fusion outputs in consecutive registers:
+
+    0x20-0x27  quaternion w, x, y, z     int16, 1/2^14
+    0x28-0x2D  linear acceleration       int16, 1/100 m/s^2
+    0x2E-0x33  gravity vector            int16, 1/100 m/s^2
+    0x34       temperature               int8, deg C
+    0x35       calibration status        sys/gyro/accel/mag, 2 bits each
+
+`BNO055Burst` reads every selected output in one transaction covering the
+registers between the first and the last of them (22 data bytes for the
+full block), checks the operating mode only once, and counts the bytes
+moved on the bus. It wraps an initialized adafruit BNO055_I2C object, which
+keeps handling the chip setup and mode changes.
+"""
+
+# name: (register, struct format, scale or None)
+OUTPUTS = {
+    'quaternion': (0x20, '<4h', 1.0 / (1 << 14)),
+    'linear_acceleration': (0x28, '<3h', 1.0 / 100),
+    'gravity': (0x2E, '<3h', 1.0 / 100),
+    'temperature': (0x34, '<b', None),
+    'calibration': (0x35, '<B', None),
+}
+DEFAULT_OUTPUTS = ('quaternion', 'calibration')
+
+FUSION_MODES = (0x08, 0x09, 0x0A, 0x0B, 0x0C) # IMUPLUS, COMPASS, M4G, NDOF_FMC_OFF, NDOF
+I2C_OVERHEAD_BYTES = 3 # Address + write, register pointer, address + read
+
+# One burst read; unselected outputs are None
+BNO055Reading = namedtuple('BNO055Reading', list(OUTPUTS))
+
+# Calibration levels (0 = uncalibrated, 3 = fully calibrated)
+CalibrationStatus = namedtuple('CalibrationStatus', ['system', 'gyro', 'accel', 'mag'])
+
+
+def decode_calibration(value):
+    """
+    Splits the CALIB_STAT register into its four 2-bit levels.
+
+    Args:
+        value (int): The register value.
+
+    Returns:
+        CalibrationStatus: The system, gyro, accel and mag levels.
+    """
+    return CalibrationStatus((value >> 6) & 3, (value >> 4) & 3, (value >> 2) & 3, value & 3)
+
+
+class BNO055Burst:
+    """
+    Reads the selected BNO055 fusion outputs in one I2C transaction per call.
+
+    Also exposes a `quaternion` property, so it can replace the adafruit
+    object wherever only the orientation is needed.
+    """
+    def __init__(self, sensor, outputs=DEFAULT_OUTPUTS):
+        """
+        Initializes the driver.
+
+        Args:
+            sensor (adafruit_bno055.BNO055_I2C): An initialized adafruit sensor object.
+                Objects without an `i2c_device` (e.g. the UART variant) are read
+                through their properties instead.
+            outputs (iterable of str): Names from OUTPUTS to fetch.
+
+        Raises:
+            ValueError: If an output name is unknown or none is selected.
+        """
+        requested = set(outputs)
+        unknown = requested - set(OUTPUTS)
+        outputs = [name for name in OUTPUTS if name in requested] # Register order
+        if unknown or not outputs:
+            raise ValueError(f"Invalid BNO055 outputs: {sorted(unknown) or 'none selected'}.")
+        self.sensor = sensor
+        self.outputs = tuple(outputs)
+        self._device = getattr(sensor, 'i2c_device', None)
+
+        # One block from the first to the last selected register
+        self.start_register = min(OUTPUTS[name][0] for name in outputs)
+        end = max(OUTPUTS[name][0] + struct.calcsize(OUTPUTS[name][1]) for name in outputs)
+        self.block_size = end - self.start_register
+        self._request = bytes([self.start_register])
+        self._block = bytearray(self.block_size)
+        self._fields = [(name, OUTPUTS[name][0] - self.start_register, struct.Struct(OUTPUTS[name][1]), OUTPUTS[name][2])
+                        for name in outputs]
+
+        self.fusion = self._read_fusion_mode()
+
+        # Bus statistics
+        self.transactions = 0
+        self.bytes_read = 0
+        self._first_read = None
+        self._last_read = None
+        metrics.counter('i2c_transactions_total', "I2C transactions issued to the BNO055.", fn=lambda: self.transactions)
+        metrics.counter('i2c_bytes_total', "Payload bytes read from the BNO055.", fn=lambda: self.bytes_read)
+
+    def _read_fusion_mode(self):
+        """Returns True if the sensor is in a fusion mode (the only modes with fusion outputs)."""
+        try:
+            mode = self.sensor.mode
+        except Exception as e:
+            logging.warning(f"Could not read the BNO055 mode ({e}); assuming a fusion mode.")
+            return True
+        if mode not in FUSION_MODES:
+            logging.warning(f"BNO055 is in mode {mode:#04x}; fusion outputs will be unavailable.")
+        return mode in FUSION_MODES
+
+    def refresh_mode(self):
+        """Re-reads the operating mode after it was changed on the sensor object."""
+        self.fusion = self._read_fusion_mode()
+
+    def read(self):
+        """
+        Reads every selected output.
+
+        Returns:
+            BNO055Reading: Scaled tuples for the vector outputs, an int for the
+                           temperature, a CalibrationStatus, and None for the
+                           outputs that were not selected (or are unavailable
+                           outside the fusion modes).
+        """
+        now = time.monotonic()
+        if self._first_read is None:
+            self._first_read = now
+        self._last_read = now
+        if self._device is None:
+            return self._read_properties()
+
+        with self._device as i2c:
+            i2c.write_then_readinto(self._request, self._block)
+        self.transactions += 1
+        self.bytes_read += self.block_size
+
+        values = dict.fromkeys(OUTPUTS)
+        block = self._block
+        for name, offset, layout, scale in self._fields:
+            raw = layout.unpack_from(block, offset)
+            if name == 'calibration':
+                values[name] = decode_calibration(raw[0])
+            elif scale is None:
+                values[name] = raw[0]
+            elif self.fusion:
+                values[name] = tuple(v * scale for v in raw)
+        return BNO055Reading(**values)
+
+    def _read_properties(self):
+        """Fallback for sensor objects without direct register access."""
+        values = dict.fromkeys(OUTPUTS)
+        for name in self.outputs:
+            if name == 'calibration':
+                values[name] = CalibrationStatus(*self.sensor.calibration_status)
+            else:
+                values[name] = getattr(self.sensor, name)
+        self.transactions += len(self.outputs)
+        return BNO055Reading(**values)
+
+    @property
+    def quaternion(self):
+        """
+        Returns:
+            tuple: The latest (w, x, y, z) quaternion, read in one transaction.
+        """
+        q = self.read().quaternion
+        return q if q is not None else (None, None, None, None)
+
+    def stats(self):
+        """
+        Reports the bus usage between the first and the latest read.
+
+        Returns:
+            dict: Totals and rates of transactions, payload bytes, and bytes on
+                  the bus including the addressing overhead.
+        """
+        span = (self._last_read - self._first_read) if self._first_read is not None else 0.0
+
+        def rate(count):
+            return round(count / span, 1) if span > 0 else 0.0
+
+        return {
+            'outputs': list(self.outputs),
+            'block_size': self.block_size,
+            'transactions': self.transactions,
+            'bytes_read': self.bytes_read,
+            'transactions_per_sec': rate(self.transactions),
+            'payload_bytes_per_sec': rate(self.bytes_read),
+            'bus_bytes_per_sec': rate(self.bytes_read + self.transactions * I2C_OVERHEAD_BYTES),
+        }
+
+def driver_from_config(config, sensor):
+    """
+    Wraps an adafruit sensor object according to the [Sensor] configuration.
+
+    Reads `driver` ('burst' or 'adafruit') and `outputs` (comma-separated
+    names from OUTPUTS).
+
+    Args:
+        config (configparser.ConfigParser): The application configuration.
+        sensor (object): The adafruit sensor object, or None.
+
+    Returns:
+        object: A BNO055Burst, or the sensor itself for the 'adafruit' driver,
+                an invalid configuration, or no sensor.
+    """
+    if sensor is None or config.get('Sensor', 'driver', fallback='burst') != 'burst':
+        return sensor
+    outputs = [name.strip() for name in config.get('Sensor', 'outputs', fallback=','.join(DEFAULT_OUTPUTS)).split(',')]
+    if 'quaternion' not in outputs:
+        outputs.append('quaternion') # The angle is always needed
+    try:
+        return BNO055Burst(sensor, outputs)
+    except ValueError as e:
+        logging.error(f"{e} Using the adafruit driver.")
+        return sensor
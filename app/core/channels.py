@@ -0,0 +1,283 @@
+import time
+import queue
+import threading
+from collections import deque
+
+# ---------------------
+# File: channels.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing RingChannel, a fixed-capacity, thread-safe channel used between
+the acquisition, processing and GUI threads in place of unbounded queue.Queue objects.
+
+When the consumer falls behind, the channel applies an overflow policy instead
+of growing without limit:
+
+    drop_oldest  the oldest queued item is discarded to make room (default)
+    coalesce     all queued data items are discarded and only the newest is kept,
+                 so a stalled consumer jumps straight to the latest state
+    block        the producer waits for space, like a bounded queue.Queue
+
+Items matching the optional `protect` predicate (e.g. SET_START/SET_END
+command strings) are never discarded by an overflow policy. The channel keeps
+the queue.Queue method names and raises queue.Empty / queue.Full, so existing
+consumers work unchanged.
+"""
+
+POLICY_DROP_OLDEST = 'drop_oldest'
+POLICY_COALESCE = 'coalesce'
+POLICY_BLOCK = 'block'
+POLICIES = (POLICY_DROP_OLDEST, POLICY_COALESCE, POLICY_BLOCK)
+
+
+class RingChannel:
+    """
+    A bounded FIFO channel with a configurable overflow policy and occupancy
+    and drop counters.
+    """
+    def __init__(self, capacity, policy=POLICY_DROP_OLDEST, protect=None, name="channel"):
+        """
+        Initializes an empty channel.
+
+        Args:
+            capacity (int): Maximum number of queued items.
+            policy (str): Overflow policy; one of POLICIES.
+            protect (callable, optional): Predicate returning True for items that
+                                          must never be dropped. Protected items are
+                                          always accepted, even beyond the capacity.
+            name (str): Name used in statistics and log messages.
+
+        Raises:
+            ValueError: If the capacity is not positive or the policy is unknown.
+        """
+        if capacity < 1:
+            raise ValueError("RingChannel capacity must be at least 1.")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown RingChannel policy '{policy}'.")
+        self.capacity = capacity
+        self.policy = policy
+        self.protect = protect
+        self.name = name
+
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        # Statistics
+        self.puts = 0
+        self.gets = 0
+        self.dropped = 0
+        self.high_water = 0
+        self.blocked_time = 0.0
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Adds an item, applying the overflow policy if the channel is full.
+
+        Args:
+            item: The item to queue.
+            block (bool): For the 'block' policy, whether to wait for space.
+            timeout (float, optional): For the 'block' policy, the maximum wait in seconds.
+
+        Raises:
+            queue.Full: If the 'block' policy could not make room in time.
+        """
+        with self._lock:
+            if len(self._items) >= self.capacity and not self._is_protected(item):
+                if self.policy == POLICY_BLOCK:
+                    self._wait_for_space(block, timeout)
+                elif self.policy == POLICY_COALESCE:
+                    self._discard_unprotected(len(self._items))
+                else:
+                    self._discard_unprotected(len(self._items) - self.capacity + 1)
+                if len(self._items) >= self.capacity:
+                    # The channel holds only protected items; the new data item loses
+                    self.dropped += 1
+                    return
+
+            self._items.append(item)
+            self.puts += 1
+            if len(self._items) > self.high_water:
+                self.high_water = len(self._items)
+            self._not_empty.notify()
+
+    def put_nowait(self, item):
+        """Equivalent to put(item, block=False)."""
+        self.put(item, block=False)
+
+    def get(self, block=True, timeout=None):
+        """
+        Removes and returns the oldest item.
+
+        Args:
+            block (bool): Whether to wait for an item.
+            timeout (float, optional): The maximum wait in seconds.
+
+        Returns:
+            The oldest queued item.
+
+        Raises:
+            queue.Empty: If no item was available in time.
+        """
+        with self._not_empty:
+            if not block:
+                if not self._items:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self._items:
+                    self._not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self._items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._not_empty.wait(remaining)
+            item = self._items.popleft()
+            self.gets += 1
+            self._not_full.notify()
+            return item
+
+    def get_nowait(self):
+        """Equivalent to get(block=False)."""
+        return self.get(block=False)
+
+    def get_many(self, max_items):
+        """
+        Removes and returns up to `max_items` of the oldest items without waiting.
+
+        Args:
+            max_items (int): The maximum number of items to return.
+
+        Returns:
+            list: The items, oldest first (possibly empty).
+        """
+        with self._lock:
+            count = min(max_items, len(self._items))
+            items = [self._items.popleft() for _ in range(count)]
+            self.gets += count
+            if count:
+                self._not_full.notify_all()
+            return items
+
+    def clear(self):
+        """Discards every queued item (protected ones included) without counting them as drops."""
+        with self._lock:
+            self._items.clear()
+            self._not_full.notify_all()
+
+    def qsize(self):
+        """
+        Returns:
+            int: The number of queued items.
+        """
+        return len(self._items)
+
+    def empty(self):
+        """
+        Returns:
+            bool: True if no item is queued.
+        """
+        return not self._items
+
+    def full(self):
+        """
+        Returns:
+            bool: True if the channel is at (or above) its capacity.
+        """
+        return len(self._items) >= self.capacity
+
+    def occupancy(self):
+        """
+        Returns:
+            float: The fill level as a fraction of the capacity.
+        """
+        return len(self._items) / self.capacity
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters describing the channel's load and losses.
+        """
+        return {
+            'name': self.name,
+            'policy': self.policy,
+            'capacity': self.capacity,
+            'size': len(self._items),
+            'high_water': self.high_water,
+            'puts': self.puts,
+            'gets': self.gets,
+            'dropped': self.dropped,
+            'blocked_time': round(self.blocked_time, 4),
+        }
+
+    def _is_protected(self, item):
+        """Returns True if the item must never be dropped."""
+        return self.protect is not None and self.protect(item)
+
+    def _wait_for_space(self, block, timeout):
+        """Waits (with the lock held by the caller) until there is room for one item."""
+        if not block:
+            raise queue.Full
+        started = time.monotonic()
+        try:
+            while len(self._items) >= self.capacity:
+                if timeout is None:
+                    self._not_full.wait()
+                else:
+                    remaining = started + timeout - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Full
+                    self._not_full.wait(remaining)
+        finally:
+            self.blocked_time += time.monotonic() - started
+
+    def _discard_unprotected(self, count):
+        """Discards up to `count` of the oldest unprotected items (lock held by the caller)."""
+        if count <= 0:
+            return
+        if self.protect is None:
+            count = min(count, len(self._items))
+            for _ in range(count):
+                self._items.popleft()
+            self.dropped += count
+            return
+        kept = deque()
+        discarded = 0
+        while self._items and discarded < count:
+            item = self._items.popleft()
+            if self.protect(item):
+                kept.append(item)
+            else:
+                discarded += 1
+        kept.extend(self._items)
+        self._items = kept
+        self.dropped += discarded
+
+
+def channel_from_config(config, key, default_capacity, protect=None):
+    """
+    Builds a RingChannel from the [Channels] section of the configuration.
+
+    Reads `<key>_capacity` and `<key>_policy`, falling back to the given
+    capacity and the drop_oldest policy.
+
+    Args:
+        config (configparser.ConfigParser): The application configuration.
+        key (str): The channel's configuration prefix (e.g. 'serial').
+        default_capacity (int): Capacity used when none is configured.
+        protect (callable, optional): Predicate for items that must never be dropped.
+
+    Returns:
+        RingChannel: The configured channel.
+    """
+    capacity = config.getint('Channels', f'{key}_capacity', fallback=default_capacity)
+    policy = config.get('Channels', f'{key}_policy', fallback=POLICY_DROP_OLDEST)
+    if policy not in POLICIES:
+        policy = POLICY_DROP_OLDEST
+    return RingChannel(capacity, policy, protect=protect, name=key)
@@ -3,6 +3,11 @@ import serial
 import time
 import logging
 import queue
+from core.cop_protocol import (FrameDecoder, LineDecoder, detect_protocol, PROTOCOL_AUTO,
+                               PROTOCOL_TEXT, PROTOCOL_BINARY, PROTOCOLS)
+from core.alignment import TimestampedRing, ChunkTimestamper
+from core.scheduler import DeadlineScheduler
+from core import metrics
 
 
 # ---------------------
@@ -15,62 +20,258 @@ import queue
 """
 Module providing threaded classes for concurrent hardware interaction.
 
-It contains SerialThread for reading line-based data from a serial device 
-and SensorThread for continuously polling a hardware sensor object.
+It contains SerialThread for reading CoP samples from a serial device (either
+text lines or binary frames, see core.cop_protocol) and SensorThread for 
+continuously polling a hardware sensor object.
 Both threads run in the background as daemon threads.
 """
 
+SERIAL_SAMPLES = metrics.counter('serial_samples_total', "CoP samples read from the serial port.")
+SERIAL_BYTES = metrics.counter('serial_bytes_total', "Bytes read from the serial port.")
+SERIAL_CONNECTIONS = metrics.counter('serial_connections_total', "Successful serial port connections.")
+SERIAL_RECONNECTS = metrics.counter('serial_reconnects_total', "Serial connections after the first one of the process.")
+SERIAL_CONNECTION_FAILURES = metrics.counter('serial_connection_failures_total', "Failed attempts to open the serial port.")
+SERIAL_DISCONNECTS = metrics.counter('serial_disconnects_total', "Serial connections lost while reading.")
+SENSOR_READS = metrics.counter('sensor_reads_total', "Successful BNO055 reads.")
+SENSOR_READ_ERRORS = metrics.counter('sensor_read_errors_total', "Failed BNO055 reads.")
+SENSOR_READ_TIME = metrics.histogram('sensor_read_seconds', "Duration of one BNO055 read.")
+
+
+def count_connection():
+    """Counts a successful serial connection, and a reconnect after the first one."""
+    if SERIAL_CONNECTIONS.value:
+        SERIAL_RECONNECTS.inc()
+    SERIAL_CONNECTIONS.inc()
+
+
 class SerialThread(threading.Thread):
     """
-    A separate thread for continuously reading lines from a Serial Port 
+    A separate thread for continuously reading samples from a Serial Port 
     and placing them into a shared queue for processing by the main application.
 
+    Each queued sample is an (acquisition_time, payload) tuple, where the payload
+    is a text line (str) or a decoded binary frame (CopFrame) and the time is on
+    the host's monotonic clock (see core.alignment). In 'chunk' read mode, everything waiting in the OS buffer
+    is read at once and the samples it completes are queued together as one
+    list, so a fast stream costs one wakeup and one queue operation per chunk 
+    instead of per sample. The legacy 'line' mode queues one line per readline().
     This ensures that the main thread is not blocked waiting for serial data.
     """
-    def __init__(self, port, baudrate, data_queue):
+    DETECT_LIMIT = 1024 # Bytes inspected by auto-detection before falling back to text
+    READ_MODES = ('chunk', 'line')
+
+    def __init__(self, port, baudrate, data_queue, protocol=PROTOCOL_TEXT, read_mode='chunk', read_interval=0.01):
         """
         Initializes the serial communication thread.
 
         Args:
             port (str): The serial port path (e.g., 'COM3' or '/dev/ttyACM0').
             baudrate (int): The baud rate for the serial connection.
-            data_queue (queue.Queue): A thread-safe queue to deposit read lines.
+            data_queue (queue.Queue): A thread-safe queue to deposit read samples.
+            protocol (str): 'text', 'binary', or 'auto' to detect the format
+                            from the first bytes received.
+            read_mode (str): 'chunk' for bulk reads with batched queueing, or 
+                             'line' for one readline() per text sample. Binary
+                             frames are always read in chunks.
+            read_interval (float): Minimum seconds between chunk reads; data
+                                   arriving meanwhile is read in the next chunk.
         """
         super().__init__(daemon=True)
         self.port = port
         self.baudrate = baudrate
         self.data_queue = data_queue
+        if protocol not in PROTOCOLS:
+            logging.warning(f"Unknown serial protocol '{protocol}', using auto-detection.")
+            protocol = PROTOCOL_AUTO
+        self.protocol = protocol
+        if read_mode not in self.READ_MODES:
+            logging.warning(f"Unknown serial read mode '{read_mode}', using chunk reads.")
+            read_mode = 'chunk'
+        self.read_mode = read_mode
+        self.read_interval = max(0.0, read_interval)
+        self.decoder = None # FrameDecoder or LineDecoder, once the protocol is known
+        self.timestamper = ChunkTimestamper() # Maps binary frame timestamps onto the host clock
         self.serial_connection = None
         self.running = False
 
+        # Throughput counters (written by this thread, read through stats())
+        self.bytes_read = 0
+        self.samples_read = 0
+        self.chunks_read = 0
+        self.busy_time = 0.0 # Seconds spent decoding and queueing, excluding waits
+        self.started = time.monotonic() # Reset when the port opens; rates are measured from here
+
     def run(self):
         """
         The main thread execution loop.
 
-        Attempts to establish a serial connection and, if successful, 
-        continuously reads line-delimited data and puts it into the queue. 
+        Attempts to establish a serial connection and, if successful, detects the
+        protocol when needed and continuously reads samples into the queue. 
         Closes the connection upon exiting the loop.
         """
         try:
             self.serial_connection = serial.Serial(self.port, self.baudrate, timeout=1)
             self.running = True
+            self.started = time.monotonic()
+            count_connection()
             logging.info(f"Serial connected to {self.port}.")
         except serial.SerialException as e:
+            SERIAL_CONNECTION_FAILURES.inc()
             logging.error(f"Failed to connect to {self.port}.\n{e}")
             return
 
-        while self.running:
-            try:
-                # The blocking nature of readline() is intentional here
-                line = self.serial_connection.readline().decode('utf-8').strip()
-                if line:
-                    self.data_queue.put(line)
-            except Exception:
-                break 
-        
+        pending = b''
+        try:
+            if self.protocol == PROTOCOL_AUTO:
+                self.protocol, pending = self._detect_protocol()
+            if self.protocol == PROTOCOL_TEXT and self.read_mode == 'line':
+                self._read_lines(pending)
+            else:
+                self.decoder = FrameDecoder() if self.protocol == PROTOCOL_BINARY else LineDecoder()
+                self._read_chunks(pending)
+        except Exception as e:
+            if self.running:
+                SERIAL_DISCONNECTS.inc()
+                logging.error(f"Serial read failed on {self.port}: {e}")
+
+        logging.info(f"Serial statistics: {self.stats()}")
+        if isinstance(self.decoder, FrameDecoder):
+            logging.info(f"Serial frame statistics: {self.decoder.stats()}")
         if self.serial_connection and self.serial_connection.is_open:
             self.serial_connection.close()
 
+    def _detect_protocol(self):
+        """
+        Reads the start of the stream until its format can be identified.
+
+        Returns:
+            tuple: (protocol, bytes read while probing), so no sample is lost.
+        """
+        probe = b''
+        while self.running and len(probe) < self.DETECT_LIMIT:
+            probe += self.serial_connection.read(self.serial_connection.in_waiting or 1)
+            protocol = detect_protocol(probe)
+            if protocol:
+                logging.info(f"Serial protocol detected: {protocol}.")
+                return protocol, probe
+        if self.running:
+            logging.warning("Could not detect the serial protocol; assuming text lines.")
+        return PROTOCOL_TEXT, probe
+
+    def _read_lines(self, pending=b''):
+        """
+        Reads line-delimited text samples one readline() at a time until stopped.
+
+        Args:
+            pending (bytes): Bytes already read from the stream (e.g. while probing).
+        """
+        *lines, carry = pending.split(b'\n')
+        now = time.monotonic()
+        for raw in lines:
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if line:
+                self.data_queue.put((now, line))
+
+        while self.running:
+            # The blocking nature of readline() is intentional here
+            raw = self.serial_connection.readline()
+            acquired = time.monotonic()
+            started = time.perf_counter()
+            line = (carry + raw).decode('utf-8').strip()
+            carry = b''
+            self.bytes_read += len(raw)
+            self.chunks_read += 1
+            SERIAL_BYTES.inc(len(raw))
+            if line:
+                self.data_queue.put((acquired, line))
+                self.samples_read += 1
+                SERIAL_SAMPLES.inc()
+            self.busy_time += time.perf_counter() - started
+
+    def _read_chunks(self, pending=b''):
+        """
+        Reads everything waiting in the OS buffer at once, decodes it in one pass
+        with `self.decoder`, and queues the completed samples as a single list.
+
+        Args:
+            pending (bytes): Bytes already read from the stream (e.g. while probing).
+        """
+        conn = self.serial_connection
+        data = pending
+        last_read = previous_read = time.monotonic()
+        while self.running:
+            if data:
+                started = time.perf_counter()
+                samples = self.decoder.feed(data)
+                if samples:
+                    self.data_queue.put(self._timestamp(samples, previous_read, last_read))
+                    self.samples_read += len(samples)
+                    SERIAL_SAMPLES.inc(len(samples))
+                self.bytes_read += len(data)
+                SERIAL_BYTES.inc(len(data))
+                self.chunks_read += 1
+                self.busy_time += time.perf_counter() - started
+
+            # Let a few samples accumulate so each wakeup handles a batch
+            wait = self.read_interval - (time.monotonic() - last_read)
+            if wait > 0:
+                time.sleep(wait)
+            # Blocks for the first byte (up to the timeout), then drains the OS buffer
+            data = conn.read(conn.in_waiting or 1)
+            previous_read, last_read = last_read, time.monotonic()
+
+    def _timestamp(self, samples, previous_read, read_time):
+        """
+        Pairs each sample of a chunk with its acquisition time (see
+        core.alignment.ChunkTimestamper).
+
+        Args:
+            samples (list): The decoded samples of one chunk.
+            previous_read (float): Monotonic time of the previous read.
+            read_time (float): Monotonic time of the read that returned the chunk.
+
+        Returns:
+            list: (acquisition_time, sample) tuples.
+        """
+        return self.timestamper.stamp(samples, previous_read, read_time, self.protocol == PROTOCOL_BINARY)
+
+    def stats(self, since=None):
+        """
+        Reports throughput totals and rates, without changing any state, so any
+        number of readers (exit log, overlay, bench) can call it.
+
+        Args:
+            since (dict, optional): An earlier result of this method; the rates then
+                                    cover the interval since it instead of the
+                                    time since the port opened.
+
+        Returns:
+            dict: Totals, bytes and samples per second, samples per chunk, the
+                  decode/queue overhead per sample in microseconds, and the
+                  'time' and 'busy_time' the rates are computed from.
+        """
+        now = time.monotonic()
+        bytes_read, samples_read, busy_time = self.bytes_read, self.samples_read, self.busy_time
+        if since is None:
+            last_time, last_bytes, last_samples, last_busy = self.started, 0, 0, 0.0
+        else:
+            last_time, last_bytes, last_samples, last_busy = (
+                since['time'], since['bytes_read'], since['samples_read'], since['busy_time'])
+
+        elapsed = max(now - last_time, 1e-9)
+        samples = samples_read - last_samples
+        return {
+            'bytes_read': bytes_read,
+            'samples_read': samples_read,
+            'chunks_read': self.chunks_read,
+            'bytes_per_sec': round((bytes_read - last_bytes) / elapsed, 1),
+            'samples_per_sec': round(samples / elapsed, 1),
+            'samples_per_chunk': round(samples_read / self.chunks_read, 2) if self.chunks_read else 0.0,
+            'us_per_sample': round((busy_time - last_busy) / samples * 1e6, 2) if samples else 0.0,
+            'time': now,
+            'busy_time': busy_time,
+        }
+
     def stop(self):
         """Signals the thread to stop execution and close the connection."""
         self.running = False
@@ -96,41 +297,88 @@ class SensorThread(threading.Thread):
 
     This prevents slow hardware reads from blocking the main application loop.
     """
-    def __init__(self, sensor_object):
+    def __init__(self, sensor_object, history_size=64, rate=100.0):
         """
         Initializes the sensor polling thread.
 
         Args:
             sensor_object (Adafruit_BNO055 or similar): An object with a 
                                                         '.quaternion' property 
-                                                        for reading sensor data.
+                                                        for reading sensor data,
+                                                        or a core.bno055.BNO055Burst
+                                                        whose `read()` returns every
+                                                        selected output at once.
+            history_size (int): Number of timestamped readings kept for interpolation.
+            rate (float): Polling rate in Hz.
         """
         super().__init__(daemon=True)
         self.sensor = sensor_object
         self.running = False
         self._latest_quaternion = (1.0, 0.0, 0.0, 0.0) 
+        self._latest_reading = None
+        self._burst = hasattr(sensor_object, 'read')
         self._lock = threading.Lock()
+        self.history = TimestampedRing(history_size) # (acquisition time, quaternion) pairs
+        self.scheduler = DeadlineScheduler(rate)
+        self.read_errors = 0
+        self.forward = None # Optional callable(acquired, quaternion), e.g. the pipeline process's sensor ring
+        self._forward_lock = threading.Lock() # Held while `forward` runs; see set_forward
 
     def run(self):
         """
         The main thread execution loop.
 
         Continuously reads the sensor's quaternion property, updates the 
-        internal state using a lock to ensure thread safety, and sleeps briefly 
-        to control the polling rate (~100Hz).
+        internal state using a lock to ensure thread safety, and stores the
+        reading with its acquisition time (the midpoint of the I2C read). Reads
+        start on fixed-rate deadlines (see core.scheduler), so the sample
+        period stays uniform regardless of the I2C read time.
         """
         self.running = True
-        logging.info("Sensor thread started.")
+        logging.info(f"Sensor thread started ({self.scheduler.rate:g} Hz).")
+        self.scheduler.start()
         while self.running:
             try:
-                q = self.sensor.quaternion
+                read_start = time.monotonic()
+                if self._burst:
+                    reading = self.sensor.read()
+                    q = reading.quaternion
+                else:
+                    reading = None
+                    q = self.sensor.quaternion
+                read_end = time.monotonic()
+                acquired = (read_start + read_end) / 2
+                SENSOR_READS.inc()
+                SENSOR_READ_TIME.observe(read_end - read_start)
+                if reading is not None:
+                    with self._lock:
+                        self._latest_reading = reading
                 if q is not None:
                     with self._lock:
                         self._latest_quaternion = q
-                time.sleep(0.01)
+                    if None not in q:
+                        self.history.append(acquired, q)
+                        with self._forward_lock:
+                            if self.forward:
+                                self.forward(acquired, q)
             except Exception:
-                # Sleep longer on error to prevent CPU hogging
-                time.sleep(0.1)
+                # Failed reads keep their slot, so errors cannot hog the CPU
+                self.read_errors += 1
+                SENSOR_READ_ERRORS.inc()
+            self.scheduler.wait()
+        logging.info(f"Sensor statistics: {self.stats()}")
+
+    def set_forward(self, forward):
+        """
+        Installs or removes the forwarding hook. Waits for a call in progress, so
+        once it returns with None the previous hook is never called again and
+        whatever it writes to can be freed.
+
+        Args:
+            forward (callable or None): Called with (acquired, quaternion) after each reading.
+        """
+        with self._forward_lock:
+            self.forward = forward
 
     def get_quaternion(self):
         """
@@ -142,6 +390,45 @@ class SensorThread(threading.Thread):
         with self._lock:
             return self._latest_quaternion
 
+    def get_quaternion_at(self, timestamp):
+        """
+        Estimates the quaternion at a past instant by interpolating the stored readings.
+
+        Args:
+            timestamp (float): The instant on the monotonic clock.
+
+        Returns:
+            tuple: The interpolated (w, x, y, z), or the latest reading if no
+                   history is available yet.
+        """
+        q = self.history.interpolate(timestamp)
+        return q if q is not None else self.get_quaternion()
+
+    def get_reading(self):
+        """
+        Retrieves the most recent burst reading in a thread-safe manner.
+
+        Returns:
+            BNO055Reading: The latest reading with every selected output, or
+                           None before the first one or with a sensor object
+                           that only provides '.quaternion'.
+        """
+        with self._lock:
+            return self._latest_reading
+
+    def stats(self):
+        """
+        Returns:
+            dict: The scheduler's achieved rate, jitter percentiles and overrun
+                  counts, the number of failed reads and, with a burst driver,
+                  its bus usage under 'bus'.
+        """
+        stats = self.scheduler.stats()
+        stats['read_errors'] = self.read_errors
+        if hasattr(self.sensor, 'stats'):
+            stats['bus'] = self.sensor.stats()
+        return stats
+
     def stop(self):
         """Signals the thread to stop execution."""
         self.running = False
\ No newline at end of file
@@ -0,0 +1,124 @@
+import numpy as np
+
+# ---------------------
+# File: downsample.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing decimation of time series for display.
+
+`minmax_decimate` splits the x range into one bucket per pixel column and
+keeps, in their original order, the samples holding the minimum and maximum y
+of each bucket. A line through them covers exactly the pixels the full trace
+would cover, so peaks survive (unlike taking every n-th sample), while the
+number of points drawn is bounded by twice the plot width.
+
+`MinMaxPyramid` precomputes the same reduction at every power-of-two block
+size, so a long recording can be redrawn at screen resolution for any
+visible range (zooming in refines it) without rescanning the samples.
+"""
+
+def minmax_decimate(x, y, columns, x_range=None):
+    """
+    Keeps the minimum and maximum of every pixel column.
+
+    Args:
+        x (np.ndarray): Non-decreasing x values (e.g. times).
+        y (np.ndarray): The y values.
+        columns (int): Number of buckets, normally the plot width in pixels.
+        x_range (tuple, optional): (low, high) x values mapped to the columns;
+                                   defaults to the first and last x.
+
+    Returns:
+        tuple: (x, y) arrays of at most 2 * columns + 2 points, including the
+               first and last samples. The inputs are returned unchanged when
+               they are already that small.
+    """
+    count = len(x)
+    if columns <= 0 or count <= 2 * columns:
+        return x, y
+    low, high = x_range if x_range is not None else (x[0], x[-1])
+    if high <= low:
+        return x, y
+
+    buckets = ((x - low) * (columns / (high - low))).astype(np.int64)
+    np.clip(buckets, 0, columns - 1, out=buckets)
+    # Sorted by bucket, then by y: the first index of each bucket run holds its
+    # minimum and the last one its maximum
+    order = np.lexsort((y, buckets))
+    sorted_buckets = buckets[order]
+    starts = np.flatnonzero(np.diff(sorted_buckets, prepend=-1))
+    ends = np.append(starts[1:], count) - 1
+    keep = np.unique(np.concatenate(([0], order[starts], order[ends], [count - 1])))
+    return x[keep], y[keep]
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max decimation of one or more series sharing one index.
+
+    Level k covers blocks of 2^k consecutive samples and stores, as sorted raw
+    sample indices, the minimum and maximum of every series in each block.
+    Level k+1 is built from level k by comparing pairs of blocks, so the whole
+    pyramid costs O(n) to build and about 2n indices per series to keep.
+    `indices` picks the coarsest level that still gives one block per output
+    point, so a view renders about two points per series per pixel column at
+    any zoom, and every point is a real sample.
+    """
+    def __init__(self, *series):
+        """
+        Args:
+            *series (np.ndarray): Equal-length value arrays (e.g. angle, or CoP x and y),
+                                  in display order (sorted by time).
+        """
+        self.length = len(series[0]) if series else 0
+        self.levels = [] # (block size, sorted sample indices)
+        lows = [np.arange(self.length) for _ in series]
+        highs = [np.arange(self.length) for _ in series]
+        block = 1
+        while series and len(lows[0]) > 1:
+            block *= 2
+            for i, values in enumerate(series):
+                lows[i] = self._pair(values, lows[i], np.less_equal)
+                highs[i] = self._pair(values, highs[i], np.greater_equal)
+            self.levels.append((block, np.unique(np.concatenate(lows + highs))))
+
+    @staticmethod
+    def _pair(values, indices, keep_first):
+        """Merges pairs of blocks, keeping the index whose value wins `keep_first`."""
+        if len(indices) % 2:
+            indices = np.append(indices, indices[-1])
+        first, second = indices[0::2], indices[1::2]
+        return np.where(keep_first(values[first], values[second]), first, second)
+
+    def indices(self, start, stop, points):
+        """
+        Args:
+            start (int): First sample of the visible range.
+            stop (int): End (exclusive) of the visible range.
+            points (int): Number of output buckets, normally the plot width in pixels.
+
+        Returns:
+            np.ndarray: Sorted sample indices to draw, including `start` and `stop - 1`;
+                        every sample when the range has no more than `points` of them.
+        """
+        start, stop = max(0, start), min(self.length, stop)
+        count = stop - start
+        if count <= 0:
+            return np.empty(0, dtype=np.int64)
+        if count <= points or not self.levels:
+            return np.arange(start, stop)
+
+        target = count / points
+        keep = None
+        for block, level in self.levels:
+            if block > target:
+                break
+            keep = level
+        if keep is None:
+            return np.arange(start, stop)
+        visible = keep[np.searchsorted(keep, start):np.searchsorted(keep, stop)]
+        return np.unique(np.concatenate(([start], visible, [stop - 1])))
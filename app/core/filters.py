@@ -0,0 +1,424 @@
+import math
+from collections import deque
+import numpy as np
+
+# ---------------------
+# File: filters.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing streaming smoothing filters for the angle and velocity signals.
+
+Every filter costs O(1) per sample regardless of its window, so large windows
+stay affordable on noisy sensors:
+
+    moving_average  running sum updated with (new - oldest), recomputed exactly
+                    from the window every `window` updates
+    ema             exponential moving average with the same lag as a moving
+                    average of the configured window (alpha = 2 / (window + 1))
+    savgol          causal Savitzky-Golay (least-squares polynomial evaluated at
+                    the newest sample), computed from running power-weighted sums
+    one_euro        adaptive low-pass filter that smooths strongly when the signal
+                    is slow and follows it closely when it moves fast
+
+All filters share one interface: `update(value, t)` returns the filtered value
+(or None while a non-partial window is filling), `process(values, times)` does
+the same for a whole array and leaves the filter in the same state,
+`reset()` clears the state, and `warmup` is the number of leading samples for
+which a fresh filter produces no output. `process` uses exactly the same arithmetic as
+repeated `update` calls, so streaming and batch results are bit-identical.
+
+Running the module prints a micro-benchmark comparing lag, noise attenuation
+and CPU time per sample:
+
+    python -m core.filters
+"""
+
+FILTER_KINDS = ('moving_average', 'ema', 'savgol', 'one_euro')
+
+
+class MovingAverage:
+    """
+    Moving average over the last `window` samples, kept as a running sum.
+
+    Each (new - oldest) update adds a rounding error, so the sum is recomputed
+    exactly from the window every `window` updates to keep the drift bounded
+    over long sessions. This keeps the cost O(1) per sample on average.
+    """
+    def __init__(self, window, partial=False):
+        """
+        Args:
+            window (int): Number of samples averaged.
+            partial (bool): If True, average the available samples while the
+                            window is filling instead of returning None.
+        """
+        self.window = max(1, int(window))
+        self.partial = partial
+        self.warmup = 0 if partial else self.window - 1
+        self.reset()
+
+    def reset(self):
+        """Clears the window."""
+        self._values = deque()
+        self._sum = 0.0
+        self._since_resync = 0 # Updates of a full window since the sum was recomputed
+
+    def update(self, value, t=None):
+        """
+        Adds a sample.
+
+        Args:
+            value (float): The new sample.
+            t (float, optional): Sample time (unused).
+
+        Returns:
+            float or None: The average, or None while a non-partial window is filling.
+        """
+        if self.window == 1:
+            return value
+        values = self._values
+        if len(values) == self.window:
+            self._sum += value - values.popleft()
+            values.append(value)
+            self._since_resync += 1
+            if self._since_resync >= self.window:
+                self._sum = math.fsum(values)
+                self._since_resync = 0
+        else:
+            self._sum += value
+            values.append(value)
+        count = len(values)
+        if count < self.window and not self.partial:
+            return None
+        return self._sum / count
+
+    def process(self, values, times=None):
+        """
+        Filters an array of samples (vectorized).
+
+        Args:
+            values (array-like): The samples.
+            times (array-like, optional): Sample times (unused).
+
+        Returns:
+            numpy.ndarray: The filtered values, NaN where `update` would return None.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if self.window == 1:
+            return values.copy()
+        # Process up to each resync at once, so the sums match update() exactly
+        out = np.empty(len(values))
+        start = 0
+        while start < len(values):
+            prior = len(self._values)
+            until_resync = (self.window - prior) + self.window - self._since_resync
+            stop = min(len(values), start + until_resync)
+            out[start:stop] = self._process_segment(values[start:stop])
+            start = stop
+        return out
+
+    def _process_segment(self, values):
+        """Vectorized `process` for samples that end at or before the next resync."""
+        window = self.window
+        prior = len(self._values)
+        extended = np.concatenate((np.fromiter(self._values, np.float64, prior), values))
+        positions = np.arange(prior, len(extended))
+
+        # The same (new - oldest) increments as update(), accumulated in order
+        deltas = values.copy()
+        full = positions >= window
+        deltas[full] -= extended[positions[full] - window]
+        sums = np.cumsum(np.concatenate(([self._sum], deltas)))[1:]
+        counts = np.minimum(positions + 1, window)
+
+        self._values = deque(extended[-window:].tolist())
+        self._since_resync += int(np.count_nonzero(full))
+        if self._since_resync >= window:
+            sums[-1] = math.fsum(self._values)
+            self._since_resync = 0
+        self._sum = float(sums[-1])
+
+        out = sums / counts
+        if not self.partial:
+            out[counts < window] = np.nan
+        return out
+
+
+class ExponentialMovingAverage:
+    """Exponential moving average; the first sample initializes the output."""
+    def __init__(self, window=None, alpha=None):
+        """
+        Args:
+            window (int, optional): Moving average window with the equivalent lag;
+                                    used when `alpha` is not given.
+            alpha (float, optional): Smoothing factor in (0, 1].
+        """
+        if alpha is None:
+            alpha = 2.0 / (max(1, int(window or 1)) + 1)
+        self.alpha = min(max(alpha, 1e-6), 1.0)
+        self.warmup = 0
+        self.reset()
+
+    def reset(self):
+        """Clears the state."""
+        self._value = None
+
+    def update(self, value, t=None):
+        """
+        Adds a sample.
+
+        Args:
+            value (float): The new sample.
+            t (float, optional): Sample time (unused).
+
+        Returns:
+            float: The filtered value.
+        """
+        if self._value is None:
+            self._value = value
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+    def process(self, values, times=None):
+        """Filters an array of samples; see `MovingAverage.process`."""
+        return _process_loop(self, values, times)
+
+
+class SavitzkyGolay:
+    """
+    Causal Savitzky-Golay filter: fits a polynomial to the last `window` samples
+    and evaluates it at the newest one.
+
+    The fit only needs the sums S_m = sum(j^m * y_j) over the window (j = 0 for
+    the oldest sample). When the window slides, each S_m is updated from the
+    previous sums with the binomial expansion of (j - 1)^m, so a sample costs
+    O(order^2) regardless of the window. The sums are recomputed exactly every
+    `resync` samples to keep rounding errors from accumulating.
+    """
+    def __init__(self, window, order=2, partial=False, resync=1000):
+        """
+        Args:
+            window (int): Number of samples in the fit (at least order + 1).
+            order (int): Polynomial order (0 to 3).
+            partial (bool): If True, return the plain mean while the window is filling.
+            resync (int): Samples between exact recomputations of the sums.
+        """
+        self.order = min(max(int(order), 0), 3)
+        self.window = max(int(window), self.order + 1)
+        self.partial = partial
+        self.resync = max(1, int(resync))
+        self.warmup = 0 if partial else self.window - 1
+
+        j = np.arange(self.window, dtype=np.float64)
+        powers = np.vstack([j ** m for m in range(self.order + 1)])
+        gram = powers @ powers.T
+        newest = np.array([(self.window - 1.0) ** m for m in range(self.order + 1)])
+        self._coeffs = np.linalg.solve(gram, newest).tolist()
+        self._newest_powers = newest.tolist()
+        self.reset()
+
+    def reset(self):
+        """Clears the window."""
+        self._values = deque()
+        self._sums = [0.0] * (self.order + 1)
+        self._since_resync = 0
+
+    def _recompute(self):
+        """Recomputes the power-weighted sums exactly from the window."""
+        self._sums = [math.fsum((j ** m) * y for j, y in enumerate(self._values))
+                      for m in range(self.order + 1)]
+        self._since_resync = 0
+
+    def update(self, value, t=None):
+        """
+        Adds a sample.
+
+        Args:
+            value (float): The new sample.
+            t (float, optional): Sample time (unused).
+
+        Returns:
+            float or None: The fitted value at the newest sample, or None while a
+                           non-partial window is filling.
+        """
+        values = self._values
+        window = self.window
+        if len(values) < window:
+            values.append(value)
+            self._recompute()
+            count = len(values)
+            if count < window:
+                return self._sums[0] / count if self.partial else None
+        else:
+            oldest = values.popleft()
+            values.append(value)
+            self._since_resync += 1
+            if self._since_resync >= self.resync:
+                self._recompute()
+            else:
+                # S_m' = sum_k C(m,k) (-1)^(m-k) (S_k - [k = 0] * oldest) + (window-1)^m * value
+                sums = self._sums
+                powers = self._newest_powers
+                shifted = sums[0] - oldest
+                updated = [shifted + value]
+                if self.order >= 1:
+                    updated.append(sums[1] - shifted + powers[1] * value)
+                if self.order >= 2:
+                    updated.append(sums[2] - 2.0 * sums[1] + shifted + powers[2] * value)
+                if self.order >= 3:
+                    updated.append(sums[3] - 3.0 * sums[2] + 3.0 * sums[1] - shifted + powers[3] * value)
+                self._sums = updated
+        return sum(c * s for c, s in zip(self._coeffs, self._sums))
+
+    def process(self, values, times=None):
+        """Filters an array of samples; see `MovingAverage.process`."""
+        return _process_loop(self, values, times)
+
+
+class OneEuroFilter:
+    """
+    The 1-Euro filter (Casiez et al., CHI 2012): a first-order low-pass filter
+    whose cutoff frequency rises with the signal's speed.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.05, derivative_cutoff=1.0, rate=100.0):
+        """
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) when the signal is still.
+            beta (float): How fast the cutoff rises with speed.
+            derivative_cutoff (float): Cutoff frequency (Hz) for the speed estimate.
+            rate (float): Sample rate (Hz) assumed when no timestamps are given.
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.period = 1.0 / rate
+        self.warmup = 0
+        self.reset()
+
+    def reset(self):
+        """Clears the state."""
+        self._value = None
+        self._derivative = 0.0
+        self._last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor of a first-order low-pass filter."""
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, value, t=None):
+        """
+        Adds a sample.
+
+        Args:
+            value (float): The new sample.
+            t (float, optional): Sample time in seconds; the nominal rate is used
+                                 when missing or not increasing.
+
+        Returns:
+            float: The filtered value.
+        """
+        if self._value is None:
+            self._value = value
+            self._last_time = t
+            return value
+
+        dt = self.period
+        if t is not None and self._last_time is not None and t > self._last_time:
+            dt = t - self._last_time
+        self._last_time = t
+
+        derivative = (value - self._value) / dt
+        self._derivative += self._alpha(self.derivative_cutoff, dt) * (derivative - self._derivative)
+        cutoff = self.min_cutoff + self.beta * abs(self._derivative)
+        self._value += self._alpha(cutoff, dt) * (value - self._value)
+        return self._value
+
+    def process(self, values, times=None):
+        """Filters an array of samples; see `MovingAverage.process`."""
+        return _process_loop(self, values, times)
+
+
+def _process_loop(filt, values, times):
+    """Filters an array by calling `update` per sample (for recursive filters)."""
+    values = np.asarray(values, dtype=np.float64).tolist()
+    times = [None] * len(values) if times is None else np.asarray(times, dtype=np.float64).tolist()
+    update = filt.update
+    out = [update(v, t) for v, t in zip(values, times)]
+    return np.array([np.nan if v is None else v for v in out], dtype=np.float64)
+
+
+def make_filter(kind, window, partial=False, **params):
+    """
+    Builds a streaming filter.
+
+    Args:
+        kind (str): One of FILTER_KINDS.
+        window (int): Window length (samples); for the EMA it sets the equivalent lag.
+        partial (bool): For windowed filters, produce output while the window fills.
+        **params: Filter-specific options: 'savgol_order', 'one_euro_min_cutoff',
+                  'one_euro_beta'.
+
+    Returns:
+        object: The filter.
+
+    Raises:
+        ValueError: If the kind is unknown.
+    """
+    if kind == 'moving_average':
+        return MovingAverage(window, partial=partial)
+    if kind == 'ema':
+        return ExponentialMovingAverage(window)
+    if kind == 'savgol':
+        return SavitzkyGolay(window, order=params.get('savgol_order', 2), partial=partial)
+    if kind == 'one_euro':
+        return OneEuroFilter(min_cutoff=params.get('one_euro_min_cutoff', 1.0),
+                             beta=params.get('one_euro_beta', 0.05))
+    raise ValueError(f"Unknown filter '{kind}'.")
+
+
+def _benchmark(samples=20000, windows=(7, 31, 101), rate=100.0):
+    """Prints lag, noise attenuation and CPU time per sample for every filter."""
+    import time
+
+    class DequeSum:
+        """The original implementation: sum() over a deque every sample."""
+        def __init__(self, window):
+            self.buffer = deque(maxlen=window)
+        def update(self, value, t=None):
+            self.buffer.append(value)
+            return sum(self.buffer) / len(self.buffer)
+
+    rng = np.random.default_rng(0)
+    times = (np.arange(samples) / rate).tolist()
+    ramp = np.arange(samples, dtype=np.float64).tolist()  # slope of 1 unit per sample
+    noise = rng.normal(0.0, 1.0, samples).tolist()
+
+    print(f"{'filter':<22}{'window':>7}{'lag (samples)':>15}{'noise out/in':>14}{'us/sample':>11}")
+    for window in windows:
+        candidates = [('deque sum (original)', lambda: DequeSum(window))]
+        candidates += [(kind, lambda kind=kind: make_filter(kind, window, partial=True)) for kind in FILTER_KINDS]
+        for name, factory in candidates:
+            filt = factory()
+            started = time.perf_counter()
+            for v, t in zip(noise, times):
+                filt.update(v, t)
+            cost = (time.perf_counter() - started) / samples * 1e6
+
+            filt = factory()
+            out = [filt.update(v, t) for v, t in zip(noise, times)]
+            attenuation = float(np.std(out[samples // 2:]))
+
+            filt = factory()
+            out = [filt.update(v, t) for v, t in zip(ramp, times)]
+            lag = ramp[-1] - out[-1]
+            print(f"{name:<22}{window:>7}{lag:>15.2f}{attenuation:>14.3f}{cost:>11.2f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
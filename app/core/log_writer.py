@@ -0,0 +1,338 @@
+import os
+import csv
+import time
+import queue
+import struct
+import logging
+import threading
+from core.session_io import SessionWriter, CSV_HEADERS
+from core import metrics
+
+# ---------------------
+# File: log_writer.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the SessionLogWriter, a dedicated thread that writes processed
+samples to the session log files.
+
+The DataProcessor only hands each row to a bounded queue, so a slow SD card
+write never delays rep detection. The writer drains the queue in batches,
+flushes on a size/time policy, and fsyncs at set boundaries and on close. If the
+queue is full the row is dropped and counted rather than blocking the caller.
+"""
+
+WRITE_TIME = metrics.histogram('log_write_batch_seconds', "Time to write one batch of rows to the session files.")
+ROWS_WRITTEN = metrics.counter('log_rows_written_total', "Rows written to the session files.")
+FLUSH_TIME = metrics.histogram('log_flush_seconds', "Time to flush (and fsync) the session files.")
+
+
+class _SyncRequest:
+    """Queue marker asking the writer to flush and fsync, then run an optional callback."""
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.done = threading.Event()
+
+
+_STOP = object() # Queue marker asking the writer to drain, sync and exit
+
+
+class SessionLogWriter(threading.Thread):
+    """
+    A background thread that writes logged rows to the binary session file and
+    the optional CSV mirror.
+
+    Rows are tuples in log order: (set, time, reps, angle, velocity, x, y).
+    """
+    def __init__(self, binary_path, csv_path, max_angle, target_angle,
+                 max_queue=4096, batch_size=256, flush_interval=1.0):
+        """
+        Opens the log files and writes their metadata headers.
+
+        Args:
+            binary_path (str or None): Path of the binary session file, or None to skip it.
+            csv_path (str or None): Path of the CSV mirror, or None to skip it.
+            max_angle (float): The calibrated maximum angle.
+            target_angle (float): The target angle threshold.
+            max_queue (int): Capacity of the row queue; rows beyond it are dropped.
+            batch_size (int): Maximum rows written per batch, and the number of
+                              written rows that triggers a flush.
+            flush_interval (float): Maximum seconds between flushes while rows arrive.
+
+        Raises:
+            OSError: If a log file cannot be opened.
+        """
+        super().__init__(daemon=True, name="SessionLogWriter")
+        self.binary_path = binary_path
+        self.csv_path = csv_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.row_queue = queue.Queue(maxsize=max(1, max_queue))
+        self._abandon = threading.Event() # Set by close() when the writer did not drain in time
+
+        self.session_writer = None
+        self.csv_file = None
+        self.csv_writer = None
+        try:
+            if binary_path:
+                self.session_writer = SessionWriter(binary_path, max_angle, target_angle)
+            if csv_path:
+                self.csv_file = open(csv_path, 'w', newline='', encoding='utf-8')
+                self.csv_writer = csv.writer(self.csv_file)
+                # Max and Target Angle metadata, then the data headers
+                self.csv_writer.writerow(['Max', f"{max_angle:.4f}"])
+                self.csv_writer.writerow(['Target', f"{target_angle:.4f}"])
+                self.csv_writer.writerow(CSV_HEADERS)
+        except OSError:
+            self._close_files()
+            raise
+
+        # Statistics (written by the producer or the writer thread, read anywhere)
+        self.rows_submitted = 0
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.max_backlog = 0
+        self.batches_written = 0
+        self._dropped_reported = 0
+
+    def submit(self, row):
+        """
+        Queues a row for writing without ever blocking.
+
+        Args:
+            row (tuple): (set, time, reps, angle, velocity, x, y).
+
+        Returns:
+            bool: True if the row was queued, False if it was dropped because
+                  the queue was full.
+        """
+        try:
+            self.row_queue.put_nowait(row)
+        except queue.Full:
+            self.rows_dropped += 1
+            return False
+        self.rows_submitted += 1
+        backlog = self.row_queue.qsize()
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        return True
+
+    def sync(self, callback=None, wait=False, timeout=5.0):
+        """
+        Requests a flush and fsync of everything queued so far (used at set boundaries).
+
+        Args:
+            callback (callable, optional): Called from the writer thread once the
+                                           data is on disk.
+            wait (bool): If True, block until the sync completed or `timeout` expired.
+            timeout (float): Maximum seconds to wait for queue space and completion.
+
+        Returns:
+            bool: True if the request was queued (and completed, when waiting).
+        """
+        request = _SyncRequest(callback)
+        try:
+            # Control markers must not be dropped, so wait for space in the queue
+            self.row_queue.put(request, timeout=timeout)
+        except queue.Full:
+            logging.error("Session log writer is not draining; sync request skipped.")
+            return False
+        return request.done.wait(timeout) if wait else True
+
+    def close(self, timeout=10.0):
+        """
+        Drains the queue, syncs and closes the log files, and stops the thread.
+
+        If the writer does not finish within `timeout`, what it has written so
+        far is flushed to disk from the calling thread and the writer is told to
+        close the files after its current batch, dropping the rest of the queue.
+
+        Args:
+            timeout (float): Maximum seconds to wait for the writer to finish.
+
+        Returns:
+            bool: True if every queued row was handled and the files are closed;
+                  False if the log files are incomplete.
+        """
+        if self.is_alive():
+            try:
+                self.row_queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logging.error("Session log writer is not draining; dropping the queued rows.")
+                self._abandon.set()
+            self.join(timeout)
+        if self.is_alive():
+            self._abandon.set()
+            self._flush(fsync=True)
+            logging.error(f"Session log writer did not drain within {timeout:g} s; "
+                          f"the queued rows are dropped and the log is incomplete.")
+            return False
+        self._close_files()
+        return not self._abandon.is_set()
+
+    def backlog(self):
+        """
+        Returns:
+            int: The number of rows waiting to be written.
+        """
+        return self.row_queue.qsize()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters describing the writer's throughput and health.
+        """
+        return {
+            'rows_submitted': self.rows_submitted,
+            'rows_written': self.rows_written,
+            'rows_dropped': self.rows_dropped,
+            'backlog': self.backlog(),
+            'max_backlog': self.max_backlog,
+            'batches_written': self.batches_written,
+        }
+
+    def run(self):
+        """
+        The main thread execution loop.
+
+        Collects up to `batch_size` rows at a time, writes them in one pass, and
+        flushes whenever `batch_size` rows were written or `flush_interval` elapsed.
+        Sync requests and the stop marker are handled in queue order.
+        """
+        rows_since_flush = 0
+        last_flush = time.monotonic()
+
+        while not self._abandon.is_set():
+            try:
+                item = self.row_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if rows_since_flush:
+                    self._flush()
+                    rows_since_flush = 0
+                last_flush = time.monotonic()
+                continue
+
+            batch = []
+            control = None
+            while True:
+                if isinstance(item, _SyncRequest) or item is _STOP:
+                    control = item
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.row_queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+                rows_since_flush += len(batch)
+
+            now = time.monotonic()
+            if control is not None:
+                self._flush(fsync=True)
+                rows_since_flush = 0
+                last_flush = now
+                self._report_drops()
+                if control is _STOP:
+                    break
+                if control.callback:
+                    try:
+                        control.callback()
+                    except Exception as e:
+                        logging.error(f"Session log sync callback failed: {e}")
+                control.done.set()
+            elif rows_since_flush >= self.batch_size or now - last_flush >= self.flush_interval:
+                self._flush()
+                rows_since_flush = 0
+                last_flush = now
+
+        if self._abandon.is_set():
+            # Abandoned by close(): what is still queued will never be written
+            while True:
+                try:
+                    item = self.row_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if not (isinstance(item, _SyncRequest) or item is _STOP):
+                    self.rows_dropped += 1
+        self._close_files()
+
+    def _write_batch(self, batch):
+        """Writes a batch of rows to every open log file."""
+        started = time.perf_counter()
+        try:
+            if self.session_writer:
+                batch = self._write_records(batch)
+            if self.csv_writer:
+                self.csv_writer.writerows(
+                    [s, f"{t:.4f}", r, f"{a:.4f}", f"{v:.4f}", f"{x:.4f}", f"{y:.4f}"]
+                    for s, t, r, a, v, x, y in batch
+                )
+            self.rows_written += len(batch)
+            self.batches_written += 1
+            ROWS_WRITTEN.inc(len(batch))
+            WRITE_TIME.observe(time.perf_counter() - started)
+        except (OSError, ValueError, struct.error, OverflowError) as e:
+            self.rows_dropped += len(batch)
+            logging.error(f"Failed to write session log batch: {e}")
+
+    def _write_records(self, batch):
+        """
+        Writes a batch to the binary session, dropping rows that cannot be encoded.
+
+        A row with a non-finite value or a set/rep number outside the record
+        fields is counted in `rows_dropped` instead of failing the whole batch.
+
+        Returns:
+            list: The rows that were written, for the CSV mirror.
+        """
+        written = []
+        error = None
+        for row in batch:
+            try:
+                self.session_writer.write_row(*row)
+            except (ValueError, struct.error, OverflowError) as e:
+                error = e
+                continue
+            written.append(row)
+        if error is not None:
+            self.rows_dropped += len(batch) - len(written)
+            logging.error(f"Dropped {len(batch) - len(written)} session log rows that could not be encoded: {error}")
+        return written
+
+    def _flush(self, fsync=False):
+        """Flushes the log files to the OS, and to the storage device if `fsync` is set."""
+        with FLUSH_TIME.time():
+            self._flush_files(fsync)
+
+    def _flush_files(self, fsync):
+        """Flushes every open log file."""
+        for f in (self.session_writer.file if self.session_writer else None, self.csv_file):
+            if f is None or f.closed:
+                continue
+            try:
+                f.flush()
+                if fsync:
+                    os.fsync(f.fileno())
+            except (OSError, ValueError) as e:
+                logging.error(f"Failed to flush session log: {e}")
+
+    def _report_drops(self):
+        """Logs the rows dropped since the last report."""
+        dropped = self.rows_dropped - self._dropped_reported
+        if dropped:
+            logging.warning(f"Session log writer dropped {dropped} rows (max backlog {self.max_backlog}).")
+            self._dropped_reported = self.rows_dropped
+
+    def _close_files(self):
+        """Closes any open log files."""
+        if self.session_writer:
+            self.session_writer.close(); self.session_writer = None
+        if self.csv_file:
+            self.csv_file.close(); self.csv_file = None; self.csv_writer = None
@@ -0,0 +1,346 @@
+import time
+import threading
+from bisect import bisect_left
+
+# ---------------------
+# File: metrics.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing low-overhead counters, gauges and histograms for the hot paths.
+
+Metrics are created once at import time by the module that updates them and
+registered in the process-wide `registry`:
+
+    SAMPLES = metrics.counter('serial_samples_total', "CoP samples read from the serial port.")
+    ...
+    SAMPLES.inc(len(samples))
+
+An update is a plain attribute increment (Counter) or a bisect plus two
+increments (Histogram), with no lock: each metric has a single writer thread,
+and readers only need a consistent-enough view for display. Gauges can be
+given a callback (e.g. a channel's depth), so they cost nothing until read.
+
+Histograms use fixed bucket bounds. `snapshot()` captures the bucket counts,
+and `quantile(q, since=snapshot)` estimates a quantile over the observations
+made after that snapshot, so a display refreshed every second shows recent
+behaviour rather than the average since startup.
+"""
+
+# Bucket upper bounds in seconds, from 10 us to 2 s (roughly 1-2-5 steps)
+TIME_BUCKETS = (
+    1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3,
+    0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0,
+)
+
+
+class Counter:
+    """A monotonically increasing count, or a callback returning one."""
+    __slots__ = ('name', 'help', 'labels', 'value', '_fn')
+
+    def __init__(self, name, help, labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0
+        self._fn = fn
+
+    def inc(self, amount=1):
+        """
+        Args:
+            amount (int or float): The non-negative increment.
+        """
+        self.value += amount
+
+    def get(self):
+        """
+        Returns:
+            int or float: The current count (0 if the callback fails).
+        """
+        if self._fn is None:
+            return self.value
+        try:
+            return self._fn()
+        except Exception:
+            return 0
+
+
+class Gauge:
+    """A value that can go up and down, set directly or read from a callback."""
+    __slots__ = ('name', 'help', 'labels', 'value', '_fn')
+
+    def __init__(self, name, help, labels=None, fn=None):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.value = 0.0
+        self._fn = fn
+
+    def set(self, value):
+        """
+        Args:
+            value (float): The new value.
+        """
+        self.value = value
+
+    def get(self):
+        """
+        Returns:
+            float: The current value (0 if the callback fails).
+        """
+        if self._fn is None:
+            return self.value
+        try:
+            return self._fn()
+        except Exception:
+            return 0.0
+
+
+class Histogram:
+    """Observation counts in fixed buckets, plus their count and sum."""
+    __slots__ = ('name', 'help', 'labels', 'bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, name, help, labels=None, buckets=TIME_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels or {}
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1) # The last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """
+        Records one observation.
+
+        Args:
+            value (float): The observed value (seconds for time histograms).
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def time(self):
+        """
+        Returns:
+            _Timer: A context manager that observes the duration of its block.
+        """
+        return _Timer(self)
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: (bucket counts, count, sum) at this instant, for `quantile`/`mean`.
+        """
+        return tuple(self.counts), self.count, self.sum
+
+    def _window(self, since):
+        """Returns the bucket counts, count and sum observed after the `since` snapshot."""
+        if since is None:
+            return self.counts, self.count, self.sum
+        old_counts, old_count, old_sum = since
+        return [c - o for c, o in zip(self.counts, old_counts)], self.count - old_count, self.sum - old_sum
+
+    def quantile(self, q, since=None):
+        """
+        Estimates a quantile by linear interpolation inside its bucket.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+            since (tuple, optional): A `snapshot()`; only later observations are used.
+
+        Returns:
+            float or None: The estimate, or None without observations. Values in
+                           the +Inf bucket are reported as the largest bound.
+        """
+        counts, count, _ = self._window(since)
+        if count <= 0:
+            return None
+        rank = q * count
+        seen = 0
+        for i, bucket_count in enumerate(counts):
+            if bucket_count and seen + bucket_count >= rank:
+                if i == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+    def mean(self, since=None):
+        """
+        Args:
+            since (tuple, optional): A `snapshot()`; only later observations are used.
+
+        Returns:
+            float or None: The mean observation, or None without observations.
+        """
+        _, count, total = self._window(since)
+        return total / count if count > 0 else None
+
+
+class _Timer:
+    """Context manager returned by Histogram.time()."""
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, histogram):
+        self._histogram = histogram
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start)
+
+
+class MetricsRegistry:
+    """The set of metrics of a process, keyed by name and labels."""
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock() # Guards registration only, never updates
+
+    def _register(self, cls, name, help, labels, **kwargs):
+        """Returns the metric registered under (name, labels), creating it if needed."""
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None or 'fn' in kwargs:
+                # A new callback replaces the old one (e.g. a channel created for a new routine)
+                metric = cls(name, help, labels, **kwargs)
+                self._metrics[key] = metric
+            return metric
+
+    def counter(self, name, help, labels=None, fn=None):
+        """
+        Args:
+            name (str): The metric name (Prometheus style, e.g. 'serial_samples_total').
+            help (str): One-line description.
+            labels (dict, optional): Label names and values.
+            fn (callable, optional): Returns the count when read.
+
+        Returns:
+            Counter: The registered counter.
+        """
+        return self._register(Counter, name, help, labels, **({'fn': fn} if fn else {}))
+
+    def gauge(self, name, help, labels=None, fn=None):
+        """
+        Args:
+            name (str): The metric name.
+            help (str): One-line description.
+            labels (dict, optional): Label names and values.
+            fn (callable, optional): Returns the value when read.
+
+        Returns:
+            Gauge: The registered gauge.
+        """
+        return self._register(Gauge, name, help, labels, **({'fn': fn} if fn else {}))
+
+    def histogram(self, name, help, labels=None, buckets=TIME_BUCKETS):
+        """
+        Args:
+            name (str): The metric name (e.g. 'frame_seconds').
+            help (str): One-line description.
+            labels (dict, optional): Label names and values.
+            buckets (tuple): Increasing bucket upper bounds.
+
+        Returns:
+            Histogram: The registered histogram.
+        """
+        return self._register(Histogram, name, help, labels, buckets=buckets)
+
+    def get(self, name, **labels):
+        """
+        Args:
+            name (str): The metric name.
+            **labels: The metric's labels.
+
+        Returns:
+            Counter, Gauge, Histogram or None: The metric, if registered.
+        """
+        return self._metrics.get((name, tuple(sorted(labels.items()))))
+
+    def remove(self, name, **labels):
+        """
+        Unregisters a metric, if registered.
+
+        Args:
+            name (str): The metric name.
+            **labels: The metric's labels.
+        """
+        with self._lock:
+            self._metrics.pop((name, tuple(sorted(labels.items()))), None)
+
+    def collect(self):
+        """
+        Returns:
+            list: Every registered metric, sorted by name.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return sorted(metrics, key=lambda m: (m.name, sorted(m.labels.items())))
+
+
+# Process-wide registry
+registry = MetricsRegistry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+
+def register_channel(name, channel):
+    """
+    Publishes a channel's depth, capacity and drop count as callback metrics.
+
+    Works with any channel whose `stats()` reports 'size', 'capacity' and
+    'dropped' (RingChannel, SharedSampleRing, AsyncChannel). Registering a new
+    channel under the same name replaces the previous one.
+
+    Args:
+        name (str): The channel label, e.g. 'serial' or 'plot'.
+        channel (object): The channel to observe.
+    """
+    labels = {'channel': name}
+    gauge('channel_depth', "Items waiting in the channel.", labels, fn=lambda: channel.stats()['size'])
+    gauge('channel_capacity', "Capacity of the channel.", labels, fn=lambda: channel.stats()['capacity'])
+    counter('channel_dropped_total', "Items dropped by the channel's overflow policy.", labels,
+            fn=lambda: channel.stats()['dropped'])
+
+
+def unregister_channel(name):
+    """
+    Removes a channel's metrics, e.g. when no channel of this process carries
+    that stage any more.
+
+    Args:
+        name (str): The channel label.
+    """
+    for metric in ('channel_depth', 'channel_capacity', 'channel_dropped_total'):
+        registry.remove(metric, channel=name)
+
+
+class RateTracker:
+    """Turns counters into per-second rates between successive calls."""
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._last = {}
+
+    def rate(self, metric):
+        """
+        Args:
+            metric (Counter): The counter to differentiate.
+
+        Returns:
+            float: Increments per second since the previous call for this counter
+                   (0 on the first call).
+        """
+        now, value = self._clock(), metric.get()
+        last = self._last.get(id(metric))
+        self._last[id(metric)] = (now, value)
+        if last is None or now <= last[0]:
+            return 0.0
+        return max(0.0, (value - last[1]) / (now - last[0]))
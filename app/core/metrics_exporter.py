@@ -0,0 +1,231 @@
+import os
+import math
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core import metrics
+from core.metrics import Counter, Histogram
+
+# ---------------------
+# File: metrics_exporter.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module exporting the metrics registry (core.metrics) in the Prometheus text
+exposition format, so a local scraper can watch a fleet of units without
+GUI access.
+
+The exporter is opt-in through `[Metrics] exporter`:
+
+    off       (default) nothing is exported
+    http      `MetricsHTTPServer` serves GET /metrics on `http_host:http_port`
+              (loopback by default) from a daemon thread
+    textfile  `TextfileExporter` rewrites `textfile_path` every
+              `textfile_interval` seconds, atomically, for node_exporter's
+              textfile collector or any log shipper
+
+Every metric name gets the `legard_` prefix. Counters and gauges are read at
+scrape time, callbacks included; histograms are exported with cumulative
+`_bucket{le=...}` series plus `_sum` and `_count`. `LogLevelCounter` adds the
+number of log records per level (e.g. warnings about dropped rows).
+"""
+
+PREFIX = 'legard_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+EXPORTER_OFF = 'off'
+EXPORTER_HTTP = 'http'
+EXPORTER_TEXTFILE = 'textfile'
+
+
+def _escape(value):
+    """Escapes a label value."""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(labels, extra=None):
+    """Formats a label set, e.g. {channel="plot"}."""
+    items = list(labels.items()) + (list(extra.items()) if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in items) + '}'
+
+
+def _number(value):
+    """Formats a sample value."""
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+
+
+def format_prometheus(registry=None):
+    """
+    Renders every registered metric in the Prometheus text format.
+
+    Args:
+        registry (MetricsRegistry, optional): Defaults to the process-wide registry.
+
+    Returns:
+        str: The exposition text.
+    """
+    registry = registry or metrics.registry
+    lines = []
+    described = set()
+    for metric in registry.collect():
+        name = PREFIX + metric.name
+        if name not in described:
+            described.add(name)
+            kind = 'counter' if isinstance(metric, Counter) else 'histogram' if isinstance(metric, Histogram) else 'gauge'
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        if isinstance(metric, Histogram):
+            counts, count, total = metric.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(metric.bounds + (math.inf,), counts):
+                cumulative += bucket_count
+                le = '+Inf' if math.isinf(bound) else repr(float(bound))
+                lines.append(f"{name}_bucket{_labels(metric.labels, {'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_labels(metric.labels)} {_number(total)}")
+            lines.append(f"{name}_count{_labels(metric.labels)} {count}")
+        else:
+            lines.append(f"{name}{_labels(metric.labels)} {_number(metric.get())}")
+    return '\n'.join(lines) + '\n'
+
+
+class LogLevelCounter(logging.Handler):
+    """Counts log records per level as `log_messages_total{level=...}`."""
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self._counters = {}
+
+    def emit(self, record):
+        counter = self._counters.get(record.levelname)
+        if counter is None:
+            counter = self._counters[record.levelname] = metrics.counter(
+                'log_messages_total', "Log records by level (warnings and above).", {'level': record.levelname.lower()})
+        counter.inc()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the exposition text on /metrics."""
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = format_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Scrapes are too frequent for the application log."""
+
+
+class MetricsHTTPServer:
+    """A loopback HTTP endpoint for Prometheus scrapes."""
+    def __init__(self, host='127.0.0.1', port=9464):
+        """
+        Args:
+            host (str): Address to bind; keep the loopback address unless a
+                        scraper on another machine must reach the unit.
+            port (int): TCP port (0 picks a free one, see `port`).
+
+        Raises:
+            OSError: If the address cannot be bound.
+        """
+        self._server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsHTTP", daemon=True)
+
+    def start(self):
+        """Starts serving in a daemon thread."""
+        self._thread.start()
+        logging.info(f"Metrics endpoint on http://{self._server.server_address[0]}:{self.port}/metrics")
+
+    def stop(self):
+        """Stops serving and closes the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class TextfileExporter(threading.Thread):
+    """Periodically rewrites a file with the exposition text."""
+    def __init__(self, path, interval=10.0):
+        """
+        Args:
+            path (str): The output file (conventionally ending in .prom).
+            interval (float): Seconds between rewrites.
+        """
+        super().__init__(name="MetricsTextfile", daemon=True)
+        self.path = path
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def write(self):
+        """Writes the file atomically, so readers never see a partial scrape."""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(format_prometheus())
+                f.write(f"# Written {time.strftime('%Y-%m-%dT%H:%M:%S')}\n")
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logging.error(f"Could not write metrics file {self.path}: {e}")
+
+    def run(self):
+        """Rewrites the file every `interval` seconds until stopped, and once more at the end."""
+        while not self._stop_event.wait(self.interval):
+            self.write()
+        self.write()
+
+    def stop(self):
+        """Stops the thread after a final write."""
+        self._stop_event.set()
+
+
+def exporter_from_config(config):
+    """
+    Starts the exporter configured in [Metrics], if any.
+
+    Args:
+        config (configparser.ConfigParser): The application configuration.
+
+    Returns:
+        MetricsHTTPServer, TextfileExporter or None: The running exporter.
+    """
+    mode = config.get('Metrics', 'exporter', fallback=EXPORTER_OFF)
+    if mode not in (EXPORTER_HTTP, EXPORTER_TEXTFILE):
+        return None
+
+    root = logging.getLogger()
+    if not root.handlers:
+        # Adding the counter to an unconfigured root logger would turn any later
+        # basicConfig call into a no-op and silence the application's logging
+        logging.basicConfig(level=config.get('Logging', 'level', fallback='INFO').upper(),
+                            format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+    if not any(isinstance(handler, LogLevelCounter) for handler in root.handlers):
+        root.addHandler(LogLevelCounter())
+    try:
+        if mode == EXPORTER_HTTP:
+            exporter = MetricsHTTPServer(config.get('Metrics', 'http_host', fallback='127.0.0.1'),
+                                         config.getint('Metrics', 'http_port', fallback=9464))
+        else:
+            path = config.get('Metrics', 'textfile_path', fallback='') or os.path.join(
+                config.get('Paths', 'sessions_base_dir', fallback='.'), 'legard.prom')
+            exporter = TextfileExporter(path, config.getfloat('Metrics', 'textfile_interval', fallback=10.0))
+    except OSError as e:
+        logging.error(f"Metrics exporter not started: {e}")
+        return None
+    exporter.start()
+    return exporter
@@ -0,0 +1,272 @@
+import logging
+import multiprocessing
+import queue
+from core.config_manager import config
+from core.shm_ring import SharedSampleRing
+from core.alignment import TimestampedRing
+
+# ---------------------
+# File: pipeline.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the process-isolated acquisition and processing pipeline.
+
+With `[Pipeline] mode = process`, the RoutineWindow hands the serial port over
+to a child process that runs its own SerialThread and the DataProcessor
+(smoothing, rep detection and logging). A long matplotlib redraw or Tk layout
+in the GUI process then no longer holds the GIL that rep detection and logging
+need.
+
+The BNO055 is not reopened in the child: constructing the adafruit driver
+resets the chip, which would clear the fusion state and the gyro and
+magnetometer calibration after CalibrationWindow has taken the baseline angle.
+The GUI process's SensorThread keeps reading it and forwards every timestamped
+quaternion through a second ring; `RelayedSensor` serves them to the child's
+DataProcessor. Both processes stamp readings on the same system-wide
+monotonic clock, so the CoP/angle alignment is unchanged.
+
+    GUI process                                 pipeline process
+    -----------                                 ----------------
+    RoutineWindow --- control queue ----------> DataProcessor.start_set/end_set/...
+    SensorThread ---- SharedSampleRing -------> RelayedSensor (timestamped quaternions)
+    RoutineWindow <-- SharedSampleRing -------- DataProcessor (samples, SET_* commands)
+
+`ProcessPipeline` exposes the DataProcessor methods used by the RoutineWindow
+(start_set, end_set, discard_data, stop, join, is_alive), so the window drives
+either implementation the same way. The default `mode = thread` keeps the
+DataProcessor as a thread of the GUI process.
+"""
+
+MODE_THREAD = 'thread'
+MODE_PROCESS = 'process'
+MODE_ASYNCIO = 'asyncio' # See core.async_core
+PIPELINE_MODES = (MODE_THREAD, MODE_PROCESS, MODE_ASYNCIO)
+
+SENSOR_RING_CAPACITY = 256 # Quaternions in flight to the child (2.5 s at 100 Hz)
+
+
+def pipeline_mode():
+    """
+    Returns:
+        str: The configured pipeline mode, 'thread', 'process' or 'asyncio'.
+    """
+    mode = config.get('Pipeline', 'mode', fallback=MODE_THREAD)
+    return mode if mode in PIPELINE_MODES else MODE_THREAD
+
+
+class ProcessPipeline:
+    """
+    Runs acquisition, processing and logging in a child process and receives
+    its output through a SharedSampleRing (`self.ring`).
+    """
+    def __init__(self, username, serial_settings, sensor_thread, initial_angle=None, max_angle=None):
+        """
+        Prepares the child process; call `start()` to launch it.
+
+        Args:
+            username (str): Current user's username for file logging.
+            serial_settings (dict, optional): SerialThread keyword arguments ('port',
+                                              'baudrate', 'protocol', 'read_mode',
+                                              'read_interval'), or None without a device.
+            sensor_thread (SensorThread, optional): The running SensorThread whose
+                                                    quaternions are forwarded to the child.
+            initial_angle (float, optional): The zeroed baseline angle from calibration.
+            max_angle (float, optional): The maximum angle from calibration.
+        """
+        start_method = config.get('Pipeline', 'start_method', fallback='spawn')
+        context = multiprocessing.get_context(start_method)
+        self._lock = context.Lock()
+        self.ring = SharedSampleRing.create(config.getint('Pipeline', 'ring_capacity', fallback=2048), self._lock)
+
+        self._sensor_thread = sensor_thread
+        self.sensor_ring = None
+        sensor_ring_name = None
+        self._sensor_lock = context.Lock()
+        if sensor_thread:
+            self.sensor_ring = SharedSampleRing.create(SENSOR_RING_CAPACITY, self._sensor_lock)
+            sensor_ring_name = self.sensor_ring.name
+
+        self._control = context.Queue()
+        self._process = context.Process(
+            target=run_pipeline,
+            args=(self.ring.name, self._lock, self._control, username, serial_settings,
+                  sensor_ring_name, self._sensor_lock, initial_angle, max_angle),
+            name="Pipeline",
+            daemon=True
+        )
+
+    def start(self):
+        """Launches the child process and starts forwarding the sensor's quaternions."""
+        if self.sensor_ring:
+            self._sensor_thread.set_forward(self._forward_quaternion)
+        self._process.start()
+        logging.info(f"Pipeline process started (pid {self._process.pid}).")
+
+    def start_set(self):
+        """Asks the child's DataProcessor to start the next set."""
+        self._control.put(('start_set', ()))
+
+    def end_set(self, reason=""):
+        """Asks the child's DataProcessor to end the current set."""
+        self._control.put(('end_set', (reason,)))
+
+    def discard_data(self):
+        """Asks the child to delete the session files when it closes them."""
+        self._control.put(('discard_data', ()))
+
+    def stop(self):
+        """Asks the child to close the session files, release the hardware and exit."""
+        if self.sensor_ring:
+            self._sensor_thread.set_forward(None) # Stopped early, so no reading is forwarded after `join` frees the ring
+        self._control.put(('stop', ()))
+
+    def _forward_quaternion(self, acquired, q):
+        """SensorThread hook: queues a reading for the child as an (acquired, w, x, y, z, 0, 0) record."""
+        self.sensor_ring.put((acquired, q[0], q[1], q[2], q[3], 0, 0))
+
+    def is_alive(self):
+        """
+        Returns:
+            bool: True while the child process is running.
+        """
+        return self._process.is_alive()
+
+    def join(self, timeout=None):
+        """
+        Waits for the child to exit and frees the shared ring.
+
+        Args:
+            timeout (float, optional): Maximum wait in seconds before the child is terminated.
+        """
+        self._process.join(config.getfloat('Pipeline', 'stop_timeout', fallback=10.0) if timeout is None else timeout)
+        if self._process.is_alive():
+            logging.warning("Pipeline process did not stop in time; terminating it.")
+            self._process.terminate()
+            self._process.join()
+        if self.sensor_ring:
+            self._sensor_thread.set_forward(None) # Waits out a put in flight before the ring is freed
+            self.sensor_ring.close()
+        self.ring.close()
+
+
+class RelayedSensor:
+    """
+    Stands in for the SensorThread in the pipeline process, serving the
+    quaternions forwarded by the GUI process's SensorThread.
+
+    The ring is drained on every query, so the readings are as fresh as the
+    forwarding allows without a polling thread.
+    """
+    def __init__(self, ring, history_size=64):
+        """
+        Args:
+            ring (SharedSampleRing): The attached sensor ring.
+            history_size (int): Number of timestamped readings kept for interpolation.
+        """
+        self.ring = ring
+        self.history = TimestampedRing(history_size)
+        self._latest_quaternion = (1.0, 0.0, 0.0, 0.0)
+
+    def _drain(self):
+        """Moves the forwarded readings into the interpolation history."""
+        for acquired, w, x, y, z, _, _ in self.ring.get_many(SENSOR_RING_CAPACITY):
+            self._latest_quaternion = (w, x, y, z)
+            self.history.append(acquired, self._latest_quaternion)
+
+    def get_quaternion(self):
+        """
+        Returns:
+            tuple: The latest forwarded quaternion (w, x, y, z).
+        """
+        self._drain()
+        return self._latest_quaternion
+
+    def get_quaternion_at(self, timestamp):
+        """
+        Estimates the quaternion at a past instant (see SensorThread.get_quaternion_at).
+
+        Args:
+            timestamp (float): The instant on the monotonic clock.
+
+        Returns:
+            tuple: The interpolated (w, x, y, z), or the latest reading.
+        """
+        self._drain()
+        q = self.history.interpolate(timestamp)
+        return q if q is not None else self._latest_quaternion
+
+    def get_reading(self):
+        """Burst readings are not forwarded; always returns None."""
+        return None
+
+
+def run_pipeline(ring_name, lock, control, username, serial_settings, sensor_ring_name, sensor_lock, initial_angle, max_angle):
+    """
+    Entry point of the pipeline process.
+
+    Starts the serial thread and the DataProcessor, then executes the
+    commands received on the control queue until 'stop'.
+
+    Args:
+        ring_name (str): Name of the SharedSampleRing created by the GUI process.
+        lock (multiprocessing.Lock): The ring's lock.
+        control (multiprocessing.Queue): (method name, args) commands for the DataProcessor.
+        username (str): Current user's username for file logging.
+        serial_settings (dict, optional): SerialThread keyword arguments.
+        sensor_ring_name (str, optional): Name of the ring carrying the GUI process's
+                                          quaternions, or None without a sensor.
+        sensor_lock (multiprocessing.Lock): The sensor ring's lock.
+        initial_angle (float, optional): Zeroed angle from calibration.
+        max_angle (float, optional): Max angle from calibration.
+    """
+    # Imported here so the GUI process does not load them twice for nothing
+    from core.channels import channel_from_config
+    from core.data_inputs import SerialThread
+    from core.processing import DataProcessor
+
+    log_level = config.get('Logging', 'level', fallback='INFO').upper()
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(processName)s/%(threadName)s - %(levelname)s - %(message)s')
+
+    ring = SharedSampleRing.attach(ring_name, lock)
+    data_queue = channel_from_config(config, 'serial', 256)
+
+    sensor_ring = SharedSampleRing.attach(sensor_ring_name, sensor_lock) if sensor_ring_name else None
+    sensor = RelayedSensor(sensor_ring) if sensor_ring else None
+
+    serial_thread = None
+    if serial_settings:
+        serial_thread = SerialThread(data_queue=data_queue, **serial_settings)
+        serial_thread.start()
+
+    processor = DataProcessor(sensor, data_queue, ring, username, initial_angle, max_angle)
+    processor.start()
+
+    try:
+        while True:
+            try:
+                name, args = control.get(timeout=1)
+            except queue.Empty:
+                if not processor.is_alive():
+                    break
+                continue
+            if name == 'stop':
+                break
+            if name in ('start_set', 'end_set', 'discard_data'):
+                getattr(processor, name)(*args)
+    except (KeyboardInterrupt, EOFError, OSError):
+        pass
+    finally:
+        processor.stop()
+        processor.join()
+        # Release the serial port before the GUI process takes it back
+        if serial_thread:
+            serial_thread.stop()
+            serial_thread.join(timeout=2)
+        if sensor_ring:
+            sensor_ring.close()
+        ring.close()
+        logging.info("Pipeline process stopped.")
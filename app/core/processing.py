@@ -0,0 +1,324 @@
+import copy
+import threading
+import queue
+import time
+import math
+import os
+import logging
+from datetime import datetime
+from core.config_manager import config
+from core.session_io import BINARY_EXT, CSV_EXT, SESSION_PREFIX
+from core.log_writer import SessionLogWriter
+from core.cop_protocol import parse_cop
+from core.rep_detector import detector_from_config, STATE_NAMES
+from core.session_summary import SessionSummaryBuilder, write_sidecar, sidecar_path
+from core import metrics
+
+# ---------------------
+# File: processing.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module containing the DataProcessor thread for high-frequency data analysis,
+rep counting and session logging.
+
+It has no GUI dependencies, so it runs either as a thread of the GUI process
+(feeding the RoutineWindow through a RingChannel) or inside the pipeline
+process (feeding it through a SharedSampleRing, see core.pipeline).
+"""
+
+PROCESS_TIME = metrics.histogram('processing_sample_seconds', "parse_and_process time per CoP sample.")
+SAMPLES_PROCESSED = metrics.counter('processing_samples_total', "CoP samples handled by the DataProcessor.")
+REPS_COUNTED = metrics.counter('reps_total', "Reps counted by the rep detector.")
+_STATE_TRANSITIONS = {} # (from, to) -> Counter, created on first use
+
+
+def count_state_transition(old_state, new_state):
+    """Counts a rep detector state change as `rep_state_transitions_total{from,to}`."""
+    transition = _STATE_TRANSITIONS.get((old_state, new_state))
+    if transition is None:
+        transition = _STATE_TRANSITIONS[(old_state, new_state)] = metrics.counter(
+            'rep_state_transitions_total', "Transitions of the rep counting state machine.",
+            {'from': STATE_NAMES.get(old_state, old_state), 'to': STATE_NAMES.get(new_state, new_state)})
+    transition.inc()
+
+class DataProcessor(threading.Thread):
+    """
+    A dedicated thread that continuously reads raw data from the shared queue
+    and sensor thread, performs smoothing, calculates velocity, executes the
+    rep counting algorithm, and logs all processed data to the session files.
+    """
+    def __init__(self, sensor_thread, data_queue, plot_queue, username, initial_angle=None, max_angle=None):
+        """
+        Initializes the DataProcessor thread.
+
+        Args:
+            sensor_thread (SensorThread): Active thread for angle data (BNO055).
+            data_queue (RingChannel): Shared channel for serial data (Wii Board/CoP).
+            plot_queue (RingChannel): Output channel to send processed data/commands to the RoutineWindow.
+            username (str): Current user's username for file logging.
+            initial_angle (float, optional): The zeroed baseline angle from calibration.
+            max_angle (float, optional): The maximum angle from calibration (used to set target).
+        """
+        super().__init__(daemon=True)
+        self.running = False
+        self.sensor_thread = sensor_thread
+        self.data_queue = data_queue
+        self.plot_queue = plot_queue
+        self.username = username
+        self.log_writer = None # Background writer for the session log files
+        self.start_time = 0.0
+        self.initial_angle_w = initial_angle
+        self.last_known_angle = 0.0
+        
+        # Rep counting (smoothing, velocity and the state machine live in the RepDetector)
+        self.rep_count = 0
+        
+        self.current_set = 1
+        self.set_active = False
+        
+        self.calibrated_max_angle = max_angle if max_angle is not None else 90.0
+        
+        if self.calibrated_max_angle <= 0:
+            self.target_angle_threshold = 9999.0
+        else:
+            self.MAX_ANGLE_TOLERANCE_PERCENT = config.getfloat('RepCounter', 'max_angle_tolerance_percent', fallback=90.0)
+            self.target_angle_threshold = self.calibrated_max_angle * (self.MAX_ANGLE_TOLERANCE_PERCENT / 100.0)
+
+        # Configuration parameters loaded from config.ini
+        self.detector = detector_from_config(config, self.target_angle_threshold)
+            
+        self.should_save = True
+        self.log_filename = None
+        self.binary_filename = None
+        self.write_binary = config.getboolean('Storage', 'binary_sessions', fallback=True)
+        self.write_csv = config.getboolean('Storage', 'csv_mirror', fallback=False) # Doubles the log I/O when on
+
+        # Running per-set/per-rep statistics, written as a summary sidecar at set boundaries
+        target_val = self.target_angle_threshold if self.target_angle_threshold != 9999.0 else 0.0
+        self.summary_builder = SessionSummaryBuilder(target_val, self.calibrated_max_angle)
+        self.summary_pending = False
+
+    def run(self):
+        """The core thread loop: initializes CSV, reads raw queue, processes data, and logs."""
+        self.running = True
+        self.setup_csv()
+        
+        while self.running:
+            try:
+                if self.summary_pending:
+                    self.write_summary()
+                self.handle_item(self.data_queue.get(timeout=1))
+            except queue.Empty:
+                continue
+            except Exception:
+                time.sleep(0.1)
+                
+        for channel in (self.data_queue, self.plot_queue):
+            logging.info(f"Channel statistics: {channel.stats()}")
+        self.close_csv()
+
+    def handle_item(self, item):
+        """
+        Processes one item from the serial channel: a single sample or the list
+        of samples from one serial read. Items are discarded while no set is active.
+
+        Args:
+            item (tuple or list): (acquisition_time, payload) tuple(s).
+        """
+        if not self.set_active:
+            return
+        clock = time.perf_counter
+        if isinstance(item, list):
+            # A batch of samples from one serial read
+            started = clock()
+            for sample in item:
+                self.parse_and_process(sample)
+                finished = clock()
+                PROCESS_TIME.observe(finished - started)
+                started = finished
+                if not self.set_active: break
+            SAMPLES_PROCESSED.inc(len(item))
+        else:
+            started = clock()
+            self.parse_and_process(item)
+            PROCESS_TIME.observe(clock() - started)
+            SAMPLES_PROCESSED.inc()
+
+    def start_set(self):
+        """Resets rep counting variables, starts the timer, and enables data processing."""
+        logging.info(f"--- Starting Set {self.current_set} ---")
+        self.rep_count = 0
+        self.start_time = time.monotonic()
+        self.detector.reset()
+        self.last_known_angle = 0.0
+        self.set_active = True
+        self.plot_queue.put(f"SET_START:{self.current_set}")
+
+    def end_set(self, reason=""):
+        """Stops data processing for the current set, sends an END command to the GUI, and increments the set counter."""
+        if not self.set_active: return
+        logging.info(f"--- Ending Set {self.current_set} ({reason}) ---")
+        self.set_active = False
+        rep_count_at_stop = self.rep_count
+        self.plot_queue.put(f"SET_END:{self.current_set}:{reason}:{rep_count_at_stop}")
+        self.current_set += 1
+        # The summary is written by the processing thread so file I/O never runs on the GUI thread
+        self.summary_pending = True
+
+    def parse_and_process(self, item):
+        """
+        Parses the raw serial data (CoP text line or binary frame), fetches the angle 
+        from the SensorThread interpolated at the sample's acquisition time,
+        performs smoothing, calculates velocity, runs the rep detection algorithm,
+        sends data to the plot queue, and writes to CSV.
+
+        Args:
+            item (tuple): (acquisition_time, payload) as queued by the SerialThread.
+        """
+        acquired, payload = item
+        # Samples acquired before the set started are stale
+        if acquired < self.start_time: return
+        cop = parse_cop(payload)
+        if not cop: return
+
+        try:
+            x, y = cop
+            if not (-20 < x < 20 and -20 < y < 20): return
+            
+            relative_angle = self.last_known_angle
+            
+            # Read Angle from Sensor Thread
+            if self.sensor_thread:
+                qw = self.sensor_thread.get_quaternion_at(acquired)[0]
+                if qw is not None:
+                    qw = max(min(qw, 1.0), -1.0)
+                    abs_angle = math.acos(qw) * 2 * (180 / math.pi)
+                    
+                    if self.initial_angle_w is None: self.initial_angle_w = abs_angle
+                    angle_candidate = abs_angle - self.initial_angle_w
+                    
+                    if angle_candidate >= 0 and abs(angle_candidate - self.last_known_angle) < 180:
+                        relative_angle = angle_candidate
+                        self.last_known_angle = relative_angle
+
+            # Smoothing, velocity and rep detection
+            current_time = acquired - self.start_time
+            state_before = self.detector.rep_state
+            sample = self.detector.update(current_time, relative_angle)
+            if self.detector.rep_state != state_before:
+                count_state_transition(state_before, self.detector.rep_state)
+            if sample is None: return
+            smoothed_angle, smoothed_velocity = sample.angle, sample.velocity
+            if sample.reps > self.rep_count:
+                REPS_COUNTED.inc(sample.reps - self.rep_count)
+            self.rep_count = sample.reps
+
+            if self.set_active:
+                if sample.set_ended:
+                    self.end_set(reason="3 failed reps")
+                    return
+
+                # Output data
+                data_packet = (current_time, smoothed_angle, smoothed_velocity, x, y, self.rep_count, self.current_set)
+                self.plot_queue.put(data_packet)
+                
+                # Session logging
+                # Formatting and disk writes happen on the log writer thread
+                if self.log_writer:
+                    self.log_writer.submit((self.current_set, current_time, self.rep_count, smoothed_angle, smoothed_velocity, x, y))
+                self.summary_builder.add_sample(self.current_set, current_time, self.rep_count, smoothed_angle, smoothed_velocity, x, y)
+
+        except (ValueError, TypeError):
+            pass
+            
+    def setup_csv(self):
+        """
+        Creates the session directory and starts the background log writer.
+
+        The binary session file (read by the History and Analytics tabs) and the
+        optional CSV mirror (for spreadsheets) share the same timestamped base
+        name and both store the Max and Target angle metadata.
+        """
+        sessions_dir = config.get('Paths', 'sessions_base_dir')
+        user_session_path = os.path.join(sessions_dir, self.username)
+        base_name = os.path.join(user_session_path, f"{SESSION_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        target_val = self.target_angle_threshold if self.target_angle_threshold != 9999.0 else 0.0
+
+        self.binary_filename = base_name + BINARY_EXT if self.write_binary else None
+        self.log_filename = base_name + CSV_EXT if self.write_csv else None
+        if not (self.binary_filename or self.log_filename):
+            return
+
+        try:
+            os.makedirs(user_session_path, exist_ok=True)
+            self.log_writer = SessionLogWriter(
+                self.binary_filename,
+                self.log_filename,
+                self.calibrated_max_angle,
+                target_val,
+                max_queue=config.getint('Storage', 'writer_queue_size', fallback=4096),
+                batch_size=config.getint('Storage', 'writer_batch_size', fallback=256),
+                flush_interval=config.getfloat('Storage', 'writer_flush_interval', fallback=1.0)
+            )
+            self.log_writer.start()
+        except IOError as e:
+            logging.error(f"Could not open session log files: {e}")
+            self.log_writer = None
+
+    def session_paths(self):
+        """Returns the paths of the session log files being written."""
+        return [p for p in (self.binary_filename, self.log_filename) if p]
+
+    def write_summary(self):
+        """
+        Asks the log writer to fsync the rows logged so far and then write the 
+        summary sidecar for the sets recorded so far.
+        """
+        self.summary_pending = False
+        if not self.log_writer or not self.summary_builder.sets:
+            return
+        # A snapshot: the callback runs on the writer thread while reps keep being added here
+        summary = copy.deepcopy(self.summary_builder.summary())
+        summary['log'] = self.log_writer.stats()
+        paths = self.session_paths()
+        self.log_writer.sync(callback=lambda: write_sidecar(paths, summary))
+
+    def close_csv(self):
+        """
+        Stops the log writer (draining and syncing all queued rows), writes the 
+        final summary sidecar unless the log is incomplete, and if `should_save`
+        is False, deletes the files.
+        """
+        if not self.log_writer:
+            return
+        drained = self.log_writer.close()
+        stats = self.log_writer.stats()
+        self.log_writer = None
+        if stats['rows_dropped']:
+            logging.warning(f"Session log dropped {stats['rows_dropped']} of {stats['rows_submitted'] + stats['rows_dropped']} rows.")
+
+        session_paths = self.session_paths()
+        if self.should_save:
+            if not drained:
+                # The summary would describe rows the log does not hold
+                logging.error(f"Session log {session_paths[0]} is incomplete; no summary sidecar written.")
+            elif self.summary_builder.sets:
+                summary = self.summary_builder.summary()
+                summary['log'] = stats
+                write_sidecar(session_paths, summary)
+        else:
+            for path in session_paths + [sidecar_path(session_paths[0])]:
+                try: os.remove(path)
+                except OSError: pass
+
+    def discard_data(self): 
+        """Sets the flag to delete the CSV file upon closing."""
+        self.should_save = False
+        
+    def stop(self): 
+        """Stops the thread's execution loop."""
+        self.running = False
@@ -0,0 +1,407 @@
+import os
+import time
+import argparse
+from collections import namedtuple
+import numpy as np
+from core.config_manager import config
+from core.filters import FILTER_KINDS, make_filter
+from core.session_io import load_session, list_sessions
+
+# ---------------------
+# File: rep_detector.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module containing the rep detection engine: angle smoothing, velocity
+estimation and the 4-state rep counting state machine.
+
+The engine is independent of threads and hardware, so the same code drives
+the live DataProcessor and offline re-scoring:
+
+    * Streaming mode (`RepDetector.update` / `process_chunk`) keeps its state
+      between samples and chunks, exactly as the live session needs.
+    * Batch mode (`RepDetector.detect`) processes a whole session array at once.
+      Smoothing and velocity go through the filters' array path (vectorized for
+      the moving average); the state machine only visits the samples where the
+      velocity class changes, skipping the long runs in which no transition
+      can happen.
+
+The angle and velocity smoothing filters come from core.filters (a running-sum
+moving average by default) and cost O(1) per sample. Their array path uses the
+same arithmetic in the same order as their per-sample path, so both modes
+produce bit-identical results.
+
+Archived sessions log the already-smoothed angle, so `rescore_session` runs the
+velocity and state machine stages on the logged angle (a smoothing window of 1)
+with any new thresholds.
+"""
+
+# The states of the rep counting state machine
+STATE_READY = 0      # Waiting to start a rep (must be still)
+STATE_POSITIVE = 1   # Moving positively (upward)
+STATE_NEGATIVE = 2   # Moving negatively (downward)
+STATE_REVERSAL = 3   # Peak/trough reached, waiting to stop
+
+STATE_NAMES = {STATE_READY: 'ready', STATE_POSITIVE: 'positive', STATE_NEGATIVE: 'negative', STATE_REVERSAL: 'reversal'}
+
+MAX_FAILED_REPS = 3
+
+# One processed sample from the streaming mode
+RepSample = namedtuple('RepSample', ['time', 'angle', 'velocity', 'reps', 'set_ended'])
+
+# The processed samples of a chunk or a whole session, as arrays
+RepTrace = namedtuple('RepTrace', ['time', 'angle', 'velocity', 'reps', 'set_ended'])
+
+
+class RepDetector:
+    """
+    Smoothing, velocity and rep counting for one set.
+
+    Call `reset()` at the start of each set. After three consecutive reps that
+    miss the target angle, the set is ended and further samples are ignored.
+    """
+    def __init__(self, target_angle, smoothing_window=7, velocity_smoothing_window=5,
+                 velocity_pos_threshold=20.0, velocity_neg_threshold=-20.0,
+                 velocity_zero_threshold=10.0, angle_filter='moving_average',
+                 velocity_filter='moving_average', filter_params=None):
+        """
+        Initializes the detector.
+
+        Args:
+            target_angle (float): Peak angle a rep must reach to count as successful.
+            smoothing_window (int): Smoothing window for the angle.
+            velocity_smoothing_window (int): Smoothing window for the velocity.
+            velocity_pos_threshold (float): Velocity (deg/s) above which movement is positive.
+            velocity_neg_threshold (float): Velocity (deg/s) below which movement is negative.
+            velocity_zero_threshold (float): Speed (deg/s) below which the leg is still.
+            angle_filter (str): Angle smoothing filter; one of core.filters.FILTER_KINDS.
+            velocity_filter (str): Velocity smoothing filter; one of core.filters.FILTER_KINDS.
+            filter_params (dict, optional): Extra options passed to `make_filter`.
+        """
+        self.target_angle = target_angle
+        self.smoothing_window = max(1, smoothing_window)
+        self.velocity_smoothing_window = max(1, velocity_smoothing_window)
+        self.pos_threshold = velocity_pos_threshold
+        self.neg_threshold = velocity_neg_threshold
+        self.zero_threshold = velocity_zero_threshold
+        filter_params = filter_params or {}
+        # The angle is only used once its window is full; the velocity window grows from one sample
+        self.angle_filter = make_filter(angle_filter, self.smoothing_window, **filter_params)
+        self.velocity_filter = make_filter(velocity_filter, self.velocity_smoothing_window,
+                                           partial=True, **filter_params)
+        self.reset()
+
+    def reset(self):
+        """Clears the smoothing filters and the rep counting state for a new set."""
+        self.angle_filter.reset()
+        self.velocity_filter.reset()
+        self.is_first_smooth_calc = True
+        self.last_time = 0.0
+        self.last_smoothed_angle = 0.0
+        self.rep_state = STATE_READY
+        self.rep_count = 0
+        self.max_angle_for_current_rep = 0.0
+        self.consecutive_failed_reps = 0
+        self.set_ended = False
+
+    # --- Streaming mode ---
+
+    def update(self, time_s, angle):
+        """
+        Processes one sample.
+
+        Args:
+            time_s (float): Sample time in seconds.
+            angle (float): Relative (unsmoothed) angle in degrees.
+
+        Returns:
+            RepSample or None: The processed sample, or None while the smoothing
+                               window is filling or after the set has ended. When
+                               `set_ended` is True the sample ended the set and
+                               must not be recorded.
+        """
+        if self.set_ended:
+            return None
+
+        # Smoothing
+        smoothed_angle = self.angle_filter.update(angle, time_s)
+        if smoothed_angle is None:
+            return None
+        delta_time = time_s - self.last_time
+
+        # Velocity Calculation
+        raw_velocity = 0.0
+        if self.is_first_smooth_calc:
+            self.is_first_smooth_calc = False
+        elif delta_time > 0:
+            raw_velocity = (smoothed_angle - self.last_smoothed_angle) / delta_time
+
+        smoothed_velocity = self.velocity_filter.update(raw_velocity, time_s)
+
+        self.last_time = time_s
+        self.last_smoothed_angle = smoothed_angle
+
+        # Rep Detection State Machine
+        self._step(smoothed_velocity, smoothed_angle)
+        return RepSample(time_s, smoothed_angle, smoothed_velocity, self.rep_count, self.set_ended)
+
+    def process_chunk(self, times, angles):
+        """
+        Processes a chunk of samples in streaming mode, continuing from the current state.
+
+        Args:
+            times (sequence of float): Sample times in seconds.
+            angles (sequence of float): Relative (unsmoothed) angles in degrees.
+
+        Returns:
+            RepTrace: Arrays for the samples that produced output (the sample that
+                      ended the set, if any, is excluded).
+        """
+        rows = []
+        for time_s, angle in zip(times, angles):
+            sample = self.update(float(time_s), float(angle))
+            if sample is None:
+                continue
+            if sample.set_ended:
+                break
+            rows.append(sample)
+        return _trace_from_rows(rows, self.set_ended)
+
+    def _step(self, velocity, angle):
+        """Advances the state machine by one sample."""
+        state = self.rep_state
+        if state == STATE_READY:
+            if velocity > self.pos_threshold: self.rep_state = STATE_POSITIVE
+            elif velocity < self.neg_threshold: self.rep_state = STATE_NEGATIVE
+        elif state == STATE_POSITIVE:
+            self.max_angle_for_current_rep = max(self.max_angle_for_current_rep, angle)
+            if velocity < self.neg_threshold: self.rep_state = STATE_REVERSAL
+        elif state == STATE_NEGATIVE:
+            self.max_angle_for_current_rep = max(self.max_angle_for_current_rep, angle)
+            if velocity > self.pos_threshold: self.rep_state = STATE_REVERSAL
+        elif state == STATE_REVERSAL:
+            if abs(velocity) < self.zero_threshold:
+                # Rep completed check
+                if self.max_angle_for_current_rep < self.target_angle:
+                    self.consecutive_failed_reps += 1
+                else:
+                    self.consecutive_failed_reps = 0
+                self.rep_count += 1
+                self.rep_state = STATE_READY
+                self.max_angle_for_current_rep = 0.0
+                if self.consecutive_failed_reps >= MAX_FAILED_REPS:
+                    self.set_ended = True
+
+    # --- Batch mode ---
+
+    def detect(self, times, angles):
+        """
+        Processes a whole set at once from a fresh state (vectorized).
+
+        Gives the same results as `reset()` followed by `process_chunk()` and
+        leaves the detector in the same final state.
+
+        Args:
+            times (array-like): Sample times in seconds.
+            angles (array-like): Relative (unsmoothed) angles in degrees.
+
+        Returns:
+            RepTrace: Arrays for the samples that produced output.
+        """
+        self.reset()
+        times = np.asarray(times, dtype=np.float64)
+        angles = np.asarray(angles, dtype=np.float64)
+        warmup = self.angle_filter.warmup
+
+        smoothed = self.angle_filter.process(angles, times)[warmup:]
+        t = times[warmup:]
+        raw_velocity = _raw_velocity(t, smoothed)
+        velocity = self.velocity_filter.process(raw_velocity, t)
+        end, reps = self._run_state_machine(velocity, smoothed)
+
+        # Leave the streaming state as if the samples had been fed one by one
+        consumed = end + 1 if self.set_ended else end
+        if consumed < len(smoothed):
+            # The set ended early: replay only the samples streaming would have consumed
+            self.angle_filter.reset()
+            self.velocity_filter.reset()
+            self.angle_filter.process(angles[:warmup + consumed], times[:warmup + consumed])
+            self.velocity_filter.process(raw_velocity[:consumed], t[:consumed])
+        if consumed:
+            self.is_first_smooth_calc = False
+            self.last_time = float(t[consumed - 1])
+            self.last_smoothed_angle = float(smoothed[consumed - 1])
+
+        return RepTrace(t[:end], smoothed[:end], velocity[:end], reps, self.set_ended)
+
+    def _run_state_machine(self, velocity, angle):
+        """
+        Runs the state machine over precomputed arrays, skipping runs of samples
+        whose velocity class cannot cause a transition.
+
+        Returns:
+            tuple: (number of samples that produced output, rep count after each
+                    of them). The sample that ended the set is not included.
+        """
+        n = len(velocity)
+        pos = velocity > self.pos_threshold
+        neg = velocity < self.neg_threshold
+        still = np.abs(velocity) < self.zero_threshold
+        code = pos.astype(np.int8) | (neg.astype(np.int8) << 1) | (still.astype(np.int8) << 2)
+        run_starts = np.flatnonzero(np.diff(code, prepend=-1))
+        run_ends = np.append(run_starts[1:], n)
+
+        end = n
+        completions = [] # Indices of the samples that completed a rep
+        for start, run_end in zip(run_starts.tolist(), run_ends.tolist()):
+            for i in range(start, run_end):
+                state_before = self.rep_state
+                reps_before = self.rep_count
+                self._step(float(velocity[i]), float(angle[i]))
+                if self.rep_count != reps_before:
+                    completions.append(i)
+                if self.set_ended:
+                    end = i
+                    break
+                if self.rep_state == state_before and self.rep_count == reps_before:
+                    # Fixed point: the rest of the run cannot change the state
+                    if self.rep_state in (STATE_POSITIVE, STATE_NEGATIVE) and i + 1 < run_end:
+                        self.max_angle_for_current_rep = max(
+                            self.max_angle_for_current_rep, float(angle[i + 1:run_end].max()))
+                    break
+            if self.set_ended:
+                break
+
+        reps = np.searchsorted(np.array(completions, dtype=np.int64), np.arange(end), side='right')
+        return end, reps.astype(np.int64)
+
+
+def _raw_velocity(times, smoothed):
+    """Per-sample velocity of the smoothed angle; 0 for the first sample and non-increasing times."""
+    raw = np.zeros(len(smoothed))
+    if len(smoothed) > 1:
+        delta_time = np.diff(times)
+        delta_angle = np.diff(smoothed)
+        valid = delta_time > 0
+        raw[1:][valid] = delta_angle[valid] / delta_time[valid]
+    return raw
+
+
+def _trace_from_rows(rows, set_ended):
+    """Converts a list of RepSample rows into a RepTrace of arrays."""
+    if not rows:
+        empty = np.empty(0)
+        return RepTrace(empty, empty, empty, np.empty(0, dtype=np.int64), set_ended)
+    time_s, angle, velocity, reps, _ = zip(*rows)
+    return RepTrace(np.array(time_s), np.array(angle), np.array(velocity),
+                    np.array(reps, dtype=np.int64), set_ended)
+
+
+def detector_from_config(config, target_angle, **overrides):
+    """
+    Builds a RepDetector from the [RepCounter] section of the configuration.
+
+    Args:
+        config (configparser.ConfigParser): The application configuration.
+        target_angle (float): The target angle threshold.
+        **overrides: Keyword arguments replacing configured values.
+
+    Returns:
+        RepDetector: The configured detector.
+    """
+    params = {
+        'smoothing_window': config.getint('RepCounter', 'smoothing_window', fallback=7),
+        'velocity_smoothing_window': config.getint('RepCounter', 'velocity_smoothing_window', fallback=5),
+        'velocity_pos_threshold': config.getfloat('RepCounter', 'velocity_pos_threshold', fallback=20.0),
+        'velocity_neg_threshold': config.getfloat('RepCounter', 'velocity_neg_threshold', fallback=-20.0),
+        'velocity_zero_threshold': config.getfloat('RepCounter', 'velocity_zero_threshold', fallback=10.0),
+        'angle_filter': config.get('RepCounter', 'smoothing_filter', fallback='moving_average'),
+        'velocity_filter': config.get('RepCounter', 'velocity_smoothing_filter', fallback='moving_average'),
+        'filter_params': {
+            'savgol_order': config.getint('RepCounter', 'savgol_order', fallback=2),
+            'one_euro_min_cutoff': config.getfloat('RepCounter', 'one_euro_min_cutoff', fallback=1.0),
+            'one_euro_beta': config.getfloat('RepCounter', 'one_euro_beta', fallback=0.05),
+        },
+    }
+    params.update(overrides)
+    for key in ('angle_filter', 'velocity_filter'):
+        if params[key] not in FILTER_KINDS:
+            params[key] = 'moving_average'
+    return RepDetector(target_angle, **params)
+
+
+def rescore_session(session, max_angle_tolerance_percent=None, **params):
+    """
+    Re-runs rep detection on a recorded session with new thresholds.
+
+    The log holds the smoothed angle, so the angle smoothing stage is skipped
+    (window of 1); the velocity is recomputed from the logged angle and times
+    and smoothed with `velocity_smoothing_window`.
+
+    Args:
+        session (SessionData): The loaded session.
+        max_angle_tolerance_percent (float, optional): Recomputes the target as this
+            percentage of the session's calibrated max angle. By default the
+            logged target angle is used.
+        **params: RepDetector keyword arguments (thresholds and velocity window).
+
+    Returns:
+        list: One dict per set with 'set', 'logged_reps', 'reps' and 'ended_early'.
+    """
+    max_angle = session.max_angle or 0.0
+    if max_angle <= 0:
+        target = 9999.0 # Same as DataProcessor: no calibration means no rep can succeed
+    elif max_angle_tolerance_percent is not None:
+        target = max_angle * (max_angle_tolerance_percent / 100.0)
+    else:
+        target = session.target_angle or 0.0
+
+    params['smoothing_window'] = 1
+    params['angle_filter'] = 'moving_average' # A window of 1 passes the logged angle through unchanged
+    detector = RepDetector(target, **params)
+    results = []
+    for set_num in session.sets():
+        records = session.set_records(set_num)
+        trace = detector.detect(records['time'], records['angle'])
+        results.append({
+            'set': set_num,
+            'logged_reps': int(records['reps'][-1]) if len(records) else 0,
+            'reps': int(trace.reps[-1]) if len(trace.reps) else detector.rep_count,
+            'ended_early': bool(trace.set_ended),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score recorded LEGARD sessions with new rep detection thresholds.")
+    parser.add_argument('paths', nargs='+', help="Session files or user session directories")
+    parser.add_argument('--pos', type=float, help="Positive velocity threshold (deg/s); defaults to config.ini")
+    parser.add_argument('--neg', type=float, help="Negative velocity threshold (deg/s); defaults to config.ini")
+    parser.add_argument('--zero', type=float, help="Zero velocity threshold (deg/s); defaults to config.ini")
+    parser.add_argument('--velocity-window', type=int, help="Velocity smoothing window; defaults to config.ini")
+    parser.add_argument('--velocity-filter', choices=FILTER_KINDS, help="Velocity smoothing filter; defaults to config.ini")
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="Target as a percentage of the max angle (default: the logged target)")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        files.extend(sorted(list_sessions(path).values()) if os.path.isdir(path) else [path])
+
+    started = time.perf_counter()
+    for path in files:
+        results = rescore_session(
+            load_session(path),
+            max_angle_tolerance_percent=args.tolerance,
+            velocity_pos_threshold=args.pos if args.pos is not None else config.getfloat('RepCounter', 'velocity_pos_threshold', fallback=20.0),
+            velocity_neg_threshold=args.neg if args.neg is not None else config.getfloat('RepCounter', 'velocity_neg_threshold', fallback=-20.0),
+            velocity_zero_threshold=args.zero if args.zero is not None else config.getfloat('RepCounter', 'velocity_zero_threshold', fallback=10.0),
+            velocity_smoothing_window=args.velocity_window or config.getint('RepCounter', 'velocity_smoothing_window', fallback=5),
+            velocity_filter=args.velocity_filter or config.get('RepCounter', 'velocity_smoothing_filter', fallback='moving_average'),
+        )
+        summary = ", ".join(f"set {r['set']}: {r['logged_reps']} -> {r['reps']}{' (ended)' if r['ended_early'] else ''}" for r in results)
+        print(f"{os.path.basename(path)}: {summary}")
+    print(f"Re-scored {len(files)} sessions in {time.perf_counter() - started:.2f} s")
@@ -0,0 +1,138 @@
+import time
+import math
+from collections import deque
+
+# ---------------------
+# File: scheduler.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing DeadlineScheduler, a fixed-rate scheduler for polling loops.
+
+A loop that reads and then sleeps for the period runs slower than intended,
+because the read time and the sleep overshoot are added to every cycle. The
+scheduler instead targets absolute deadlines on a fixed grid
+(start + k * period), so errors do not accumulate and the achieved rate matches
+the target as long as a cycle fits in the period.
+
+When a cycle overruns its period, the missed slots are skipped: the next
+deadline is the next grid point in the future, so the loop never bursts to
+catch up. Overruns and skipped slots are counted, and `stats()` publishes the
+achieved rate and percentiles of the wake-up lateness (jitter).
+
+The scheduler does not sleep by itself in `next_delay`/`woke`, so it drives both
+blocking threads (`wait()`) and asyncio tasks (`await asyncio.sleep(next_delay())`).
+"""
+
+class DeadlineScheduler:
+    """Fixed-rate deadlines with overrun detection and jitter statistics."""
+    def __init__(self, rate, window=1000, clock=time.monotonic):
+        """
+        Initializes the scheduler.
+
+        Args:
+            rate (float): Target rate in Hz.
+            window (int): Number of recent cycles used for the rate and jitter statistics.
+            clock (callable): Monotonic clock returning seconds.
+
+        Raises:
+            ValueError: If the rate is not positive.
+        """
+        if rate <= 0:
+            raise ValueError("DeadlineScheduler rate must be positive.")
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.clock = clock
+        self._lateness = deque(maxlen=window) # Seconds between each deadline and the actual wake-up
+        self._wakes = deque(maxlen=window)    # Wake-up times, for the achieved rate
+        self.start()
+
+    def start(self, now=None):
+        """
+        (Re)starts the deadline grid at `now` and clears the statistics.
+
+        Args:
+            now (float, optional): Start time; defaults to the current clock.
+        """
+        self.origin = self.clock() if now is None else now
+        self._slot = 0
+        self.deadline = self.origin
+        self.cycles = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._lateness.clear()
+        self._wakes.clear()
+
+    def next_delay(self, now=None):
+        """
+        Advances to the next deadline and returns how long to sleep until it.
+
+        Args:
+            now (float, optional): Current time; defaults to the clock.
+
+        Returns:
+            float: Seconds until the next deadline (0 after an overrun).
+        """
+        now = self.clock() if now is None else now
+        self._slot += 1
+        deadline = self.origin + self._slot * self.period
+        if now > deadline:
+            # The cycle overran: skip to the next grid point instead of bursting
+            self.overruns += 1
+            missed = math.floor((now - deadline) / self.period) + 1
+            self.skipped += missed
+            self._slot += missed
+            deadline = self.origin + self._slot * self.period
+        self.deadline = deadline
+        return max(0.0, deadline - now)
+
+    def woke(self, now=None):
+        """
+        Records the actual wake-up time for the current deadline.
+
+        Args:
+            now (float, optional): Current time; defaults to the clock.
+        """
+        now = self.clock() if now is None else now
+        self.cycles += 1
+        self._lateness.append(now - self.deadline)
+        self._wakes.append(now)
+
+    def wait(self):
+        """Sleeps until the next deadline (blocking loops)."""
+        delay = self.next_delay()
+        if delay > 0:
+            time.sleep(delay)
+        self.woke()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Target and achieved rate (Hz), wake-up lateness percentiles (ms)
+                  over the recent window, and total cycles, overruns and skipped slots.
+        """
+        achieved = 0.0
+        if len(self._wakes) > 1:
+            span = self._wakes[-1] - self._wakes[0]
+            achieved = (len(self._wakes) - 1) / span if span > 0 else 0.0
+        lateness = sorted(self._lateness)
+
+        def percentile(p):
+            if not lateness:
+                return 0.0
+            return round(lateness[min(len(lateness) - 1, int(p / 100.0 * len(lateness)))] * 1e3, 3)
+
+        return {
+            'target_hz': round(self.rate, 2),
+            'achieved_hz': round(achieved, 2),
+            'jitter_p50_ms': percentile(50),
+            'jitter_p95_ms': percentile(95),
+            'jitter_p99_ms': percentile(99),
+            'jitter_max_ms': round(lateness[-1] * 1e3, 3) if lateness else 0.0,
+            'cycles': self.cycles,
+            'overruns': self.overruns,
+            'skipped': self.skipped,
+        }
@@ -0,0 +1,675 @@
+import os
+import csv
+import math
+import struct
+import logging
+import numpy as np
+from collections import namedtuple
+
+# ---------------------
+# File: session_io.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module for reading and writing recorded exercise sessions.
+
+Sessions are stored in a compact binary format (`datalog_*.lgs`) made of a
+small fixed header holding the Max/Target metadata, followed by fixed-width
+little-endian records (one per processed sample). Values are logged with four
+decimals, so every measurement is stored as a fixed-point int32 (value * 10^4),
+which keeps each record at 24 bytes while reproducing the logged values
+exactly. The record layout matches `RAW_DTYPE`, so a whole session can be
+memory-mapped and decoded into a NumPy structured array (`SESSION_DTYPE`)
+without any text parsing.
+
+The legacy `datalog_*.csv` format is still supported for reading, and the
+`csv_to_binary` / `binary_to_csv` helpers convert between both formats without
+loss (the only normalisation is that a logged "-0.0000" reads back as 0).
+Running this module as a script exposes the converters on the command line:
+
+    python -m core.session_io export datalog_20260112_092342.lgs
+    python -m core.session_io import datalog_20260112_092342.csv
+
+`open_session_index` opens a session for browsing one set at a time. A single
+pass over the set column (binary) or the set field of each line (CSV) records
+the row range and byte range of every run of a set. `SessionIndex.set_records`
+then reads and decodes only that set's bytes, so neither the whole decoded
+session nor the CSV text is kept in memory.
+"""
+
+BINARY_EXT = '.lgs'
+CSV_EXT = '.csv'
+SESSION_PREFIX = 'datalog_'
+
+CSV_HEADERS = ['Set', 'Time', 'Reps', 'Angle', 'Velocity', 'X', 'Y']
+
+# Header: magic, format version, record size, max angle, target angle, reserved padding
+MAGIC = b'LGRD'
+FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct('<4sHHdd8x')
+
+# One record per sample: set and rep counters, then the fixed-point measurements
+RECORD_STRUCT = struct.Struct('<HHiiiii')
+RAW_DTYPE = np.dtype([
+    ('set', '<u2'),
+    ('reps', '<u2'),
+    ('time', '<i4'),
+    ('angle', '<i4'),
+    ('velocity', '<i4'),
+    ('x', '<i4'),
+    ('y', '<i4'),
+])
+
+# Decoded, in-memory representation of the records
+SESSION_DTYPE = np.dtype([
+    ('set', '<u2'),
+    ('reps', '<u2'),
+    ('time', '<f8'),
+    ('angle', '<f8'),
+    ('velocity', '<f8'),
+    ('x', '<f8'),
+    ('y', '<f8'),
+])
+
+# Maps the CSV header names to the binary column names
+CSV_TO_FIELD = {
+    'Set': 'set', 'Time': 'time', 'Reps': 'reps', 'Angle': 'angle',
+    'Velocity': 'velocity', 'X': 'x', 'Y': 'y'
+}
+
+# Values are logged with 4 decimals and stored as integers of 10^-4 units
+LOG_DECIMALS = 4
+PROGRESS_LINES = 8192 # CSV lines between progress reports while indexing
+SCALE = 10 ** LOG_DECIMALS
+FLOAT_FIELDS = ('time', 'angle', 'velocity', 'x', 'y')
+INT32_MAX = np.iinfo(np.int32).max
+
+# A run of consecutive rows of one set: row range [first_row, end_row) and byte range [start_byte, end_byte)
+SetRun = namedtuple('SetRun', ['set', 'first_row', 'end_row', 'start_byte', 'end_byte'])
+
+
+class SessionData:
+    """
+    An in-memory view of a recorded session.
+
+    Attributes:
+        path (str): The file the session was loaded from.
+        max_angle (float or None): The calibrated maximum angle, if recorded.
+        target_angle (float or None): The saved target angle, if recorded.
+        records (numpy.ndarray): Structured array with `SESSION_DTYPE` fields.
+    """
+    def __init__(self, path, max_angle, target_angle, records):
+        self.path = path
+        self.max_angle = max_angle
+        self.target_angle = target_angle
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def sets(self):
+        """
+        Returns:
+            list: The sorted set numbers present in the session.
+        """
+        if len(self.records) == 0:
+            return []
+        return [int(s) for s in np.unique(self.records['set'])]
+
+    def set_records(self, set_num):
+        """
+        Returns the records that belong to a single set.
+
+        Args:
+            set_num (int): The set number to select.
+
+        Returns:
+            numpy.ndarray: The matching slice of `records`.
+        """
+        return self.records[self.records['set'] == set_num]
+
+
+class SessionIndex:
+    """
+    A session opened through the index of its set boundaries (see `open_session_index`).
+
+    Only the metadata and the index are held in memory; `set_records` reads and
+    decodes the bytes of one set on demand.
+
+    Attributes:
+        path (str): The session file.
+        max_angle (float or None): The calibrated maximum angle, if recorded.
+        target_angle (float or None): The saved target angle, if recorded.
+        runs (list of SetRun): The runs of consecutive rows of each set, in file order.
+        row_count (int): Number of records (CSV: lines with a valid set number).
+    """
+    def __init__(self, path, max_angle, target_angle, runs, row_count, headers=None):
+        self.path = path
+        self.max_angle = max_angle
+        self.target_angle = target_angle
+        self.runs = runs
+        self.row_count = row_count
+        self._headers = headers # CSV only
+
+    def __len__(self):
+        return self.row_count
+
+    def sets(self):
+        """
+        Returns:
+            list: The sorted set numbers present in the session.
+        """
+        return sorted({run.set for run in self.runs})
+
+    def set_ranges(self, set_num):
+        """
+        Args:
+            set_num (int): The set number.
+
+        Returns:
+            list: (first row, end row) of every run of the set.
+        """
+        return [(run.first_row, run.end_row) for run in self.runs if run.set == set_num]
+
+    def set_records(self, set_num):
+        """
+        Reads and decodes the records of a single set.
+
+        Args:
+            set_num (int): The set number to select.
+
+        Returns:
+            numpy.ndarray: The set's records with `SESSION_DTYPE` fields (empty if absent).
+        """
+        parts = [self._read_run(run) for run in self.runs if run.set == set_num]
+        if not parts:
+            return np.empty(0, dtype=SESSION_DTYPE)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def _read_run(self, run):
+        """Decodes the bytes of one run."""
+        if self._headers is None:
+            raw = np.fromfile(self.path, dtype=RAW_DTYPE, count=run.end_row - run.first_row, offset=run.start_byte)
+            return decode_records(raw)
+        with open(self.path, 'rb') as f:
+            f.seek(run.start_byte)
+            text = f.read(run.end_byte - run.start_byte).decode('utf-8')
+        rows = (row for row in csv.reader(text.splitlines()) if len(row) == len(self._headers))
+        return _parse_csv_rows(rows, self._headers)
+
+
+class SessionWriter:
+    """
+    Appends processed samples to a binary session file.
+
+    The header is written once when the file is opened; records are then packed
+    directly into the buffered file object. Because the header does not store a
+    row count, a session cut short by a crash or power loss is still readable up
+    to the last complete record.
+    """
+    def __init__(self, path, max_angle=None, target_angle=None):
+        """
+        Opens the session file and writes the metadata header.
+
+        Args:
+            path (str): Destination file path (normally ending in `BINARY_EXT`).
+            max_angle (float, optional): The calibrated maximum angle.
+            target_angle (float, optional): The target angle threshold.
+        """
+        self.path = path
+        self.file = open(path, 'wb')
+        self.file.write(_pack_header(max_angle, target_angle))
+
+    def write_row(self, set_num, time_s, reps, angle, velocity, x, y):
+        """
+        Packs one sample into the file using the logged precision.
+
+        Args:
+            set_num (int): The set number.
+            time_s (float): Seconds since the start of the set.
+            reps (int): The rep count at this sample.
+            angle (float): The smoothed relative angle.
+            velocity (float): The smoothed angular velocity.
+            x (float): CoP X-coordinate.
+            y (float): CoP Y-coordinate.
+        """
+        self.file.write(RECORD_STRUCT.pack(
+            int(set_num), int(reps),
+            _to_fixed(time_s), _to_fixed(angle), _to_fixed(velocity), _to_fixed(x), _to_fixed(y)
+        ))
+
+    def flush(self):
+        """Pushes buffered records to the operating system."""
+        if self.file:
+            self.file.flush()
+
+    def close(self):
+        """Flushes and closes the underlying file."""
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def _to_fixed(value):
+    """
+    Converts a float to fixed-point units, rounding exactly like the `.4f` CSV format.
+
+    Values beyond the int32 range (e.g. a velocity spike) are clamped to it.
+
+    Raises:
+        ValueError: If the value is NaN or infinite.
+    """
+    if not math.isfinite(value):
+        raise ValueError(f"Cannot store non-finite value {value}")
+    return max(-int(INT32_MAX), min(int(INT32_MAX), round(round(value, LOG_DECIMALS) * SCALE)))
+
+
+def _pack_header(max_angle, target_angle):
+    """Builds the fixed-size file header. Missing metadata is stored as NaN."""
+    max_val = float('nan') if max_angle is None else float(max_angle)
+    target_val = float('nan') if target_angle is None else float(target_angle)
+    return HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, RECORD_STRUCT.size, max_val, target_val)
+
+
+def _nan_to_none(value):
+    """Converts a NaN metadata value back to None."""
+    return None if math.isnan(value) else value
+
+
+def decode_records(raw):
+    """
+    Converts fixed-point records (`RAW_DTYPE`) to float records (`SESSION_DTYPE`).
+
+    Args:
+        raw (numpy.ndarray): Raw records, typically a memory-mapped slice.
+
+    Returns:
+        numpy.ndarray: A new array with `SESSION_DTYPE` fields.
+    """
+    records = np.empty(len(raw), dtype=SESSION_DTYPE)
+    records['set'] = raw['set']
+    records['reps'] = raw['reps']
+    for field in FLOAT_FIELDS:
+        np.divide(raw[field], SCALE, out=records[field], casting='unsafe')
+    return records
+
+
+def encode_records(records):
+    """
+    Converts float records (`SESSION_DTYPE`) to fixed-point records (`RAW_DTYPE`).
+
+    Args:
+        records (numpy.ndarray): Records with `SESSION_DTYPE` fields.
+
+    Returns:
+        numpy.ndarray: A new array with `RAW_DTYPE` fields.
+
+    Raises:
+        ValueError: If a value has more than `LOG_DECIMALS` decimals or does not
+                    fit the fixed-point range, i.e. it cannot be stored losslessly.
+    """
+    raw = np.empty(len(records), dtype=RAW_DTYPE)
+    raw['set'] = records['set']
+    raw['reps'] = records['reps']
+    for field in FLOAT_FIELDS:
+        scaled = np.rint(records[field] * SCALE)
+        if np.any(np.abs(scaled) > INT32_MAX):
+            raise ValueError(f"Column '{field}' exceeds the fixed-point range")
+        raw[field] = scaled
+        if not np.array_equal(raw[field] / SCALE, records[field]):
+            raise ValueError(f"Column '{field}' has more than {LOG_DECIMALS} decimals")
+    return raw
+
+
+def _read_binary_header(path):
+    """
+    Reads and validates the header of a binary session file.
+
+    Returns:
+        tuple: (max angle, target angle, number of complete records).
+
+    Raises:
+        ValueError: If the file is not a valid session file.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_STRUCT.size)
+    if len(header) < HEADER_STRUCT.size:
+        raise ValueError(f"Truncated session header in {path}")
+
+    magic, version, record_size, max_angle, target_angle = HEADER_STRUCT.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a LEGARD session file")
+    if version > FORMAT_VERSION or record_size != RAW_DTYPE.itemsize:
+        raise ValueError(f"Unsupported session format version {version} in {path}")
+
+    # Ignore a trailing partial record (e.g. a session interrupted mid-write)
+    row_count = max(0, (file_size - HEADER_STRUCT.size) // record_size)
+    return _nan_to_none(max_angle), _nan_to_none(target_angle), row_count
+
+
+def read_binary_session(path, use_mmap=True):
+    """
+    Loads a binary session file.
+
+    Args:
+        path (str): Path to a `.lgs` session file.
+        use_mmap (bool): If True the raw records are memory-mapped (read-only)
+                         and decoded in place instead of being read into a buffer.
+
+    Returns:
+        SessionData: The session metadata and records.
+
+    Raises:
+        ValueError: If the file is not a valid session file.
+    """
+    max_angle, target_angle, row_count = _read_binary_header(path)
+    if row_count == 0:
+        raw = np.empty(0, dtype=RAW_DTYPE)
+    elif use_mmap:
+        raw = np.memmap(path, dtype=RAW_DTYPE, mode='r',
+                        offset=HEADER_STRUCT.size, shape=(row_count,))
+    else:
+        raw = np.fromfile(path, dtype=RAW_DTYPE, count=row_count,
+                          offset=HEADER_STRUCT.size)
+
+    return SessionData(path, max_angle, target_angle, decode_records(raw))
+
+
+def read_csv_session(path):
+    """
+    Loads a legacy CSV session file into the same structure as a binary session.
+
+    Rows with a wrong column count or unparsable values are skipped, matching the
+    behaviour of the original CSV readers.
+
+    Args:
+        path (str): Path to a `datalog_*.csv` file.
+
+    Returns:
+        SessionData: The session metadata and records.
+    """
+    max_angle = None
+    target_angle = None
+    headers = None
+    rows = []
+
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if headers is None:
+                # Metadata rows precede the header row
+                if row and row[0] == 'Max':
+                    max_angle = float(row[1])
+                elif row and row[0] == 'Target':
+                    target_angle = float(row[1])
+                elif row and 'Set' in row:
+                    headers = row
+                continue
+
+            if len(row) != len(headers):
+                logging.warning(f"Skipping row with incorrect column count: {row}")
+                continue
+            rows.append(row)
+
+    if headers is None:
+        return SessionData(path, max_angle, target_angle, np.empty(0, dtype=SESSION_DTYPE))
+    return SessionData(path, max_angle, target_angle, _parse_csv_rows(rows, headers))
+
+
+def _parse_csv_rows(rows, headers):
+    """
+    Converts CSV rows to `SESSION_DTYPE` records, skipping rows with unparsable values.
+
+    Args:
+        rows (iterable of list): Rows of strings with one value per header.
+        headers (list): The CSV header row.
+
+    Returns:
+        numpy.ndarray: The parsed records.
+    """
+    # Column index in the CSV row for every binary field (None if the column is absent)
+    field_index = {CSV_TO_FIELD[h]: i for i, h in enumerate(headers) if h in CSV_TO_FIELD}
+    order = [field_index.get(field) for field in SESSION_DTYPE.names]
+    int_fields = [SESSION_DTYPE[field].kind == 'u' for field in SESSION_DTYPE.names]
+
+    parsed = []
+    for row in rows:
+        try:
+            parsed.append(tuple(
+                0 if i is None else (int(float(row[i])) if is_int else float(row[i]))
+                for i, is_int in zip(order, int_fields)
+            ))
+        except ValueError:
+            continue
+
+    return np.array(parsed, dtype=SESSION_DTYPE) if parsed else np.empty(0, dtype=SESSION_DTYPE)
+
+
+def load_session(path, use_mmap=True):
+    """
+    Loads a session file, dispatching on its extension.
+
+    Args:
+        path (str): Path to a `.lgs` or `.csv` session file.
+        use_mmap (bool): Memory-map binary sessions instead of reading them into a buffer.
+
+    Returns:
+        SessionData: The session metadata and records.
+    """
+    if path.endswith(BINARY_EXT):
+        return read_binary_session(path, use_mmap=use_mmap)
+    return read_csv_session(path)
+
+
+def _index_binary_session(path, progress=None):
+    """Builds the set index of a binary session from its set column."""
+    max_angle, target_angle, row_count = _read_binary_header(path)
+    if progress:
+        progress(0, row_count)
+    if row_count == 0:
+        return SessionIndex(path, max_angle, target_angle, [], 0)
+    raw = np.memmap(path, dtype=RAW_DTYPE, mode='r', offset=HEADER_STRUCT.size, shape=(row_count,))
+    set_column = np.array(raw['set'])
+    del raw
+
+    boundaries = np.flatnonzero(np.diff(set_column)) + 1
+    starts = np.concatenate(([0], boundaries)).tolist()
+    ends = np.append(boundaries, row_count).tolist()
+    size = RAW_DTYPE.itemsize
+    runs = [SetRun(int(set_column[start]), start, end, HEADER_STRUCT.size + start * size, HEADER_STRUCT.size + end * size)
+            for start, end in zip(starts, ends)]
+    return SessionIndex(path, max_angle, target_angle, runs, row_count)
+
+
+def _index_csv_session(path, progress=None):
+    """
+    Builds the set index of a CSV session in one pass over its lines.
+
+    Only the set field of each line is parsed; lines with a wrong column count
+    or an invalid set number are skipped (and skipped again when a set is read).
+    `progress` is called with the bytes read so far every PROGRESS_LINES lines.
+    """
+    max_angle = None
+    target_angle = None
+    headers = None
+    runs = []
+    row_count = 0
+    current = None # [set, first row, start byte] of the open run
+    offset = 0
+    file_size = os.path.getsize(path)
+
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f):
+            line_start = offset
+            offset += len(line)
+            if progress and line_number % PROGRESS_LINES == 0:
+                progress(line_start, file_size)
+            if headers is None:
+                row = next(csv.reader([line.decode('utf-8')]), [])
+                # Metadata rows precede the header row
+                if row and row[0] == 'Max':
+                    max_angle = float(row[1])
+                elif row and row[0] == 'Target':
+                    target_angle = float(row[1])
+                elif row and 'Set' in row:
+                    headers = row
+                    set_index = headers.index('Set')
+                continue
+
+            fields = line.rstrip(b'\r\n').split(b',')
+            if len(fields) != len(headers):
+                logging.warning(f"Skipping row with incorrect column count: {line.decode('utf-8', 'replace').rstrip()}")
+                continue
+            try:
+                set_num = int(float(fields[set_index]))
+            except ValueError:
+                continue
+            if current is None or current[0] != set_num:
+                if current is not None:
+                    runs.append(SetRun(current[0], current[1], row_count, current[2], line_start))
+                current = [set_num, row_count, line_start]
+            row_count += 1
+
+    if current is not None:
+        runs.append(SetRun(current[0], current[1], row_count, current[2], offset))
+    return SessionIndex(path, max_angle, target_angle, runs, row_count, headers)
+
+
+def open_session_index(path, progress=None):
+    """
+    Opens a session for set-by-set reading, dispatching on its extension.
+
+    Args:
+        path (str): Path to a `.lgs` or `.csv` session file.
+        progress (callable, optional): Called as progress(done, total) while
+                                       indexing; an exception it raises aborts
+                                       the indexing (e.g. a cancelled load).
+
+    Returns:
+        SessionIndex: The metadata and the set index.
+
+    Raises:
+        ValueError: If a binary file is not a valid session file.
+    """
+    if path.endswith(BINARY_EXT):
+        return _index_binary_session(path, progress)
+    return _index_csv_session(path, progress)
+
+
+def _format_value(value):
+    """
+    Formats a float for CSV export. The logged 4-decimal form is used whenever it
+    reads back to the exact same value; otherwise the shortest exact repr is used.
+    """
+    text = f"{value:.{LOG_DECIMALS}f}"
+    return text if float(text) == value else repr(float(value))
+
+
+def binary_to_csv(bin_path, csv_path=None):
+    """
+    Exports a binary session to the CSV layout written by earlier versions.
+
+    Args:
+        bin_path (str): Source `.lgs` file.
+        csv_path (str, optional): Destination path. Defaults to the source path
+                                  with a `.csv` extension.
+
+    Returns:
+        str: The path of the written CSV file.
+    """
+    if csv_path is None:
+        csv_path = os.path.splitext(bin_path)[0] + CSV_EXT
+    session = read_binary_session(bin_path)
+
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if session.max_angle is not None:
+            writer.writerow(['Max', _format_value(session.max_angle)])
+        if session.target_angle is not None:
+            writer.writerow(['Target', _format_value(session.target_angle)])
+        writer.writerow(CSV_HEADERS)
+        for rec in session.records.tolist():
+            set_num, reps, time_s, angle, velocity, x, y = rec
+            writer.writerow([set_num, _format_value(time_s), reps, _format_value(angle),
+                             _format_value(velocity), _format_value(x), _format_value(y)])
+    return csv_path
+
+
+def csv_to_binary(csv_path, bin_path=None):
+    """
+    Imports a CSV session into the binary format.
+
+    The import is refused (ValueError) if any value cannot be stored exactly,
+    so a converted session always exports back to the same CSV values.
+
+    Args:
+        csv_path (str): Source `.csv` file.
+        bin_path (str, optional): Destination path. Defaults to the source path
+                                  with a `.lgs` extension.
+
+    Returns:
+        str: The path of the written binary file.
+    """
+    if bin_path is None:
+        bin_path = os.path.splitext(csv_path)[0] + BINARY_EXT
+    session = read_csv_session(csv_path)
+
+    # Write to a temporary file first so a failed import never leaves a partial session
+    tmp_path = bin_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_pack_header(session.max_angle, session.target_angle))
+            encode_records(session.records).tofile(f)
+        os.replace(tmp_path, bin_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return bin_path
+
+
+def list_sessions(user_dir):
+    """
+    Finds the recorded sessions in a user's directory.
+
+    When a session exists in both formats the binary file is preferred.
+
+    Args:
+        user_dir (str): The user's session directory.
+
+    Returns:
+        dict: Maps the session timestamp string (`YYYYMMDD_HHMMSS`) to the file path.
+    """
+    sessions = {}
+    if not os.path.isdir(user_dir):
+        return sessions
+
+    for filename in os.listdir(user_dir):
+        stem, ext = os.path.splitext(filename)
+        if not stem.startswith(SESSION_PREFIX) or ext not in (BINARY_EXT, CSV_EXT):
+            continue
+        timestamp = stem[len(SESSION_PREFIX):]
+        if timestamp in sessions and ext != BINARY_EXT:
+            continue
+        sessions[timestamp] = os.path.join(user_dir, filename)
+    return sessions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert LEGARD session files between CSV and binary formats.")
+    parser.add_argument('command', choices=['export', 'import'],
+                        help="'export' writes CSV from binary, 'import' writes binary from CSV")
+    parser.add_argument('paths', nargs='+', help="Session files to convert")
+    args = parser.parse_args()
+
+    for source in args.paths:
+        if args.command == 'export':
+            print(binary_to_csv(source))
+        else:
+            print(csv_to_binary(source))
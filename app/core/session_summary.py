@@ -0,0 +1,412 @@
+import os
+import json
+import logging
+import math
+from core.session_io import load_session
+
+# ---------------------
+# File: session_summary.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module for computing per-session performance summaries and caching them on disk.
+
+The `SessionSummaryBuilder` keeps running per-set and per-rep statistics while
+samples are logged. The DataProcessor feeds it live and writes the result as a
+small sidecar file (`datalog_*.summary.json`) next to the session log, and the
+same builder is used to summarise older sessions that have no sidecar.
+
+The AnalyticsTab only needs a handful of aggregates per session, so instead of
+re-reading every session on each refresh, the `SummaryIndex` keeps those
+aggregates in a small JSON file in the user's session directory. An entry is
+only recomputed when the session file's size or modification time changes, and
+then from the sidecar whenever one is available.
+"""
+
+INDEX_FILENAME = '.session_index.json'
+SIDECAR_SUFFIX = '.summary.json'
+
+# Bump when the summary calculation changes so stale cached entries are recomputed
+SUMMARY_VERSION = 2
+
+# Scalar fields kept in the SummaryIndex (the per-set/per-rep lists stay in the sidecar)
+INDEX_FIELDS = ('target_angle', 'max_angle', 'total_reps', 'avg_pos_velocity',
+                'avg_max_angle', 'avg_time_to_peak', 'sway_path_length', 'sway_rms')
+
+
+class SwayStats:
+    """
+    Running Center of Pressure sway metrics, updated in O(1) per sample.
+
+    Tracks the CoP path length, the RMS distance from the mean CoP position 
+    and the range covered on each axis.
+    """
+    def __init__(self):
+        self.count = 0
+        self.sum_x = self.sum_y = 0.0
+        self.sum_xx = self.sum_yy = 0.0
+        self.path_length = 0.0
+        self.min_x = self.min_y = math.inf
+        self.max_x = self.max_y = -math.inf
+        self.last_point = None
+
+    def add(self, x, y):
+        """
+        Adds one CoP sample.
+
+        Args:
+            x (float): CoP X-coordinate.
+            y (float): CoP Y-coordinate.
+        """
+        self.count += 1
+        self.sum_x += x; self.sum_y += y
+        self.sum_xx += x * x; self.sum_yy += y * y
+        self.min_x = min(self.min_x, x); self.max_x = max(self.max_x, x)
+        self.min_y = min(self.min_y, y); self.max_y = max(self.max_y, y)
+        if self.last_point is not None:
+            self.path_length += math.hypot(x - self.last_point[0], y - self.last_point[1])
+        self.last_point = (x, y)
+
+    def rms(self):
+        """
+        Returns:
+            float: The RMS distance of the CoP from its mean position.
+        """
+        if not self.count:
+            return 0.0
+        mean_x = self.sum_x / self.count
+        mean_y = self.sum_y / self.count
+        variance = (self.sum_xx / self.count - mean_x * mean_x) + (self.sum_yy / self.count - mean_y * mean_y)
+        return math.sqrt(max(variance, 0.0))
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The sway metrics ('sway_path_length', 'sway_rms', 'sway_range_x', 'sway_range_y').
+        """
+        if not self.count:
+            return {'sway_path_length': 0.0, 'sway_rms': 0.0, 'sway_range_x': 0.0, 'sway_range_y': 0.0}
+        return {
+            'sway_path_length': self.path_length,
+            'sway_rms': self.rms(),
+            'sway_range_x': self.max_x - self.min_x,
+            'sway_range_y': self.max_y - self.min_y,
+        }
+
+
+class SessionSummaryBuilder:
+    """
+    Accumulates per-set and per-rep statistics from logged samples.
+
+    Samples are the rows written to the session log (set, time, reps, angle, 
+    velocity, x, y). A rep "segment" is the run of samples sharing the same 
+    rep count; when the rep count increases the previous segment is a completed 
+    rep, and its peak angle and time-to-peak (from the segment start) are recorded.
+    """
+    def __init__(self, target_angle=0.0, max_angle=None):
+        """
+        Args:
+            target_angle (float): The target angle threshold saved with the session.
+            max_angle (float, optional): The calibrated maximum angle.
+        """
+        self.target_angle = target_angle or 0.0
+        self.max_angle = max_angle
+        self.sets = {} # set number -> per-set accumulator dict
+        self.completed_reps = [] # Completed rep records, in order
+        self.segment_peaks = [] # Peak angle (floored at 0) of every (set, rep) segment
+        self.session_sway = SwayStats()
+        self.pos_velocity_sum = 0.0
+        self.pos_velocity_count = 0
+        self._segment = None # [set, reps, start_time, peak_angle, peak_time, last_time]
+
+    def add_sample(self, set_num, time_s, reps, angle, velocity, x, y):
+        """
+        Updates the running statistics with one logged sample.
+
+        Args:
+            set_num (int): The set number.
+            time_s (float): Seconds since the start of the set.
+            reps (int): The rep count at this sample.
+            angle (float): The smoothed relative angle.
+            velocity (float): The smoothed angular velocity.
+            x (float): CoP X-coordinate.
+            y (float): CoP Y-coordinate.
+        """
+        stats = self.sets.get(set_num)
+        if stats is None:
+            stats = self.sets[set_num] = {
+                'reps': 0, 'start': time_s, 'end': time_s, 'samples': 0,
+                'pos_velocity_sum': 0.0, 'pos_velocity_count': 0, 'sway': SwayStats()
+            }
+        stats['reps'] = max(stats['reps'], reps)
+        stats['end'] = time_s
+        stats['samples'] += 1
+        if velocity > 0:
+            stats['pos_velocity_sum'] += velocity
+            stats['pos_velocity_count'] += 1
+            self.pos_velocity_sum += velocity
+            self.pos_velocity_count += 1
+        stats['sway'].add(x, y)
+        self.session_sway.add(x, y)
+
+        # Rep segment tracking
+        segment = self._segment
+        if segment is None or segment[0] != set_num or segment[1] != reps:
+            self._close_segment(completed=segment is not None and segment[0] == set_num and reps > segment[1])
+            self._segment = [set_num, reps, time_s, max(angle, 0.0), time_s, time_s]
+        else:
+            segment[5] = time_s
+            if angle > segment[3]:
+                segment[3] = angle
+                segment[4] = time_s
+
+    def _close_segment(self, completed):
+        """Stores the peak of the current segment, and a rep record if the segment ended with a new rep."""
+        segment = self._segment
+        if segment is None:
+            return
+        set_num, reps, start_time, peak_angle, peak_time, last_time = segment
+        self.segment_peaks.append(peak_angle)
+        if completed:
+            self.completed_reps.append({
+                'set': set_num,
+                'rep': reps + 1,
+                'peak_angle': peak_angle,
+                'time_to_peak': peak_time - start_time,
+                'duration': last_time - start_time,
+            })
+        self._segment = None
+
+    def summary(self):
+        """
+        Builds the summary of everything added so far.
+
+        Returns:
+            dict: Session-level aggregates (see `INDEX_FIELDS`) plus a 'sets' 
+                  list of per-set statistics and a 'reps' list of per-rep 
+                  peak angle and time-to-peak.
+        """
+        segment_peaks = list(self.segment_peaks)
+        if self._segment is not None:
+            segment_peaks.append(self._segment[3])
+
+        sets = []
+        for set_num in sorted(self.sets):
+            stats = self.sets[set_num]
+            entry = {
+                'set': set_num,
+                'reps': stats['reps'],
+                'duration': stats['end'] - stats['start'],
+                'samples': stats['samples'],
+                'mean_pos_velocity': (stats['pos_velocity_sum'] / stats['pos_velocity_count']
+                                      if stats['pos_velocity_count'] else 0.0),
+            }
+            entry.update(stats['sway'].to_dict())
+            sets.append(entry)
+
+        reps = self.completed_reps
+        session_sway = self.session_sway.to_dict()
+        return {
+            'version': SUMMARY_VERSION,
+            'target_angle': self.target_angle,
+            'max_angle': self.max_angle,
+            'total_reps': sum(s['reps'] for s in sets),
+            'avg_pos_velocity': (self.pos_velocity_sum / self.pos_velocity_count
+                                 if self.pos_velocity_count else 0.0),
+            'avg_max_angle': sum(segment_peaks) / len(segment_peaks) if segment_peaks else 0.0,
+            'avg_time_to_peak': (sum(r['time_to_peak'] for r in reps) / len(reps)) if reps else 0.0,
+            'sway_path_length': session_sway['sway_path_length'],
+            'sway_rms': session_sway['sway_rms'],
+            'sets': sets,
+            'reps': reps,
+        }
+
+
+def summarize_session(session):
+    """
+    Calculates the summary of a recorded session by replaying its records 
+    through a `SessionSummaryBuilder`.
+
+    Args:
+        session (SessionData): A loaded session.
+
+    Returns:
+        dict: The session summary (see `SessionSummaryBuilder.summary`).
+    """
+    builder = SessionSummaryBuilder(session.target_angle, session.max_angle)
+    for row in session.records.tolist():
+        builder.add_sample(*row_to_sample(row))
+    return builder.summary()
+
+
+def row_to_sample(row):
+    """Reorders a `SESSION_DTYPE` record (set, reps, time, ...) into `add_sample` argument order."""
+    set_num, reps, time_s, angle, velocity, x, y = row
+    return set_num, time_s, reps, angle, velocity, x, y
+
+
+def sidecar_path(session_path):
+    """
+    Args:
+        session_path (str): Path to a session log (`.lgs` or `.csv`).
+
+    Returns:
+        str: The path of the matching summary sidecar file.
+    """
+    return os.path.splitext(session_path)[0] + SIDECAR_SUFFIX
+
+
+def write_sidecar(session_paths, summary):
+    """
+    Writes a summary sidecar for a session, atomically.
+
+    The sizes of the session log files are stored with the summary so a reader 
+    can tell whether the sidecar still matches the log.
+
+    Args:
+        session_paths (list): The log files of the session (binary and/or CSV).
+        summary (dict): The summary produced by `SessionSummaryBuilder.summary`.
+
+    Returns:
+        str or None: The sidecar path, or None if it could not be written.
+    """
+    paths = [p for p in session_paths if p]
+    if not paths:
+        return None
+    files = {}
+    for path in paths:
+        try:
+            files[os.path.basename(path)] = os.path.getsize(path)
+        except OSError:
+            pass
+
+    out_path = sidecar_path(paths[0])
+    tmp_path = out_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(_round_floats(dict(summary, files=files)), f)
+        os.replace(tmp_path, out_path)
+        return out_path
+    except OSError as e:
+        logging.warning(f"Could not write session summary: {e}")
+        return None
+
+
+def _round_floats(value, digits=4):
+    """Recursively rounds floats (to the logged precision) so sidecars stay small."""
+    if isinstance(value, float):
+        return round(value, digits)
+    if isinstance(value, dict):
+        return {k: _round_floats(v, digits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_round_floats(v, digits) for v in value]
+    return value
+
+
+def read_sidecar(session_path):
+    """
+    Reads the summary sidecar of a session if it exists and still matches the log.
+
+    Args:
+        session_path (str): Path to the session log file.
+
+    Returns:
+        dict or None: The stored summary, or None if missing, outdated or corrupt.
+    """
+    try:
+        with open(sidecar_path(session_path), 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+        size = os.path.getsize(session_path)
+    except (OSError, ValueError):
+        return None
+    if summary.get('version') != SUMMARY_VERSION:
+        return None
+    if summary.get('files', {}).get(os.path.basename(session_path)) != size:
+        return None
+    return summary
+
+
+class SummaryIndex:
+    """
+    A persistent cache of session summaries for one user directory.
+
+    Entries are keyed by the session file name and validated against the file's
+    size and modification time, so refreshing only parses sessions that are new
+    or have changed since the last refresh.
+    """
+    def __init__(self, user_dir):
+        """
+        Initializes the index and loads any existing cache file.
+
+        Args:
+            user_dir (str): The user's session directory.
+        """
+        self.user_dir = user_dir
+        self.index_path = os.path.join(user_dir, INDEX_FILENAME)
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Reads the cache file, discarding it if it is missing, corrupt or outdated."""
+        self.entries = {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == SUMMARY_VERSION:
+                self.entries = data.get('sessions', {})
+        except (OSError, ValueError):
+            pass
+
+    def save(self):
+        """Writes the cache file atomically if any entry changed."""
+        if not self.dirty:
+            return
+        tmp_path = self.index_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': SUMMARY_VERSION, 'sessions': self.entries}, f)
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+        except OSError as e:
+            logging.warning(f"Could not save session summary index: {e}")
+
+    def get(self, path):
+        """
+        Returns the summary for a session file, recomputing it only if the file
+        is not cached or its size or modification time changed. A matching 
+        sidecar is used in place of reading the session log.
+
+        Args:
+            path (str): Path to the session file.
+
+        Returns:
+            dict: The scalar session summary fields (see `INDEX_FIELDS`).
+        """
+        stat = os.stat(path)
+        key = os.path.basename(path)
+        entry = self.entries.get(key)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['summary']
+
+        summary = read_sidecar(path) or summarize_session(load_session(path))
+        summary = {k: summary.get(k) for k in INDEX_FIELDS}
+        self.entries[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'summary': summary}
+        self.dirty = True
+        return summary
+
+    def prune(self, paths):
+        """
+        Removes entries for sessions that no longer exist.
+
+        Args:
+            paths (iterable): The session file paths that are still present.
+        """
+        keep = {os.path.basename(p) for p in paths}
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.dirty = True
@@ -0,0 +1,329 @@
+import time
+import queue
+import struct
+import logging
+from multiprocessing import shared_memory
+
+# ---------------------
+# File: shm_ring.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing SharedSampleRing, a fixed-capacity ring of processed samples
+in `multiprocessing.shared_memory`, used to pass the DataProcessor's output from
+the pipeline process (see core.pipeline) to the RoutineWindow.
+
+The ring carries the same items as the in-process plot channel:
+
+    * processed samples: (time, angle, velocity, x, y, reps, set) tuples
+    * command strings: 'SET_START:...' and 'SET_END:...'
+
+Each item is stored as a fixed 56-byte record, so the GUI copies whole batches
+out of shared memory without any pickling. The head/tail indices and counters
+live in a small header in the same block. Index updates and copies are made
+while holding a `multiprocessing.Lock`; besides excluding the other process,
+the lock acts as a memory barrier, which matters on the Pi's ARM cores.
+
+When the ring is full, the oldest sample is discarded (like the drop_oldest
+RingChannel policy). Queued commands are never discarded: any commands older
+than that sample are shifted forward by one slot instead. A command never
+overwrites another one: if the ring holds only commands, the writer waits up
+to COMMAND_WAIT seconds for the consumer to free a slot, and only then rejects
+the new command (counted as dropped and logged). Commands longer than
+48 bytes are truncated. The class keeps the RingChannel method names and raises
+queue.Empty, so RoutineWindow consumes it unchanged.
+"""
+
+# Header: head, tail, puts, gets, dropped, high_water, capacity (u64 each)
+HEADER_STRUCT = struct.Struct('<7Q')
+HEADER_SIZE = 64
+
+# Record: kind, padding, then either a sample or a UTF-8 command string
+KIND_SAMPLE = 1
+KIND_COMMAND = 2
+SAMPLE_STRUCT = struct.Struct('<I4x5d2i')
+RECORD_SIZE = SAMPLE_STRUCT.size
+COMMAND_OFFSET = 8
+COMMAND_SIZE = RECORD_SIZE - COMMAND_OFFSET
+KIND_STRUCT = struct.Struct('<I')
+
+COMMAND_WAIT = 1.0    # Seconds a command waits for a free slot in a ring full of commands
+COMMAND_POLL = 0.001  # Seconds between retries while waiting
+
+
+class SharedSampleRing:
+    """
+    A bounded ring of processed samples and commands shared between two processes.
+
+    One process creates the ring (`create`) and the other attaches to it by name
+    (`attach`) with the same lock. Any number of writers and readers may use it,
+    but the intended use is one producer (the pipeline's DataProcessor) and one
+    consumer (the GUI).
+    """
+    def __init__(self, shm, lock, owner):
+        """
+        Wraps an existing shared memory block; use `create` or `attach` instead.
+
+        Args:
+            shm (SharedMemory): The block holding the header and records.
+            lock (multiprocessing.Lock): Lock shared by every user of the ring.
+            owner (bool): Whether this side created the block and must unlink it.
+        """
+        self._shm = shm
+        self._lock = lock
+        self._owner = owner
+        self._buf = shm.buf
+        self.capacity = HEADER_STRUCT.unpack_from(self._buf, 0)[6]
+        self.name = shm.name
+
+    @classmethod
+    def create(cls, capacity, lock):
+        """
+        Allocates a new ring.
+
+        Args:
+            capacity (int): Number of records.
+            lock (multiprocessing.Lock): Lock to share with the other process.
+
+        Returns:
+            SharedSampleRing: The ring; pass `ring.name` and the lock to `attach`.
+
+        Raises:
+            ValueError: If the capacity is not positive.
+        """
+        if capacity < 1:
+            raise ValueError("SharedSampleRing capacity must be at least 1.")
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_SIZE + capacity * RECORD_SIZE)
+        HEADER_STRUCT.pack_into(shm.buf, 0, 0, 0, 0, 0, 0, 0, capacity)
+        return cls(shm, lock, owner=True)
+
+    @classmethod
+    def attach(cls, name, lock):
+        """
+        Opens a ring created by another process.
+
+        Args:
+            name (str): The ring's shared memory name.
+            lock (multiprocessing.Lock): The lock passed by the creator.
+
+        Returns:
+            SharedSampleRing: The ring.
+        """
+        return cls(shared_memory.SharedMemory(name=name), lock, owner=False)
+
+    # --- Producer side ---
+
+    def put(self, item, block=True, timeout=None):
+        """
+        Adds a sample tuple or command string, discarding the oldest sample if full.
+
+        Args:
+            item (tuple or str): The item to queue.
+            block (bool): Unused; a put only waits for a command in a ring full of
+                          commands (RingChannel compatibility).
+            timeout (float, optional): Unused.
+        """
+        self.put_many((item,))
+
+    def put_nowait(self, item):
+        """Equivalent to put(item)."""
+        self.put_many((item,))
+
+    def put_many(self, items):
+        """
+        Adds several items under a single lock acquisition.
+
+        Only a command that finds the ring full of commands releases the lock,
+        to wait for the consumer (see COMMAND_WAIT).
+
+        Args:
+            items (iterable): Sample tuples and/or command strings.
+        """
+        records = [self._encode(item) for item in items]
+        buf = self._buf
+        index = 0
+        deadline = None
+        while index < len(records):
+            with self._lock:
+                head, tail, puts, gets, dropped, high_water, capacity = HEADER_STRUCT.unpack_from(buf, 0)
+                while index < len(records):
+                    kind, record = records[index]
+                    if head - tail >= capacity:
+                        if self._discard_oldest_sample(head, tail, capacity):
+                            tail += 1
+                            dropped += 1
+                        elif kind == KIND_SAMPLE:
+                            dropped += 1 # The ring holds only commands; the new sample loses
+                            index += 1
+                            continue
+                        else:
+                            break # Never overwrite a command: wait for the consumer
+                    offset = HEADER_SIZE + (head % capacity) * RECORD_SIZE
+                    buf[offset:offset + RECORD_SIZE] = record
+                    head += 1
+                    puts += 1
+                    index += 1
+                    deadline = None
+                if index < len(records) and deadline is not None and time.monotonic() >= deadline:
+                    dropped += 1 # Nobody freed a slot in time; the new command loses
+                    logging.error(f"Shared ring full of commands; dropped command {self._decode(records[index][1], 0)!r}")
+                    index += 1
+                    deadline = None
+                high_water = max(high_water, head - tail)
+                HEADER_STRUCT.pack_into(buf, 0, head, tail, puts, gets, dropped, high_water, capacity)
+            if index < len(records) and records[index][0] == KIND_COMMAND:
+                if deadline is None:
+                    deadline = time.monotonic() + COMMAND_WAIT
+                time.sleep(COMMAND_POLL)
+
+    def _discard_oldest_sample(self, head, tail, capacity):
+        """
+        Frees the slot at `tail` by discarding the oldest sample (lock held by the caller).
+
+        The commands queued before that sample move forward by one slot, so
+        the caller only has to advance the tail.
+
+        Returns:
+            bool: False if the ring holds only commands (nothing was moved).
+        """
+        buf = self._buf
+        slot = lambda index: HEADER_SIZE + (index % capacity) * RECORD_SIZE
+        for index in range(tail, head):
+            if KIND_STRUCT.unpack_from(buf, slot(index))[0] == KIND_SAMPLE:
+                for older in range(index, tail, -1):
+                    buf[slot(older):slot(older) + RECORD_SIZE] = buf[slot(older - 1):slot(older - 1) + RECORD_SIZE]
+                return True
+        return False
+
+    # --- Consumer side ---
+
+    def get_many(self, max_items):
+        """
+        Removes and returns up to `max_items` of the oldest items without waiting.
+
+        Args:
+            max_items (int): The maximum number of items to return.
+
+        Returns:
+            list: Sample tuples and command strings, oldest first (possibly empty).
+        """
+        buf = self._buf
+        with self._lock:
+            head, tail, puts, gets, dropped, high_water, capacity = HEADER_STRUCT.unpack_from(buf, 0)
+            count = min(max_items, head - tail)
+            if count <= 0:
+                return []
+            # Copy the records out (at most two contiguous slices) before releasing the lock
+            start = tail % capacity
+            first = min(count, capacity - start)
+            data = bytes(buf[HEADER_SIZE + start * RECORD_SIZE:HEADER_SIZE + (start + first) * RECORD_SIZE])
+            if first < count:
+                data += bytes(buf[HEADER_SIZE:HEADER_SIZE + (count - first) * RECORD_SIZE])
+            HEADER_STRUCT.pack_into(buf, 0, head, tail + count, puts, gets + count, dropped, high_water, capacity)
+        return [self._decode(data, i * RECORD_SIZE) for i in range(count)]
+
+    def get_nowait(self):
+        """
+        Removes and returns the oldest item.
+
+        Raises:
+            queue.Empty: If the ring is empty.
+        """
+        items = self.get_many(1)
+        if not items:
+            raise queue.Empty
+        return items[0]
+
+    def get(self, block=False, timeout=None):
+        """Equivalent to get_nowait(); the ring is polled by the GUI and never waits."""
+        return self.get_nowait()
+
+    def clear(self):
+        """Discards every queued record without counting them as drops."""
+        with self._lock:
+            header = list(HEADER_STRUCT.unpack_from(self._buf, 0))
+            header[1] = header[0]
+            HEADER_STRUCT.pack_into(self._buf, 0, *header)
+
+    def qsize(self):
+        """
+        Returns:
+            int: The number of queued records.
+        """
+        head, tail = HEADER_STRUCT.unpack_from(self._buf, 0)[:2]
+        return head - tail
+
+    def empty(self):
+        """
+        Returns:
+            bool: True if no record is queued.
+        """
+        return self.qsize() == 0
+
+    def full(self):
+        """
+        Returns:
+            bool: True if the ring is at its capacity.
+        """
+        return self.qsize() >= self.capacity
+
+    def occupancy(self):
+        """
+        Returns:
+            float: The fill level as a fraction of the capacity.
+        """
+        return self.qsize() / self.capacity
+
+    def stats(self):
+        """
+        Returns:
+            dict: Counters describing the ring's load and losses (shared by both processes).
+        """
+        head, tail, puts, gets, dropped, high_water, capacity = HEADER_STRUCT.unpack_from(self._buf, 0)
+        return {
+            'name': 'shared_ring',
+            'policy': 'drop_oldest',
+            'capacity': capacity,
+            'size': head - tail,
+            'high_water': high_water,
+            'puts': puts,
+            'gets': gets,
+            'dropped': dropped,
+        }
+
+    # --- Lifetime ---
+
+    def close(self):
+        """Detaches from the shared memory; the creator also frees it."""
+        self._buf = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    # --- Encoding ---
+
+    @staticmethod
+    def _encode(item):
+        """Packs an item into a (kind, record bytes) pair."""
+        if isinstance(item, str):
+            text = item.encode('utf-8')[:COMMAND_SIZE]
+            return KIND_COMMAND, KIND_STRUCT.pack(KIND_COMMAND) + bytes(4) + text.ljust(COMMAND_SIZE, b'\0')
+        current_time, angle, velocity, x, y, reps, set_num = item
+        return KIND_SAMPLE, SAMPLE_STRUCT.pack(KIND_SAMPLE, current_time, angle, velocity, x, y, reps, set_num)
+
+    @staticmethod
+    def _decode(data, offset):
+        """Unpacks the record at `offset` into a sample tuple or a command string."""
+        if KIND_STRUCT.unpack_from(data, offset)[0] == KIND_COMMAND:
+            start = offset + COMMAND_OFFSET
+            return data[start:start + COMMAND_SIZE].rstrip(b'\0').decode('utf-8', errors='ignore')
+        return SAMPLE_STRUCT.unpack_from(data, offset)[1:]
@@ -0,0 +1,188 @@
+import sys
+import time
+import threading
+
+# ---------------------
+# File: startup_profile.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the startup profile mode, which shows where the time from
+launch to a usable dashboard goes.
+
+Enabled with `python main.py --profile-startup` or `[Startup] profile = true`.
+`enable` installs an import hook and starts the clock. The application then
+calls `mark(label)` at its milestones (login window shown, dashboard built,
+each tab built, dashboard idle) and `report()` once the dashboard is usable.
+The report lists the milestones in seconds since launch and the slowest
+imports, with the time spent in each module itself and including the modules
+it imported:
+
+    Startup profile (seconds since launch)
+       0.041  login window shown
+       1.214  login
+       1.402  dashboard built
+       ...
+    Slowest imports (self / cumulative ms), 412 modules in 1.630 s
+       81.3 /  402.7  matplotlib.pyplot
+
+When the profile is off, `mark` and `report` do nothing, so the calls can stay
+in place.
+"""
+
+TOP_IMPORTS = 15 # Number of imports listed in the report
+
+_profile = None
+
+
+class _TimedLoader:
+    """Wraps a module loader to time the creation and execution of the module."""
+    def __init__(self, loader, name, timer):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def create_module(self, spec):
+        self._timer.begin(self._name)
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            self._timer.end()
+
+    def exec_module(self, module):
+        self._timer.begin(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer.end()
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer:
+    """A `sys.meta_path` finder that times every module imported after it is installed."""
+    def __init__(self):
+        self.times = {} # Module name -> [self seconds, cumulative seconds]
+        self._local = threading.local() # Per thread: stack of [name, start, seconds spent in nested imports]
+
+    def _stack(self):
+        """Returns the calling thread's stack of modules being imported."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, name, path=None, target=None):
+        """Finds the module with the other finders and wraps its loader."""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, name, self)
+        return spec
+
+    def begin(self, name):
+        """Starts timing a module (nested inside the module being timed, if any)."""
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def end(self):
+        """Stops timing the innermost module and charges its time to its importer."""
+        stack = self._stack()
+        name, start, nested = stack.pop()
+        elapsed = time.perf_counter() - start
+        if stack:
+            stack[-1][2] += elapsed
+        entry = self.times.setdefault(name, [0.0, 0.0])
+        entry[0] += elapsed - nested
+        entry[1] += elapsed
+
+    def install(self):
+        """Puts the timer in front of the other finders."""
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """Stops timing new imports."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class StartupProfile:
+    """Milestone times and import times since launch."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = [] # (label, seconds since launch)
+        self.imports = ImportTimer()
+        self.imports.install()
+
+    def mark(self, label):
+        """Records a milestone at the current time."""
+        self.marks.append((label, time.perf_counter() - self.started))
+
+    def format(self, top=TOP_IMPORTS):
+        """
+        Returns:
+            str: The milestones and the `top` slowest imports by self time.
+        """
+        lines = ["Startup profile (seconds since launch)"]
+        lines += [f"  {seconds:6.3f}  {label}" for label, seconds in self.marks]
+        slowest = sorted(self.imports.times.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        total = sum(self_time for self_time, _ in self.imports.times.values())
+        lines.append(f"Slowest imports (self / cumulative ms), {len(self.imports.times)} modules in {total:.3f} s")
+        lines += [f"  {self_time * 1e3:7.1f} / {cumulative * 1e3:7.1f}  {name}"
+                  for name, (self_time, cumulative) in slowest]
+        return "\n".join(lines)
+
+
+def enable():
+    """Starts profiling; imports from here on are timed."""
+    global _profile
+    if _profile is None:
+        _profile = StartupProfile()
+
+
+def enable_from(argv):
+    """
+    Starts profiling if `--profile-startup` is on the command line or
+    `[Startup] profile` is set.
+
+    Args:
+        argv (list): The command line (sys.argv).
+    """
+    from core.config_manager import config
+    if '--profile-startup' in argv or config.getboolean('Startup', 'profile', fallback=False):
+        enable()
+
+
+def enabled():
+    """Returns True while a profile is being recorded."""
+    return _profile is not None
+
+
+def mark(label):
+    """
+    Records a milestone (no-op unless profiling).
+
+    Args:
+        label (str): What has just become ready.
+    """
+    if _profile is not None:
+        _profile.mark(label)
+
+
+def report():
+    """Prints the profile and stops profiling (no-op unless profiling)."""
+    global _profile
+    if _profile is None:
+        return
+    _profile.imports.uninstall()
+    print(_profile.format())
+    _profile = None
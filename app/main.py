@@ -1,10 +1,15 @@
+import sys
+import logging
+from core import startup_profile
+startup_profile.enable_from(sys.argv) # Before the other imports, so they are timed
 from core import auth_manager
+from core.config_manager import config
 from ui.auth_ui import LoginApp
 
 # ---------------------
 # File: main.py
 # Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
-# Last Modified: 2025-12-12
+# Last Modified: 2026-10-18
 # Version: 2.0.0
 # ---------------------
 
@@ -15,7 +20,15 @@ if __name__ == "__main__":
     This script initializes the necessary file structure for the authentication 
     manager and then launches the graphical user interface (GUI) for the 
     login application.
+
+    Run with `--profile-startup` to print where the startup time goes
+    (see core/startup_profile.py).
     """
+    # Configure logging before anything attaches a handler to the root logger
+    # (e.g. the metrics exporter's log counter), which would disable basicConfig
+    logging.basicConfig(level=config.get('Logging', 'level', fallback='INFO').upper(),
+                        format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
     auth_manager.setup_files()
     app = LoginApp()
+    startup_profile.mark("login window shown")
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,111 @@
+import time
+import logging
+import argparse
+from core.config_manager import config
+from core.cop_protocol import PROTOCOL_TEXT, PROTOCOL_BINARY
+from sim.motion import SimClock, LegRaiseMotion, RecordedMotion, load_recording
+from sim.sensor import FakeBNO055
+from sim.serial_device import VirtualSerialDevice
+
+# ---------------------
+# File: __main__.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Command line entry point of the LEGARD hardware simulator (run from app/).
+
+    python -m sim serve [options]            virtual CoP board only; prints its port
+    python -m sim app [options] [--user U]   the full application on simulated hardware
+
+Options select the motion (`--replay FILE` for an archived session, scripted
+leg raises otherwise), the time scale (`--speed 10` runs ten times faster
+than real time) and the CoP protocol. `app` points [Serial] port at the
+virtual board, gives the Dashboard a FakeBNO055 (wrapped in the configured
+BNO055 driver) and scales [Sensor] rate by the speed, so angle samples per
+simulated second stay the same. These overrides live in memory only.
+"""
+
+def build_hardware(args):
+    """
+    Creates the shared clock, the motion source, the virtual board and the fake sensor.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        tuple: (VirtualSerialDevice, FakeBNO055).
+    """
+    clock = SimClock(args.speed)
+    if args.replay:
+        recording = load_recording(args.replay)
+        logging.info(f"Replaying {args.replay}: {len(recording)} samples, {recording.duration:.1f} s, "
+                     f"{recording.sample_rate:.1f} Hz.")
+        motion = RecordedMotion(recording, loop=not args.once)
+    else:
+        motion = LegRaiseMotion(max_angle=args.max_angle, sample_rate=args.rate or 50.0)
+    device = VirtualSerialDevice(motion, clock, protocol=args.protocol, rate=args.rate)
+    sensor = FakeBNO055(motion, clock, baseline=args.baseline, noise=args.noise)
+    return device, sensor
+
+
+def serve(device):
+    """Runs the virtual board until interrupted, logging its statistics every 5 seconds."""
+    print(device.port, flush=True)
+    try:
+        while device.running:
+            time.sleep(5)
+            logging.info(f"Virtual board: {device.stats()}")
+    except KeyboardInterrupt:
+        pass
+
+
+def run_app(device, sensor, args):
+    """Starts the application with the simulated hardware."""
+    from core import auth_manager
+    from core.bno055 import driver_from_config
+    from ui.dashboard import Dashboard
+    from ui.auth_ui import LoginApp
+
+    config.set('Serial', 'port', device.port)
+    config.set('Serial', 'protocol', args.protocol)
+    rate = config.getfloat('Sensor', 'rate', fallback=100.0)
+    config.set('Sensor', 'rate', str(rate * args.speed))
+
+    Dashboard.open_sensor = staticmethod(lambda task: driver_from_config(config, sensor))
+    auth_manager.setup_files()
+    if args.user:
+        Dashboard(args.user, args.user, '').mainloop()
+    else:
+        LoginApp().mainloop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the LEGARD CoP board and BNO055 sensor.")
+    parser.add_argument('command', choices=['serve', 'app'],
+                        help="'serve' runs only the virtual board, 'app' runs the application on simulated hardware")
+    parser.add_argument('--replay', help="Archived GyroCOPFinal log or datalog_* session to replay")
+    parser.add_argument('--once', action='store_true', help="Stop at the end of the recording instead of looping")
+    parser.add_argument('--speed', type=float, default=1.0, help="Simulation speed relative to real time")
+    parser.add_argument('--protocol', choices=[PROTOCOL_TEXT, PROTOCOL_BINARY], default=PROTOCOL_TEXT)
+    parser.add_argument('--rate', type=float, help="CoP samples per simulated second (default: the recording's rate, or 50)")
+    parser.add_argument('--max-angle', type=float, default=25.0, help="Peak angle of the scripted leg raises")
+    parser.add_argument('--baseline', type=float, default=10.0, help="Resting angle of the simulated sensor")
+    parser.add_argument('--noise', type=float, default=0.05, help="Angle noise (degrees, standard deviation)")
+    parser.add_argument('--user', help="Open the Dashboard for this username without logging in ('app' only)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=config.get('Logging', 'level', fallback='INFO').upper(),
+                        format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
+    device, sensor = build_hardware(args)
+    device.start()
+    try:
+        if args.command == 'serve':
+            serve(device)
+        else:
+            run_app(device, sensor, args)
+    finally:
+        logging.info(f"Virtual board: {device.stats()}")
+        device.stop()
@@ -0,0 +1,241 @@
+import os
+import csv
+import math
+import time
+import numpy as np
+from core.session_io import load_session
+
+# ---------------------
+# File: motion.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing the motion sources that drive the virtual LEGARD hardware.
+
+A motion source maps a simulation time (seconds) to a leg angle (degrees,
+relative to the resting leg) and a Center of Pressure position, through
+`sample(t) -> (angle, x, y)`. `VirtualSerialDevice` and `FakeBNO055` read the
+same source on the same `SimClock`, so the CoP stream and the quaternions
+stay consistent, as they would with one person on the real board.
+
+    LegRaiseMotion   scripted raise / hold / lower / rest cycles
+    RecordedMotion   a recorded session, interpolated and optionally looped
+
+`load_recording` reads both archived formats: the `GyroCOPFinal` test logs
+(Time, Angle, X, Y) and the application's `datalog_*` sessions (CSV or
+binary), whose sets are laid end to end with a rest period in between.
+"""
+
+class SimClock:
+    """Simulation time that runs `speed` times faster than the monotonic clock."""
+    def __init__(self, speed=1.0):
+        """
+        Args:
+            speed (float): Simulation seconds per real second.
+
+        Raises:
+            ValueError: If the speed is not positive.
+        """
+        if speed <= 0:
+            raise ValueError("SimClock speed must be positive.")
+        self.speed = speed
+        self.reset()
+
+    def reset(self):
+        """Restarts the simulation time at 0."""
+        self.origin = time.monotonic()
+
+    def now(self):
+        """
+        Returns:
+            float: Simulation seconds since the clock was created.
+        """
+        return (time.monotonic() - self.origin) * self.speed
+
+
+class LegRaiseMotion:
+    """
+    Scripted leg raises: cosine ramps up to the peak, a hold, a ramp down and
+    a rest, repeated forever. The CoP sways slowly and shifts with the angle.
+    """
+    def __init__(self, max_angle=25.0, raise_time=1.0, hold_time=0.5, lower_time=1.0, rest_time=1.5,
+                 sample_rate=50.0, sway=0.05, shift=0.4):
+        """
+        Args:
+            max_angle (float): Peak angle of every rep, in degrees.
+            raise_time (float): Seconds from rest to the peak.
+            hold_time (float): Seconds held at the peak.
+            lower_time (float): Seconds from the peak back to rest.
+            rest_time (float): Seconds at rest between reps.
+            sample_rate (float): CoP samples per simulation second.
+            sway (float): Amplitude of the slow CoP sway.
+            shift (float): CoP x offset at the peak angle.
+        """
+        self.max_angle = max_angle
+        self.raise_time = raise_time
+        self.hold_time = hold_time
+        self.lower_time = lower_time
+        self.rest_time = rest_time
+        self.period = raise_time + hold_time + lower_time + rest_time
+        self.sample_rate = sample_rate
+        self.sway = sway
+        self.shift = shift
+        self.duration = None # Endless
+
+    def angle(self, t):
+        """
+        Args:
+            t (float): Simulation time in seconds.
+
+        Returns:
+            float: The leg angle in degrees.
+        """
+        phase = t % self.period
+        if phase < self.raise_time:
+            return self.max_angle * (1 - math.cos(math.pi * phase / self.raise_time)) / 2
+        phase -= self.raise_time
+        if phase < self.hold_time:
+            return self.max_angle
+        phase -= self.hold_time
+        if phase < self.lower_time:
+            return self.max_angle * (1 + math.cos(math.pi * phase / self.lower_time)) / 2
+        return 0.0
+
+    def sample(self, t):
+        """
+        Args:
+            t (float): Simulation time in seconds.
+
+        Returns:
+            tuple: (angle, x, y) at time t.
+        """
+        angle = self.angle(t)
+        x = self.sway * math.sin(0.7 * t) + self.shift * angle / self.max_angle
+        y = self.sway * math.cos(0.45 * t)
+        return angle, x, y
+
+
+class Recording:
+    """
+    A recorded session flattened to one continuous timeline.
+
+    Attributes:
+        path (str): The source file.
+        times (numpy.ndarray): Sample times in seconds, starting at 0.
+        angles (numpy.ndarray): Relative angles in degrees.
+        x (numpy.ndarray): CoP x coordinates.
+        y (numpy.ndarray): CoP y coordinates.
+    """
+    def __init__(self, path, times, angles, x, y):
+        self.path = path
+        self.times = times
+        self.angles = angles
+        self.x = x
+        self.y = y
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def duration(self):
+        """float: Seconds between the first and the last sample."""
+        return float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def sample_rate(self):
+        """float: The mean number of samples per second."""
+        return (len(self.times) - 1) / self.duration if self.duration > 0 else 0.0
+
+
+def _read_gyro_cop_csv(path):
+    """Reads an archived `GyroCOPFinal` log (Time, Angle, X, Y). Unparsable rows are skipped."""
+    rows = []
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None) # Header
+        for row in reader:
+            try:
+                rows.append([float(value) for value in row[:4]])
+            except (ValueError, IndexError):
+                continue
+    data = np.array(rows, dtype=float).reshape(-1, 4)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3]
+
+
+def _read_datalog(path, set_gap):
+    """Reads a `datalog_*` session and lays its sets end to end, `set_gap` seconds apart."""
+    records = load_session(path).records
+    times, angles, xs, ys = [], [], [], []
+    offset = 0.0
+    for set_num in np.unique(records['set']):
+        rows = records[records['set'] == set_num]
+        set_times = rows['time'] - rows['time'][0]
+        times.append(set_times + offset)
+        angles.append(rows['angle'])
+        xs.append(rows['x'])
+        ys.append(rows['y'])
+        offset += set_times[-1] + set_gap
+    if not times:
+        return (np.empty(0),) * 4
+    return np.concatenate(times), np.concatenate(angles), np.concatenate(xs), np.concatenate(ys)
+
+
+def load_recording(path, set_gap=3.0):
+    """
+    Loads an archived session as a Recording.
+
+    Args:
+        path (str): A `GyroCOPFinal` CSV log, or a `datalog_*.csv`/`.lgs` session.
+        set_gap (float): Rest seconds inserted between the sets of a session.
+
+    Returns:
+        Recording: The samples in time order, with times starting at 0.
+
+    Raises:
+        ValueError: If the file holds fewer than two samples.
+    """
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+    if first_line.startswith(b'Time,'):
+        times, angles, xs, ys = _read_gyro_cop_csv(path)
+    else:
+        times, angles, xs, ys = _read_datalog(path, set_gap)
+    if len(times) < 2:
+        raise ValueError(f"Recording {os.path.basename(path)} has fewer than two samples.")
+
+    # Archived logs occasionally repeat or reorder timestamps
+    order = np.argsort(times, kind='stable')
+    times = times[order] - times[order][0]
+    return Recording(path, times, angles[order], xs[order], ys[order])
+
+
+class RecordedMotion:
+    """Replays a Recording, interpolating between its samples."""
+    def __init__(self, recording, loop=True):
+        """
+        Args:
+            recording (Recording): The session to replay.
+            loop (bool): Start over at the end instead of holding the last sample.
+        """
+        self.recording = recording
+        self.loop = loop
+        self.sample_rate = recording.sample_rate
+        self.duration = None if loop else recording.duration
+
+    def sample(self, t):
+        """
+        Args:
+            t (float): Simulation time in seconds.
+
+        Returns:
+            tuple: (angle, x, y) at time t.
+        """
+        rec = self.recording
+        if self.loop and rec.duration > 0:
+            t %= rec.duration
+        return (float(np.interp(t, rec.times, rec.angles)),
+                float(np.interp(t, rec.times, rec.x)),
+                float(np.interp(t, rec.times, rec.y)))
@@ -0,0 +1,130 @@
+import math
+import time
+import random
+import struct
+import threading
+from core.bno055 import FUSION_MODES
+
+# ---------------------
+# File: sensor.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing FakeBNO055, a stand-in for the adafruit BNO055 object.
+
+The fake turns the angle of a motion source (see sim.motion) into the
+quaternion of a rotation about the x axis, on top of a resting `baseline`
+angle, so `acos(w) * 2` gives back baseline + angle as the DataProcessor
+expects. It has the adafruit properties the application reads (`quaternion`,
+`mode`, `calibration_status`, ...) and an `i2c_device` that answers register
+reads, so the burst driver in core.bno055 runs unchanged on top of it.
+"""
+
+NDOF_MODE = FUSION_MODES[-1]
+QUATERNION_SCALE = 1 << 14
+
+
+class FakeI2CDevice:
+    """Answers `write_then_readinto` register reads from a FakeBNO055."""
+    def __init__(self, sensor):
+        """
+        Args:
+            sensor (FakeBNO055): The sensor whose registers are read.
+        """
+        self.sensor = sensor
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def write_then_readinto(self, out_buffer, in_buffer):
+        """
+        Reads registers starting at the address written in `out_buffer[0]`.
+
+        Args:
+            out_buffer (bytes-like): The register address.
+            in_buffer (bytearray): Receives the register values.
+        """
+        registers = self.sensor.registers()
+        start = out_buffer[0]
+        in_buffer[:] = registers[start:start + len(in_buffer)].ljust(len(in_buffer), b'\x00')
+
+
+class FakeBNO055:
+    """A simulated BNO055 in NDOF mode, driven by a motion source."""
+    def __init__(self, motion, clock, baseline=10.0, noise=0.05, read_time=0.0):
+        """
+        Args:
+            motion (LegRaiseMotion or RecordedMotion): The angle source.
+            clock (SimClock): The simulation clock shared with the serial device.
+            baseline (float): Resting angle in degrees, removed again by the zeroing step.
+            noise (float): Standard deviation of the angle noise, in degrees.
+            read_time (float): Seconds each read blocks, to mimic the I2C transfer.
+        """
+        self.motion = motion
+        self.clock = clock
+        self.baseline = baseline
+        self.noise = noise
+        self.read_time = read_time
+        self.mode = NDOF_MODE
+        self.calibration_status = (3, 3, 3, 3)
+        self.temperature = 25
+        self.i2c_device = FakeI2CDevice(self)
+        self.reads = 0
+
+    def _angle(self):
+        """Returns the absolute angle now, with noise, after the simulated read time."""
+        if self.read_time > 0:
+            time.sleep(self.read_time)
+        self.reads += 1
+        angle = self.baseline + self.motion.sample(self.clock.now())[0]
+        if self.noise > 0:
+            angle += random.gauss(0.0, self.noise)
+        return angle
+
+    @property
+    def quaternion(self):
+        """
+        Returns:
+            tuple: (w, x, y, z) of the current rotation about the x axis.
+        """
+        half = math.radians(self._angle()) / 2
+        return (math.cos(half), math.sin(half), 0.0, 0.0)
+
+    @property
+    def linear_acceleration(self):
+        """tuple: Zero; the simulated leg moves too slowly to matter."""
+        return (0.0, 0.0, 0.0)
+
+    @property
+    def gravity(self):
+        """tuple: The gravity vector (m/s^2) in the rotated sensor frame."""
+        angle = math.radians(self.baseline + self.motion.sample(self.clock.now())[0])
+        return (0.0, 9.81 * math.sin(angle), 9.81 * math.cos(angle))
+
+    def registers(self):
+        """
+        Packs the output registers 0x00-0x35 the way the chip exposes them.
+
+        Returns:
+            bytes: The register values; only the fusion block (0x20-0x35) is populated.
+        """
+        w, x, y, z = self.quaternion
+        gravity = self.gravity
+        system, gyro, accel, mag = self.calibration_status
+        block = struct.pack(
+            '<4h3h3hbB',
+            *(round(v * QUATERNION_SCALE) for v in (w, x, y, z)),
+            0, 0, 0,
+            *(round(v * 100) for v in gravity),
+            self.temperature,
+            system << 6 | gyro << 4 | accel << 2 | mag
+        )
+        return bytes(0x20) + block
@@ -0,0 +1,165 @@
+import os
+import tty
+import time
+import errno
+import logging
+import threading
+from core.cop_protocol import encode_frame, PROTOCOL_TEXT, PROTOCOL_BINARY
+
+# ---------------------
+# File: serial_device.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module providing VirtualSerialDevice, a simulated CoP board on a pseudo-terminal.
+
+The device opens a pty pair (Linux/macOS) and writes CoP samples to the
+master side; `port` is the path of the slave side (e.g. /dev/pts/5), which
+SerialThread opens like any USB serial port. Samples are emitted at the
+motion source's rate in simulation time, so with a SimClock at 10x the board
+sends ten times as many samples per real second. Both protocols of
+core.cop_protocol are supported: "(x, y)" text lines and 34-byte binary
+frames with sequence numbers and device timestamps.
+
+The writer wakes every `write_interval` real seconds and sends all samples
+that became due since the previous wake-up in one write, like the USB
+bridge of the real board. When nobody reads the port and the pty buffer is
+full, samples are dropped and counted instead of blocking.
+"""
+
+FULL_SCALE_LOAD = 100000 # Raw load-cell units for the simulated body weight
+
+
+def _load_cells(x, y):
+    """Splits a simulated body weight over the four load cells so that they match (x, y)."""
+    quarter = FULL_SCALE_LOAD / 4
+    return (int(quarter * (1 - x) * (1 + y)), int(quarter * (1 + x) * (1 + y)),
+            int(quarter * (1 + x) * (1 - y)), int(quarter * (1 - x) * (1 - y)))
+
+
+class VirtualSerialDevice:
+    """Emits a motion source's CoP samples on a pseudo-terminal."""
+    def __init__(self, motion, clock, protocol=PROTOCOL_TEXT, rate=None, write_interval=0.005, on_write=None):
+        """
+        Opens the pseudo-terminal; call `start()` to begin emitting.
+
+        Args:
+            motion (LegRaiseMotion or RecordedMotion): The CoP source.
+            clock (SimClock): The simulation clock shared with the fake sensor.
+            protocol (str): PROTOCOL_TEXT or PROTOCOL_BINARY.
+            rate (float, optional): Samples per simulation second; defaults to the
+                                    motion's own sample rate.
+            write_interval (float): Real seconds between writes.
+            on_write (callable, optional): Called as on_write(first_index, count, write_time)
+                                           after each write with the samples that went out.
+
+        Raises:
+            ValueError: If the protocol or the rate is invalid.
+        """
+        if protocol not in (PROTOCOL_TEXT, PROTOCOL_BINARY):
+            raise ValueError(f"Unsupported simulator protocol '{protocol}'.")
+        self.motion = motion
+        self.clock = clock
+        self.protocol = protocol
+        self.rate = rate or motion.sample_rate
+        if not self.rate or self.rate <= 0:
+            raise ValueError("VirtualSerialDevice needs a positive sample rate.")
+        self.write_interval = write_interval
+        self.on_write = on_write
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave) # No echo or newline translation
+        os.set_blocking(self._master, False)
+        self.port = os.ttyname(self._slave)
+
+        self.running = False
+        self._thread = None
+        self.samples_sent = 0
+        self.samples_dropped = 0
+        self.bytes_sent = 0
+        self._next_index = 0
+        self._finished = None # Simulation time at which the writer loop ended
+
+    def _encode(self, index, t):
+        """Encodes the sample due at simulation time t."""
+        _, x, y = self.motion.sample(t)
+        if self.protocol == PROTOCOL_BINARY:
+            return encode_frame(index, int(t * 1e6), _load_cells(x, y), x, y)
+        return f"({x:.4f}, {y:.4f})\n".encode('ascii')
+
+    def _emit_due(self):
+        """Writes every sample due by the current simulation time."""
+        now = self.clock.now()
+        if self.motion.duration is not None:
+            now = min(now, self.motion.duration)
+        last_due = int(now * self.rate)
+        if last_due < self._next_index:
+            return
+        first = self._next_index
+        payload = b''.join(self._encode(i, i / self.rate) for i in range(first, last_due + 1))
+        self._next_index = last_due + 1
+        count = last_due + 1 - first
+        try:
+            written = os.write(self._master, payload)
+        except OSError as e:
+            if e.errno not in (errno.EAGAIN, errno.EIO):
+                raise
+            written = 0
+        if written < len(payload):
+            # Buffer full: whatever did not fit is lost, as with an unread USB port
+            self.samples_dropped += count - written * count // len(payload)
+        sent = written * count // len(payload)
+        self.samples_sent += sent
+        self.bytes_sent += written
+        if self.on_write and sent:
+            self.on_write(first, sent, time.monotonic())
+
+    def _run(self):
+        """Writer loop."""
+        logging.info(f"Virtual CoP board on {self.port} ({self.protocol}, {self.rate:g} Hz x {self.clock.speed:g}).")
+        while self.running:
+            self._emit_due()
+            if self.motion.duration is not None and self._next_index / self.rate > self.motion.duration:
+                logging.info("Recording finished.")
+                break
+            time.sleep(self.write_interval)
+        self._finished = self.clock.now()
+        self.running = False
+
+    def start(self):
+        """Starts the writer thread."""
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name="VirtualSerial", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the writer thread and closes the pseudo-terminal."""
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=1)
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Returns:
+            dict: Samples sent and dropped, bytes written, the seconds spent streaming
+                  (up to the end of the recording or the stop, not any later teardown)
+                  and the effective rate over them in real time.
+        """
+        streamed = self._finished if self._finished is not None else self.clock.now()
+        elapsed = streamed / self.clock.speed
+        return {
+            'port': self.port,
+            'samples_sent': self.samples_sent,
+            'samples_dropped': self.samples_dropped,
+            'bytes_sent': self.bytes_sent,
+            'elapsed_s': round(elapsed, 3),
+            'samples_per_sec': round(self.samples_sent / elapsed, 1) if elapsed > 0 else 0.0,
+        }
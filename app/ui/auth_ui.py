@@ -1,6 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from core import auth_manager
+from core import startup_profile
 
 # ---------------------
 # File: auth_ui.py
@@ -164,6 +165,7 @@ class LoginApp(tk.Tk):
         
         if success:
             self.destroy()
+            startup_profile.mark("login")
             # Lazy import to avoid circular dependency
             from ui.dashboard import Dashboard
             dashboard = Dashboard(username, full_name, gender)
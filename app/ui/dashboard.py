@@ -1,25 +1,14 @@
 import tkinter as tk
 from tkinter import ttk
 import logging
-import queue
 import serial.tools.list_ports
-from ui.windows.routine_window import RoutineWindow
-from ui.windows.calibration_window import CalibrationWindow
 from core.config_manager import config
-from ui.tabs.history_tab import HistoryTab 
 from core.data_inputs import SerialThread, SensorThread
-from ui.tabs.analytics_tab import AnalyticsTab
-from ui.tabs.settings_tab import SettingsTab
-from ui.tabs.profile_tab import ProfileTab
-
-# Sensor-related imports
-try:
-    import board
-    import adafruit_bno055
-except ImportError:
-    print("Warning: Could not import 'board' or 'adafruit_bno055'. BNO055 sensor will not be available.")
-    board = None
-    adafruit_bno055 = None
+from core.bno055 import driver_from_config
+from core.channels import channel_from_config
+from core.metrics_exporter import exporter_from_config
+from core.background_loader import loader_from_config
+from core import startup_profile
 
 # ---------------------
 # File: dashboard.py
@@ -36,6 +25,11 @@ It initializes the user interface (Notebook with multiple tabs) and establishes
 multithreaded connections for the serial device (e.g., balance board) and the 
 I2C sensor (BNO055). It manages the lifespan of these threads and ensures 
 data integrity via a shared queue.
+
+The window appears before anything slow runs. Tabs are built when first
+selected (`[Startup] lazy_tabs`), and the tab, routine and calibration modules
+(with matplotlib) are imported only then. The BNO055 libraries are imported
+and the sensor is initialized on the background loader.
 """
 
 class Dashboard(tk.Tk):
@@ -62,38 +56,40 @@ class Dashboard(tk.Tk):
         
         self.routine_window = None
         
-        # Shared queue for data from both serial and sensor threads
-        self.shared_queue = queue.Queue()
+        # Shared bounded channel for data from the serial thread
+        self.shared_queue = channel_from_config(config, 'serial', 256)
         
+        # Worker pool for session loading in the History and Analytics tabs
+        self.loader = loader_from_config(config, self)
+
         # --- Hardware Initialization ---
         self.sensor = None
-        self.init_sensor()
         self.sensor_thread = None
-        if self.sensor:
-            self.sensor_thread = SensorThread(self.sensor)
-            self.sensor_thread.start()
-
         self.serial_thread = None
-        port = config.get('Serial', 'port')
-        baud = config.getint('Serial', 'baudrate')
-        
-        # Auto-detect port if not configured
-        if not port:
-            port = next((p.device for p in serial.tools.list_ports.comports()), None)
-        
-        if port:
-            self.serial_thread = SerialThread(port, baud, self.shared_queue)
-            self.serial_thread.start()
+        self.init_sensor()
+        self.start_hardware_threads()
+
+        # Opt-in Prometheus exporter ([Metrics] exporter)
+        self.metrics_exporter = exporter_from_config(config)
 
         # --- Notebook/Tabs Setup ---
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(pady=20, padx=20, expand=True, fill="both")
         
+        self.pending_tabs = {} # Tab frame name -> (frame, creation function) of tabs not built yet
         self.setup_tabs()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        startup_profile.mark("dashboard built")
+        self.after_idle(self.on_startup_idle)
         
     def setup_tabs(self):
-        """Initializes and adds all functional tabs to the Notebook widget."""
+        """
+        Adds all functional tabs to the Notebook widget.
+
+        With `[Startup] lazy_tabs` (default), only the selected tab is built
+        now; the others are built the first time they are selected.
+        """
         tabs = {
             "[P] Profile": self.create_profile_tab, 
             "[R] Routine": self.create_routine_tab, 
@@ -104,25 +100,111 @@ class Dashboard(tk.Tk):
         for name, creation_func in tabs.items():
             frame = ttk.Frame(self.notebook)
             self.notebook.add(frame, text=name)
-            creation_func(frame)
+            self.pending_tabs[str(frame)] = (frame, creation_func)
+
+        if config.getboolean('Startup', 'lazy_tabs', fallback=True):
+            self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+            self.build_tab(self.notebook.select())
+        else:
+            for tab_id in list(self.pending_tabs):
+                self.build_tab(tab_id)
+
+    def on_tab_changed(self, event=None):
+        """Event handler for the notebook: builds the selected tab on its first selection."""
+        self.build_tab(self.notebook.select())
+
+    def build_tab(self, tab_id):
+        """
+        Builds a tab's content unless it has been built already.
+
+        Args:
+            tab_id (str): The tab's frame name (as returned by `notebook.select()`).
+        """
+        pending = self.pending_tabs.pop(str(tab_id), None)
+        if pending is None:
+            return
+        frame, creation_func = pending
+        creation_func(frame)
+        startup_profile.mark(f"{self.notebook.tab(frame, 'text')} tab built")
+
+    def on_startup_idle(self):
+        """Runs once the window is shown and idle: ends the startup profile, if enabled."""
+        startup_profile.mark("dashboard idle")
+        startup_profile.report()
+
+    def start_hardware_threads(self):
+        """
+        Starts the sensor and serial threads, replacing any that have stopped.
+
+        In the process pipeline mode, the RoutineWindow hands the hardware over
+        to the pipeline process and stops these threads; they are started again
+        here before the next routine.
+        """
+        if self.sensor and not (self.sensor_thread and self.sensor_thread.is_alive()):
+            self.sensor_thread = SensorThread(self.sensor, rate=config.getfloat('Sensor', 'rate', fallback=100.0))
+            self.sensor_thread.start()
+
+        if self.serial_thread and self.serial_thread.is_alive():
+            return
+        port = config.get('Serial', 'port')
+        baud = config.getint('Serial', 'baudrate')
+        
+        # Auto-detect port if not configured
+        if not port:
+            port = next((p.device for p in serial.tools.list_ports.comports()), None)
+        
+        if port:
+            protocol = config.get('Serial', 'protocol', fallback='auto')
+            self.serial_thread = SerialThread(
+                port, baud, self.shared_queue, protocol,
+                read_mode=config.get('Serial', 'read_mode', fallback='chunk'),
+                read_interval=config.getfloat('Serial', 'read_interval', fallback=0.01)
+            )
+            self.serial_thread.start()
 
     def init_sensor(self):
         """
-        Initializes the BNO055 sensor object using I2C communication.
+        Initializes the BNO055 sensor object using I2C communication on the
+        background loader, so the dashboard is usable while the sensor resets.
 
-        Sets `self.sensor` to the initialized object or `None` if hardware 
-        or library import fails. Logs initialization status.
+        `on_sensor_ready` sets `self.sensor` to the initialized object, or
+        leaves it `None` if hardware or library import fails, and starts the
+        sensor thread.
         """
-        if board and adafruit_bno055:
-            try:
-                i2c = board.I2C()
-                self.sensor = adafruit_bno055.BNO055_I2C(i2c)
-                logging.info("BNO055 sensor found and initialized in Dashboard.")
-            except (ValueError, OSError) as e:
-                logging.error(f"BNO055 sensor not found. Error: {e}")
-                self.sensor = None
-        else:
-            self.sensor = None
+        self.loader.submit('sensor', self.open_sensor, on_done=self.on_sensor_ready)
+
+    @staticmethod
+    def open_sensor(task):
+        """
+        Worker: imports the sensor libraries and opens the BNO055. The adafruit
+        object is wrapped in the burst-read driver configured in [Sensor].
+
+        Args:
+            task (LoadTask): The running task.
+
+        Returns:
+            The sensor driver, or None if it is not available.
+        """
+        try:
+            import board
+            import adafruit_bno055
+        except ImportError:
+            print("Warning: Could not import 'board' or 'adafruit_bno055'. BNO055 sensor will not be available.")
+            return None
+        try:
+            i2c = board.I2C()
+            sensor = driver_from_config(config, adafruit_bno055.BNO055_I2C(i2c))
+            logging.info("BNO055 sensor found and initialized in Dashboard.")
+            return sensor
+        except (ValueError, OSError) as e:
+            logging.error(f"BNO055 sensor not found. Error: {e}")
+            return None
+
+    def on_sensor_ready(self, sensor):
+        """Loader callback: keeps the initialized sensor and starts its thread."""
+        self.sensor = sensor
+        startup_profile.mark("sensor initialized")
+        self.start_hardware_threads()
 
     def on_closing(self):
         """
@@ -137,11 +219,15 @@ class Dashboard(tk.Tk):
             self.serial_thread.stop()
             
         if self.routine_window and self.routine_window.winfo_exists():
-            self.routine_window.destroy()
+            # Stops the DataProcessor (or pipeline process) so the session files are closed
+            self.routine_window.on_closing()
+        if self.metrics_exporter: self.metrics_exporter.stop()
+        self.loader.shutdown()
         self.destroy()
 
     def create_profile_tab(self, parent_frame):
         """Instantiates and packs the ProfileTab."""
+        from ui.tabs.profile_tab import ProfileTab
         profile = ProfileTab(parent_frame, self.username, self.full_name, self.gender)
         profile.pack(fill="both", expand=True)
 
@@ -189,6 +275,12 @@ class Dashboard(tk.Tk):
         if self.routine_window and self.routine_window.winfo_exists():
             self.routine_window.lift()
             return
+        if self.loader.busy('sensor'):
+            # The sensor is still being initialized; try again shortly
+            self.after(100, self.start_routine)
+            return
+        from ui.windows.calibration_window import CalibrationWindow
+        self.start_hardware_threads()
         CalibrationWindow(
             self, 
             self.sensor, 
@@ -212,6 +304,7 @@ class Dashboard(tk.Tk):
         if self.routine_window and self.routine_window.winfo_exists():
             self.routine_window.lift()
             return
+        from ui.windows.routine_window import RoutineWindow
         self.routine_window = RoutineWindow(
             self, 
             self.username, 
@@ -226,15 +319,18 @@ class Dashboard(tk.Tk):
 
     def create_history_tab(self, parent_frame):
         """Instantiates and packs the HistoryTab."""
-        history_tab = HistoryTab(parent_frame, self.username)
+        from ui.tabs.history_tab import HistoryTab
+        history_tab = HistoryTab(parent_frame, self.username, loader=self.loader)
         history_tab.pack(fill="both", expand=True)
 
     def create_analytics_tab(self, parent_frame):
         """Instantiates and packs the AnalyticsTab."""
-        analytics = AnalyticsTab(parent_frame, self.username)
+        from ui.tabs.analytics_tab import AnalyticsTab
+        analytics = AnalyticsTab(parent_frame, self.username, loader=self.loader)
         analytics.pack(fill="both", expand=True)
 
     def create_settings_tab(self, parent_frame):
         """Instantiates and packs the SettingsTab."""
+        from ui.tabs.settings_tab import SettingsTab
         settings = SettingsTab(parent_frame, self.username)
         settings.pack(fill="both", expand=True)
\ No newline at end of file
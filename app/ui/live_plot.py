@@ -0,0 +1,430 @@
+import math
+import tkinter as tk
+import numpy as np
+from core.config_manager import config
+from core.downsample import minmax_decimate
+
+# ---------------------
+# File: live_plot.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module containing the live renderers of the RoutineWindow: the CoP trail and
+the scrolling angle trace.
+
+Both renderers expose `widget` (to pack) and `draw(times, angles, xs, ys)`,
+called once per frame with the window's history deques.
+
+    CanvasLivePlot      (default) Two Tk canvases. The trail, the marker, the
+                        angle trace and the time ticks are items created once
+                        and moved with `coords`; the frame, grid and labels
+                        are only redrawn when the canvas is resized.
+    MatplotlibLivePlot  Matplotlib with blitting that stays valid: the angle
+                        axis is fixed at [-window, 0] seconds relative to the
+                        latest sample, so the axes never change and every frame
+                        is a background restore plus three artists.
+
+Calling `set_xlim` every frame (the former FuncAnimation loop) invalidates the
+blit background and forces a full figure redraw per frame, which the Pi cannot
+sustain at 60 FPS. The renderer is selected with `[Plotting] live_renderer`;
+matplotlib remains the library for the static plots of the other tabs.
+
+With `decimate`, a renderer draws at most two points (min and max) per pixel
+column of the angle trace (core.downsample), so the cost of a frame no longer
+grows with the input rate. `FramePacer` adapts the frame interval to the
+measured frame cost (see `[Plotting] adaptive_frames`).
+"""
+
+RENDERER_CANVAS = 'canvas'
+RENDERER_MATPLOTLIB = 'matplotlib'
+
+TRAIL_COLOR = '#8fbbd9'   # Matplotlib's default blue at 50% alpha on white
+MARKER_COLOR = 'red'
+ANGLE_COLOR = 'green'
+GRID_COLOR = '#e0e0e0'
+MARKER_RADIUS = 5
+FONT = ('Helvetica', 9)
+TITLE_FONT = ('Helvetica', 11)
+
+
+def nice_step(span, target=5):
+    """
+    Returns a 1-2-5 tick step giving about `target` ticks over `span`.
+
+    Args:
+        span (float): The axis range.
+        target (int): The desired number of ticks.
+    """
+    if span <= 0:
+        return 1.0
+    raw = span / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+
+def _ticks(low, high, step):
+    """Tick values that are multiples of `step` inside [low, high]."""
+    first = math.ceil(low / step - 1e-9) * step
+    return [first + i * step for i in range(int((high - first) / step + 1e-9) + 1)]
+
+
+def _flatten(px, py):
+    """Interleaves pixel coordinates into the flat list Canvas.coords expects."""
+    points = np.empty(2 * len(px))
+    points[0::2] = px
+    points[1::2] = py
+    return points.tolist()
+
+
+class CanvasLivePlot(tk.Frame):
+    """The CoP trail and the scrolling angle trace on two Tk canvases."""
+    def __init__(self, parent, cop_limits, angle_limits, time_window, target_angle=None, decimate=False):
+        """
+        Args:
+            parent (tk.Widget): The parent widget.
+            cop_limits (tuple): (x limit, y limit) of the symmetric CoP axes.
+            angle_limits (tuple): (min, max) of the angle axis in degrees.
+            time_window (float): Seconds shown on the angle axis.
+            target_angle (float, optional): Draws a dashed target line.
+            decimate (bool): Reduce the angle trace to min/max per pixel column.
+        """
+        super().__init__(parent)
+        self.widget = self
+        self.decimate = decimate
+        self.cop_x_limit, self.cop_y_limit = cop_limits
+        self.angle_min, self.angle_max = angle_limits
+        self.time_window = time_window
+        self.target_angle = target_angle
+
+        self.columnconfigure(0, weight=1, uniform='plots')
+        self.columnconfigure(1, weight=1, uniform='plots')
+        self.rowconfigure(0, weight=1)
+        self.cop_canvas = tk.Canvas(self, bg='white', highlightthickness=0)
+        self.angle_canvas = tk.Canvas(self, bg='white', highlightthickness=0)
+        self.cop_canvas.grid(row=0, column=0, sticky='nsew', padx=(0, 5))
+        self.angle_canvas.grid(row=0, column=1, sticky='nsew', padx=(5, 0))
+
+        # Items updated every frame
+        self.trail = self.cop_canvas.create_line(0, 0, 0, 0, fill=TRAIL_COLOR, width=2, state='hidden')
+        self.marker = self.cop_canvas.create_oval(0, 0, 0, 0, fill=MARKER_COLOR, outline=MARKER_COLOR, state='hidden')
+        self.angle_line = self.angle_canvas.create_line(0, 0, 0, 0, fill=ANGLE_COLOR, width=1.5, state='hidden')
+        self._visible = {self.trail: False, self.marker: False, self.angle_line: False}
+
+        self._cop_transform = None   # (center x, center y, pixels per unit)
+        self._angle_box = None       # (left, top, right, bottom) of the plot area
+        self._time_step = nice_step(time_window)
+        self._time_ticks = []        # [grid line, label, current text] per reusable tick
+        self._tick_origin = None
+        self._data = ((), (), (), ())
+
+        self.cop_canvas.bind('<Configure>', self._layout_cop)
+        self.angle_canvas.bind('<Configure>', self._layout_angle)
+
+    def _show(self, canvas, item, visible):
+        """Shows or hides an item, touching it only when its state changes."""
+        if self._visible[item] != visible:
+            canvas.itemconfigure(item, state='normal' if visible else 'hidden')
+            self._visible[item] = visible
+
+    def _layout_cop(self, event):
+        """Redraws the static CoP frame for the new canvas size."""
+        canvas = self.cop_canvas
+        canvas.delete('static')
+        top, margin = 28, 10
+        scale = min((event.width - 2 * margin) / (2 * self.cop_x_limit),
+                    (event.height - top - margin) / (2 * self.cop_y_limit))
+        if scale <= 0:
+            self._cop_transform = None
+            return
+        cx, cy = event.width / 2, top + (event.height - top - margin) / 2
+        self._cop_transform = (cx, cy, scale)
+
+        half_w, half_h = self.cop_x_limit * scale, self.cop_y_limit * scale
+        for value in _ticks(-self.cop_x_limit, self.cop_x_limit, nice_step(2 * self.cop_x_limit)):
+            canvas.create_line(cx + value * scale, cy - half_h, cx + value * scale, cy + half_h, fill=GRID_COLOR, tags='static')
+        for value in _ticks(-self.cop_y_limit, self.cop_y_limit, nice_step(2 * self.cop_y_limit)):
+            canvas.create_line(cx - half_w, cy - value * scale, cx + half_w, cy - value * scale, fill=GRID_COLOR, tags='static')
+        canvas.create_rectangle(cx - half_w, cy - half_h, cx + half_w, cy + half_h, outline='black', tags='static')
+        canvas.create_text(cx, top / 2, text="Center of Pressure", font=TITLE_FONT, tags='static')
+        canvas.tag_lower('static')
+        self._draw_cop(*self._data[2:])
+
+    def _layout_angle(self, event):
+        """Redraws the static angle axes and rebuilds the reusable time ticks."""
+        canvas = self.angle_canvas
+        canvas.delete('static', 'tick')
+        left, top, right, bottom = 55, 28, event.width - 15, event.height - 42
+        if right <= left or bottom <= top:
+            self._angle_box = None
+            return
+        self._angle_box = (left, top, right, bottom)
+        scale = (bottom - top) / (self.angle_max - self.angle_min)
+
+        def y_pixel(angle):
+            return bottom - (angle - self.angle_min) * scale
+
+        for value in _ticks(self.angle_min, self.angle_max, nice_step(self.angle_max - self.angle_min)):
+            canvas.create_line(left, y_pixel(value), right, y_pixel(value), fill=GRID_COLOR, tags='static')
+            canvas.create_text(left - 5, y_pixel(value), text=f"{value:g}", anchor='e', font=FONT, tags='static')
+        if self.target_angle is not None and self.angle_min <= self.target_angle <= self.angle_max:
+            canvas.create_line(left, y_pixel(self.target_angle), right, y_pixel(self.target_angle),
+                               fill=ANGLE_COLOR, dash=(6, 4), width=1.5, tags='static')
+        canvas.create_rectangle(left, top, right, bottom, outline='black', tags='static')
+        canvas.create_text((left + right) / 2, top / 2, text="Relative Angle", font=TITLE_FONT, tags='static')
+        canvas.create_text((left + right) / 2, event.height - 10, text="Time (s)", font=FONT, tags='static')
+        canvas.create_text(14, (top + bottom) / 2, text="Angle (degrees)", angle=90, font=FONT, tags='static')
+
+        # Enough ticks for any window position; unused ones stay hidden
+        self._time_ticks = []
+        for _ in range(int(self.time_window / self._time_step) + 2):
+            line = canvas.create_line(0, top, 0, bottom, fill=GRID_COLOR, state='hidden', tags='tick')
+            label = canvas.create_text(0, bottom + 5, anchor='n', font=FONT, state='hidden', tags='tick')
+            self._time_ticks.append([line, label, None])
+        self._tick_origin = None
+        canvas.tag_lower('tick')
+        canvas.tag_lower('static')
+        self._draw_angle(*self._data[:2])
+
+    def draw(self, times, angles, xs, ys):
+        """
+        Moves the plot items to the latest history. The canvases repaint when Tk is idle.
+
+        Args:
+            times, angles (sequence of float): The angle trace (seconds, degrees).
+            xs, ys (sequence of float): The CoP trail; the last point gets the marker.
+        """
+        self._data = (times, angles, xs, ys)
+        self._draw_cop(xs, ys)
+        self._draw_angle(times, angles)
+
+    def _draw_cop(self, xs, ys):
+        """Updates the trail and the marker."""
+        if self._cop_transform is None:
+            return
+        canvas = self.cop_canvas
+        count = len(xs)
+        if count == 0:
+            self._show(canvas, self.trail, False)
+            self._show(canvas, self.marker, False)
+            return
+        cx, cy, scale = self._cop_transform
+        px = cx + np.fromiter(xs, float, count) * scale
+        py = cy - np.fromiter(ys, float, count) * scale
+        if count >= 2:
+            canvas.coords(self.trail, _flatten(px, py))
+        self._show(canvas, self.trail, count >= 2)
+        x, y = px[-1], py[-1]
+        canvas.coords(self.marker, x - MARKER_RADIUS, y - MARKER_RADIUS, x + MARKER_RADIUS, y + MARKER_RADIUS)
+        self._show(canvas, self.marker, True)
+
+    def _draw_angle(self, times, angles):
+        """Updates the trace and scrolls the time ticks with it."""
+        if self._angle_box is None:
+            return
+        canvas = self.angle_canvas
+        left, top, right, bottom = self._angle_box
+        count = len(times)
+        origin = max(0.0, times[-1] - self.time_window) if count else 0.0
+
+        if origin != self._tick_origin:
+            self._tick_origin = origin
+            x_scale = (right - left) / self.time_window
+            values = _ticks(origin, origin + self.time_window, self._time_step)
+            for i, tick in enumerate(self._time_ticks):
+                line, label, text = tick
+                if i < len(values):
+                    x = left + (values[i] - origin) * x_scale
+                    canvas.coords(line, x, top, x, bottom)
+                    canvas.coords(label, x, bottom + 5)
+                    new_text = f"{values[i]:g}"
+                    if text is None:
+                        canvas.itemconfigure(line, state='normal')
+                        canvas.itemconfigure(label, state='normal', text=new_text)
+                    elif text != new_text:
+                        canvas.itemconfigure(label, text=new_text)
+                    tick[2] = new_text
+                elif text is not None:
+                    canvas.itemconfigure(line, state='hidden')
+                    canvas.itemconfigure(label, state='hidden')
+                    tick[2] = None
+
+        if count < 2:
+            self._show(canvas, self.angle_line, False)
+            return
+        times, angles = np.fromiter(times, float, count), np.fromiter(angles, float, count)
+        if self.decimate:
+            times, angles = minmax_decimate(times, angles, int(right - left), (origin, origin + self.time_window))
+        px = left + (times - origin) * ((right - left) / self.time_window)
+        py = bottom - (angles - self.angle_min) * ((bottom - top) / (self.angle_max - self.angle_min))
+        canvas.coords(self.angle_line, _flatten(np.clip(px, left, right), np.clip(py, top, bottom)))
+        self._show(canvas, self.angle_line, True)
+
+
+class MatplotlibLivePlot:
+    """
+    The live plots on a matplotlib figure, blitted on fixed axes.
+
+    The angle axis shows the last `time_window` seconds relative to the latest
+    sample, so scrolling moves the data instead of the axis limits.
+    """
+    def __init__(self, parent, cop_limits, angle_limits, time_window, target_angle=None, decimate=False):
+        """
+        Args:
+            parent (tk.Widget or None): The parent widget; None renders off-screen with Agg.
+            cop_limits (tuple): (x limit, y limit) of the symmetric CoP axes.
+            angle_limits (tuple): (min, max) of the angle axis in degrees.
+            time_window (float): Seconds shown on the angle axis.
+            target_angle (float, optional): Draws a dashed target line.
+            decimate (bool): Reduce the angle trace to min/max per pixel column.
+
+        Raises:
+            ImportError: If matplotlib is not installed.
+        """
+        from matplotlib.figure import Figure
+        self.fig = Figure(figsize=(9, 3), dpi=100, constrained_layout=True)
+        if parent is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.canvas = FigureCanvasAgg(self.fig)
+            self.widget = None
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.fig, master=parent)
+            self.widget = self.canvas.get_tk_widget()
+        self.time_window = time_window
+        self.decimate = decimate
+        self.ax_cop, self.ax_angle = self.fig.subplots(1, 2)
+
+        cop_x_limit, cop_y_limit = cop_limits
+        self.trail_line, = self.ax_cop.plot([], [], 'b-', alpha=0.5, lw=2, animated=True)
+        self.current_point_marker, = self.ax_cop.plot([], [], 'ro', markersize=8, animated=True)
+        self.ax_cop.set_xlim(-cop_x_limit, cop_x_limit); self.ax_cop.set_ylim(-cop_y_limit, cop_y_limit)
+        self.ax_cop.set_xticklabels([]); self.ax_cop.set_yticklabels([])
+        self.ax_cop.set_title("Center of Pressure"); self.ax_cop.grid(True)
+        self.ax_cop.set_aspect('equal', adjustable='box')
+
+        self.angle_line, = self.ax_angle.plot([], [], 'g-', animated=True)
+        self.ax_angle.set_title("Relative Angle"); self.ax_angle.set_xlabel("Time relative to now (s)")
+        self.ax_angle.set_ylabel("Angle (degrees)")
+        self.ax_angle.grid(True)
+        self.ax_angle.set_xlim(-time_window, 0)
+        self.ax_angle.set_ylim(*angle_limits)
+        if target_angle is not None:
+            self.ax_angle.axhline(y=target_angle, color='green', linestyle='--', linewidth=1.5)
+
+        self.artists = (self.trail_line, self.current_point_marker, self.angle_line)
+        self._background = None
+        # Every full draw (first show, resize) captures a new background
+        self.canvas.mpl_connect('draw_event', self._capture_background)
+        self.canvas.draw()
+
+    def _capture_background(self, event):
+        """Saves the figure without the animated artists."""
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def draw(self, times, angles, xs, ys):
+        """
+        Blits the latest history.
+
+        Args:
+            times, angles (sequence of float): The angle trace (seconds, degrees).
+            xs, ys (sequence of float): The CoP trail; the last point gets the marker.
+        """
+        self.trail_line.set_data(xs, ys)
+        if xs:
+            self.current_point_marker.set_data([xs[-1]], [ys[-1]])
+        else:
+            self.current_point_marker.set_data([], [])
+        if times:
+            count = len(times)
+            relative, values = np.fromiter(times, float, count) - times[-1], np.fromiter(angles, float, count)
+            if self.decimate:
+                relative, values = minmax_decimate(relative, values, int(self.ax_angle.bbox.width), (-self.time_window, 0.0))
+            self.angle_line.set_data(relative, values)
+        else:
+            self.angle_line.set_data([], [])
+
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        for artist in self.artists:
+            self.fig.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+
+
+class FramePacer:
+    """
+    Chooses the delay before the next frame from the measured frame cost.
+
+    The cost of a frame is the time spent in the frame callback plus how late
+    the callback started: that lateness is the time the Tk event loop spent
+    repainting and handling other events. The interval is kept at
+    `cost / budget`, between `min_interval_ms` and `max_interval_ms`, so
+    rendering uses at most `budget` of a core and the frame rate drops instead
+    of the display falling behind the data.
+    """
+    SMOOTHING = 0.2 # Weight of the latest frame in the cost average
+
+    def __init__(self, min_interval_ms=16, max_interval_ms=100, budget=0.5):
+        """
+        Args:
+            min_interval_ms (int): The interval when frames are cheap.
+            max_interval_ms (int): The longest interval (the lowest frame rate).
+            budget (float): Fraction of the interval a frame may cost.
+        """
+        self.min_interval = min_interval_ms / 1000
+        self.max_interval = max(max_interval_ms, min_interval_ms) / 1000
+        self.budget = budget
+        self.cost = None
+        self.interval = self.min_interval
+        self._expected_start = None
+
+    @property
+    def behind(self):
+        """True while frames are slowed down."""
+        return self.interval > self.min_interval
+
+    def next_delay(self, started, finished):
+        """
+        Args:
+            started (float): time.perf_counter() when the frame callback started.
+            finished (float): time.perf_counter() when it returned.
+
+        Returns:
+            int: Milliseconds to wait before the next frame.
+        """
+        cost = finished - started
+        if self._expected_start is not None:
+            cost += max(0.0, started - self._expected_start)
+        self.cost = cost if self.cost is None else self.cost + self.SMOOTHING * (cost - self.cost)
+        self.interval = min(self.max_interval, max(self.min_interval, self.cost / self.budget))
+        delay = max(0.001, self.interval - (finished - started))
+        self._expected_start = finished + delay
+        return max(1, int(delay * 1000))
+
+
+def live_plot_from_config(parent, target_angle=None):
+    """
+    Creates the renderer selected by `[Plotting] live_renderer`.
+
+    Args:
+        parent (tk.Widget): The parent widget.
+        target_angle (float, optional): Draws a dashed target line on the angle plot.
+
+    Returns:
+        CanvasLivePlot or MatplotlibLivePlot: The renderer.
+    """
+    cop_limits = (config.getfloat('Plotting', 'cop_x_limit', fallback=1.0),
+                  config.getfloat('Plotting', 'cop_y_limit', fallback=1.0))
+    angle_limits = (config.getfloat('Plotting', 'angle_y_min', fallback=-1.0),
+                    config.getfloat('Plotting', 'angle_y_max', fallback=25.0))
+    time_window = config.getint('Plotting', 'time_window_seconds', fallback=5)
+    decimate = config.getboolean('Plotting', 'adaptive_frames', fallback=True)
+    if config.get('Plotting', 'live_renderer', fallback=RENDERER_CANVAS) == RENDERER_MATPLOTLIB:
+        return MatplotlibLivePlot(parent, cop_limits, angle_limits, time_window, target_angle, decimate)
+    return CanvasLivePlot(parent, cop_limits, angle_limits, time_window, target_angle, decimate)
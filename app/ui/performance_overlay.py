@@ -0,0 +1,159 @@
+import tkinter as tk
+from core.config_manager import config
+from core import metrics
+
+# ---------------------
+# File: performance_overlay.py
+# Author: Ricardo Garcia, ricardo.garcia@cosmiac.org
+# Last Modified: 2026-10-18
+# Version: 2.0.0
+# ---------------------
+
+"""
+Module containing the PerformanceOverlay, a toggleable panel that shows the
+hot-path metrics (core.metrics) on top of the RoutineWindow plots.
+
+One line per pipeline stage, refreshed every `[Metrics] overlay_refresh_ms`:
+
+    SERIAL   samples/s, serial channel depth and drops
+    SENSOR   reads/s, read time p50/p95, read errors
+    PROCESS  samples/s, parse_and_process time per sample p50/p95
+    PLOT     plot channel depth and drops
+    LOG      rows/s, batch write time p50/p95
+    FRAMES   achieved FPS, animate_plot time p50/p95
+
+Rates and percentiles cover the interval since the previous refresh. A stage
+that is falling behind (a channel more than half full or dropping items,
+processing slower than the serial input, failed sensor reads, a low frame
+rate) is marked with "<<", so the lagging stage stands out at a glance.
+"""
+
+FRAME_RATE_WARNING = 30.0 # FPS below which the FRAMES line is flagged
+
+
+class PerformanceOverlay(tk.Label):
+    """A monospace text panel placed over the top-right corner of its parent."""
+    def __init__(self, parent, refresh_ms=None):
+        """
+        Args:
+            parent (tk.Widget): The widget to draw over (the plot area).
+            refresh_ms (int, optional): Refresh period; defaults to [Metrics] overlay_refresh_ms.
+        """
+        super().__init__(parent, font=('Courier', 10), justify='left', anchor='nw',
+                         bg='black', fg='#7CFC00', padx=8, pady=6)
+        self.refresh_ms = refresh_ms or config.getint('Metrics', 'overlay_refresh_ms', fallback=1000)
+        self.visible = False
+        self._job = None
+        self._rates = metrics.RateTracker()
+        self._snapshots = {}
+        self._last_counts = {}
+
+    def toggle(self, event=None):
+        """Shows or hides the overlay."""
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        """Places the overlay and starts refreshing it."""
+        self.visible = True
+        self.place(relx=1.0, rely=0.0, x=-10, y=10, anchor='ne')
+        self.lift()
+        self.refresh()
+
+    def hide(self):
+        """Removes the overlay and stops refreshing it."""
+        self.visible = False
+        if self._job:
+            self.after_cancel(self._job)
+            self._job = None
+        self.place_forget()
+
+    def refresh(self):
+        """Redraws the text and schedules the next refresh."""
+        self.config(text=self.render())
+        self._job = self.after(self.refresh_ms, self.refresh)
+
+    def _rate(self, name):
+        """Per-second rate of a counter since the previous refresh (0 if not registered)."""
+        metric = metrics.registry.get(name)
+        return self._rates.rate(metric) if metric else 0.0
+
+    def _quantiles_ms(self, name):
+        """(p50, p95) in ms of a histogram since the previous refresh, or None without observations."""
+        histogram = metrics.registry.get(name)
+        if histogram is None:
+            return None
+        since = self._snapshots.get(name)
+        self._snapshots[name] = histogram.snapshot()
+        p50, p95 = histogram.quantile(0.5, since), histogram.quantile(0.95, since)
+        if p50 is None:
+            return None
+        return p50 * 1e3, p95 * 1e3
+
+    def _increased(self, name, **labels):
+        """True if a counter grew since the previous refresh."""
+        metric = metrics.registry.get(name, **labels)
+        value = metric.get() if metric else 0
+        key = (name, tuple(labels.items()))
+        previous = self._last_counts.get(key, value)
+        self._last_counts[key] = value
+        return value > previous
+
+    def _channel(self, name):
+        """Formats a channel's depth and drops; flags it when more than half full or dropping."""
+        depth = metrics.registry.get('channel_depth', channel=name)
+        capacity = metrics.registry.get('channel_capacity', channel=name)
+        dropped = metrics.registry.get('channel_dropped_total', channel=name)
+        if depth is None:
+            return "queue n/a", False
+        size, limit = int(depth.get()), int(capacity.get()) if capacity else 0
+        drops = int(dropped.get()) if dropped else 0
+        behind = self._increased('channel_dropped_total', channel=name) or (limit and size > limit / 2)
+        return f"queue {size:>4}/{limit:<4} drop {drops}", behind
+
+    @staticmethod
+    def _format_ms(quantiles, unit):
+        """Formats a (p50, p95) pair, or a dash without observations."""
+        if quantiles is None:
+            return f"{'-':>13} {unit}"
+        return f"{quantiles[0]:6.2f}/{quantiles[1]:<6.2f} {unit}"
+
+    def render(self):
+        """
+        Returns:
+            str: The overlay text.
+        """
+        lines = []
+
+        def line(label, text, behind=False):
+            lines.append(f"{label:<8} {text}{'  <<' if behind else ''}")
+
+        serial_rate = self._rate('serial_samples_total')
+        serial_queue, serial_behind = self._channel('serial')
+        line("SERIAL", f"{serial_rate:7.1f} /s   {serial_queue}", serial_behind)
+
+        sensor_rate = self._rate('sensor_reads_total')
+        sensor_errors = self._increased('sensor_read_errors_total')
+        errors = metrics.registry.get('sensor_read_errors_total')
+        line("SENSOR", f"{sensor_rate:7.1f} /s   read {self._format_ms(self._quantiles_ms('sensor_read_seconds'), 'ms')}"
+                       f"  err {int(errors.get()) if errors else 0}", sensor_errors)
+
+        process_rate = self._rate('processing_samples_total')
+        process_time = self._quantiles_ms('processing_sample_seconds')
+        # Behind when the input outpaces processing, or processing needs over half a core
+        busy = process_time is not None and process_time[1] * 1e-3 * serial_rate > 0.5
+        line("PROCESS", f"{process_rate:7.1f} /s   {self._format_ms(process_time, 'ms/sample')}",
+             busy or (serial_rate > 0 and process_rate < 0.9 * serial_rate))
+
+        plot_queue, plot_behind = self._channel('plot')
+        line("PLOT", f"{'':>10}   {plot_queue}", plot_behind)
+
+        line("LOG", f"{self._rate('log_rows_written_total'):7.1f} /s   "
+                    f"{self._format_ms(self._quantiles_ms('log_write_batch_seconds'), 'ms/batch')}")
+
+        fps = self._rate('frames_total')
+        line("FRAMES", f"{fps:7.1f} fps  {self._format_ms(self._quantiles_ms('frame_seconds'), 'ms/frame')}",
+             0 < fps < FRAME_RATE_WARNING)
+        return "\n".join(lines)
@@ -4,12 +4,13 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import os
-import csv
-import glob
 from datetime import datetime, timedelta
 from collections import defaultdict
 import numpy as np
 from core.config_manager import config
+from core.session_io import list_sessions
+from core.session_summary import SummaryIndex
+from core.background_loader import BackgroundLoader
 
 # ---------------------
 # File: analytics_tab.py
@@ -20,9 +21,15 @@ from core.config_manager import config
 
 """
 Module containing the AnalyticsTab, a Tkinter frame responsible for 
-parsing user session data from CSV files and visualizing it using Matplotlib.
+parsing user session data files and visualizing it using Matplotlib.
+
+The history is collected on the BackgroundLoader with a progress bar, so a
+long history never freezes the dashboard; refreshing again cancels the
+collection in flight.
 """
 
+LOAD_KEY = 'analytics'
+
 class AnalyticsTab(ttk.Frame):
     """
     A Tkinter tab within the main dashboard that provides data visualization 
@@ -31,16 +38,18 @@ class AnalyticsTab(ttk.Frame):
     It reads session data from the user's directory, aggregates statistics, 
     and displays various performance graphs.
     """
-    def __init__(self, parent, username):
+    def __init__(self, parent, username, loader=None):
         """
         Initializes the AnalyticsTab.
 
         Args:
             parent (ttk.Notebook): The Notebook widget this tab belongs to.
             username (str): The username of the currently logged-in user.
+            loader (BackgroundLoader, optional): Shared loader; the tab creates its own if omitted.
         """
         super().__init__(parent)
         self.username = username
+        self.loader = loader or BackgroundLoader(widget=self)
         self.sessions_dir = config.get('Paths', 'sessions_base_dir')
         self.user_dir = os.path.join(self.sessions_dir, self.username)
         
@@ -70,6 +79,9 @@ class AnalyticsTab(ttk.Frame):
         
         # Refresh Button
         ttk.Button(control_frame, text="Refresh Data", command=self.refresh_data).pack(side='right')
+
+        # Shown only while the history is being collected
+        self.progress_bar = ttk.Progressbar(control_frame, length=150)
         
         # Dropdown Menu
         ttk.Label(control_frame, text="View: ").pack(side='left', padx=(0, 5))
@@ -100,129 +112,106 @@ class AnalyticsTab(ttk.Frame):
         self.ax1.axis('off')
 
     def refresh_data(self):
-        """Parses the raw data files and redraws the currently selected graph."""
-        self.parse_history()
+        """Collects the history on the background loader; `on_history_loaded` redraws the graph."""
+        self.progress_bar.config(value=0)
+        self.progress_bar.pack(side='right', padx=10)
+        self.loader.submit(LOAD_KEY, self.parse_history, self.user_dir,
+                           on_done=self.on_history_loaded, on_error=self.on_history_error,
+                           on_progress=self.on_history_progress)
+
+    def on_history_progress(self, done, total):
+        """Loader callback: shows the number of sessions collected so far."""
+        self.progress_bar.config(maximum=max(total, 1), value=done)
+
+    def on_history_loaded(self, history):
+        """Loader callback: takes over the collected statistics and redraws the selected graph."""
+        self.progress_bar.pack_forget()
+        self.session_data, self.weekly_sessions, self.monthly_sessions = history
         self.plot_graphs()
 
+    def on_history_error(self, error):
+        """Loader callback: keeps the previous statistics when the history could not be collected."""
+        self.progress_bar.pack_forget()
+        print(f"Error collecting history: {error}")
+
     def on_graph_select(self, event):
         """Event handler for the graph selector combobox; triggers graph redraw."""
         self.plot_graphs()
 
-    def parse_history(self):
+    @staticmethod
+    def parse_history(task, user_dir):
         """
-        Reads all CSV data files for the current user, extracts metadata and 
-        performance statistics, and aggregates them into instance variables.
+        Worker: collects the per-session statistics for a user's sessions.
+
+        Statistics come from the user's `SummaryIndex`, so only session files 
+        that are new or changed since the last refresh are actually parsed.
+        Progress is reported per session, which is also where a cancelled
+        collection stops.
 
         Calculates:
         - Session count per week and month.
         - Per-session averages for velocity and max angle achieved per rep.
         - Total reps per session (which is used for the Reps per Session plot).
+
+        Args:
+            task (LoadTask): The running task.
+            user_dir (str): The user's session directory.
+
+        Returns:
+            tuple: (session_data, weekly_sessions, monthly_sessions).
         """
-        # Reset containers
-        # self.daily_reps.clear() # REMOVED
-        self.weekly_sessions.clear()
-        self.monthly_sessions.clear()
-        self.session_data = []
-
-        if not os.path.exists(self.user_dir):
-            return
-
-        files = glob.glob(os.path.join(self.user_dir, "*.csv"))
-        # Sort by filename (which contains date) to ensure chronological order
-        files.sort() 
-
-        for filepath in files:
-            filename = os.path.basename(filepath)
-            try:
-                # Filename format: datalog_YYYYMMDD_HHMMSS.csv
-                parts = filename.split('_')
-                date_part = parts[1]
-                time_part = parts[2].split('.')[0]
-                session_dt = datetime.strptime(f"{date_part}{time_part}", "%Y%m%d%H%M%S")
-                display_date = session_dt.strftime("%Y-%m-%d")
+        session_data = [] # List of dicts containing parsed stats per session
+        weekly_sessions = defaultdict(int)
+        monthly_sessions = defaultdict(int)
+
+        if not os.path.exists(user_dir):
+            return session_data, weekly_sessions, monthly_sessions
+
+        sessions = list_sessions(user_dir)
+        index = SummaryIndex(user_dir) # Persistent per-session summary cache
+
+        try:
+            # Sort by timestamp (from the filename) to ensure chronological order
+            for done, timestamp in enumerate(sorted(sessions)):
+                task.report(done, len(sessions))
+                filepath = sessions[timestamp]
+                filename = os.path.basename(filepath)
+                try:
+                    # Filename format: datalog_YYYYMMDD_HHMMSS.lgs / .csv
+                    session_dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+                    display_date = session_dt.strftime("%Y-%m-%d")
                 
-                # Keys for frequency charts
-                week_key = session_dt.strftime("%Y-W%U")
-                month_key = session_dt.strftime("%Y-%m")
+                    # Keys for frequency charts
+                    week_key = session_dt.strftime("%Y-W%U")
+                    month_key = session_dt.strftime("%Y-%m")
                 
-            except (IndexError, ValueError):
-                continue 
-
-            # Per Session Variables
-            target_angle = 0.0
-            max_angle_calibration = 0.0
-            
-            rep_max_angles = defaultdict(float) 
-            positive_velocities = []
-            set_max_reps = defaultdict(int)
-
-            try:
-                with open(filepath, 'r') as f:
-                    reader = csv.reader(f)
-                    
-                    # Parse Metadata Rows
-                    row1 = next(reader, None)
-                    if row1 and row1[0] == 'Max':
-                        max_angle_calibration = float(row1[1])
-                    
-                    row2 = next(reader, None)
-                    if row2 and row2[0] == 'Target':
-                        target_angle = float(row2[1])
-
-                    headers = next(reader, None) # Skip Headers
-                    
-                    # Parse Data Rows
-                    for row in reader:
-                        if len(row) < 5: continue
-                        try:
-                            set_num = int(row[0])
-                            rep_count = int(row[2])
-                            angle = float(row[3])
-                            velocity = float(row[4])
-
-                            # Track Max Reps per Set
-                            if rep_count > set_max_reps[set_num]:
-                                set_max_reps[set_num] = rep_count
-
-                            # Track Max Angle per specific Rep
-                            key = (set_num, rep_count)
-                            if angle > rep_max_angles[key]:
-                                rep_max_angles[key] = angle
-
-                            # Track Positive Velocity
-                            if velocity > 0:
-                                positive_velocities.append(velocity)
-
-                        except ValueError:
-                            continue
-                    
+                except ValueError:
+                    continue 
+
+                try:
+                    summary = index.get(filepath)
+
                     # Session Aggregation
-                    total_reps = sum(set_max_reps.values())
-                    # self.daily_reps[display_date] += total_reps # REMOVED
-                    
-                    self.weekly_sessions[week_key] += 1
-                    self.monthly_sessions[month_key] += 1
-
-                    # Calculate Averages
-                    avg_velocity = 0.0
-                    if positive_velocities:
-                        avg_velocity = sum(positive_velocities) / len(positive_velocities)
-                    
-                    avg_max_angle = 0.0
-                    if rep_max_angles:
-                        avg_max_angle = sum(rep_max_angles.values()) / len(rep_max_angles)
-
-                    self.session_data.append({
+                    weekly_sessions[week_key] += 1
+                    monthly_sessions[month_key] += 1
+
+                    session_data.append({
                         'dt': session_dt,
                         'date_str': display_date,
-                        'target_angle': target_angle,
-                        'avg_pos_velocity': avg_velocity,
-                        'avg_max_angle': avg_max_angle,
-                        'total_reps': total_reps # This is the reps per session
+                        'target_angle': summary['target_angle'],
+                        'avg_pos_velocity': summary['avg_pos_velocity'],
+                        'avg_max_angle': summary['avg_max_angle'],
+                        'total_reps': summary['total_reps'] # This is the reps per session
                     })
 
-            except Exception as e:
-                print(f"Error parsing {filename}: {e}")
+                except Exception as e:
+                    print(f"Error parsing {filename}: {e}")
+
+            index.prune(sessions.values())
+        finally:
+            # Persist any newly computed summaries for the next refresh, even from a cancelled collection
+            index.save()
+        return session_data, weekly_sessions, monthly_sessions
 
     def plot_graphs(self):
         """Clears the existing Matplotlib figure and draws the graph based on the current selection."""
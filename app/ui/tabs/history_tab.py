@@ -1,10 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import os
-import csv
+import time
 import logging
+import numpy as np
 from datetime import datetime
 from core.config_manager import config
+from core.session_io import list_sessions, open_session_index
+from core.downsample import MinMaxPyramid
+from core.background_loader import BackgroundLoader
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
@@ -18,8 +22,71 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 """
 Module containing the HistoryTab, a Tkinter frame dedicated to viewing 
 the detailed raw data of previously recorded exercise sessions.
+
+Scrubbing looks the cursor time up in a sorted time index with a binary search
+and redraws only the two cursor dots: they are animated artists blitted on a
+background captured after each full draw. With the plot focused, Left/Right
+step one sample, Shift+Left/Right one second, Home/End jump to the ends of
+the set, and Space plays the set back in real time.
+
+Both traces are drawn at about screen resolution from min/max pyramids
+(core.downsample) cached per set of the open session. Zooming the angle plot
+(mouse wheel, +/-, 0 or a double-click to reset) redraws the visible range
+from a finer level; the cursor always uses the raw samples.
+
+Opening a session (indexing its sets) and decoding a set run on the
+BackgroundLoader, so the UI stays responsive while a large session is read;
+a progress bar shows the indexing, and picking another session or set cancels
+the load in flight.
 """
 
+PLAYBACK_INTERVAL_MS = 33 # About 30 cursor updates per second during playback
+STEP_SECONDS = 1.0        # Shift+Left/Right step
+ZOOM_STEP = 0.8           # Visible time span factor per zoom-in step
+MIN_ZOOM_SPAN = 0.5       # Narrowest visible time span in seconds
+LOAD_KEY = 'history'      # Loader key: a new session or set load replaces the previous one
+
+
+def prepare_set(task, session, set_num, pyramids=None):
+    """
+    Worker: decodes one set and builds its time index and min/max pyramids.
+
+    Args:
+        task (LoadTask): The running task, checked between the steps.
+        session (SessionIndex): The open session.
+        set_num (int): The set to decode.
+        pyramids (tuple, optional): Cached (angle pyramid, CoP pyramid) of the set.
+
+    Returns:
+        dict: The plotting vectors (`times`, `angles`, `x`, `y`), the sorted
+              time index (`time_order`, `sorted_times`, `sorted_angles`) and
+              `pyramids`; all vectors are empty if the set has no records.
+    """
+    records = session.set_records(set_num)
+    task.check()
+    data = {
+        'times': np.asarray(records['time'], dtype=float),
+        'angles': np.asarray(records['angle'], dtype=float),
+        'x': np.asarray(records['x'], dtype=float),
+        'y': np.asarray(records['y'], dtype=float),
+    }
+    times = data['times']
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        data['time_order'] = np.argsort(times, kind='stable')
+        data['sorted_times'] = times[data['time_order']]
+        data['sorted_angles'] = data['angles'][data['time_order']]
+    else:
+        data['time_order'] = None
+        data['sorted_times'] = times
+        data['sorted_angles'] = data['angles']
+
+    if pyramids is None and len(times):
+        task.check()
+        pyramids = (MinMaxPyramid(data['sorted_angles']), MinMaxPyramid(data['x'], data['y']))
+    data['pyramids'] = pyramids
+    return data
+
+
 class HistoryTab(ttk.Frame):
     """
     A Tkinter tab component that allows users to select and view the 
@@ -28,35 +95,52 @@ class HistoryTab(ttk.Frame):
     It includes an interactive scrubbing feature that links a cursor across 
     both plots based on time.
     """
-    def __init__(self, parent, username, **kwargs):
+    def __init__(self, parent, username, loader=None, **kwargs):
         """
         Initializes the HistoryTab.
 
         Args:
             parent (ttk.Notebook): The Notebook widget this tab belongs to.
             username (str): The username of the currently logged-in user.
+            loader (BackgroundLoader, optional): Shared loader; the tab creates its own if omitted.
         """
         super().__init__(parent, **kwargs)
 
         self.username = username
+        self.loader = loader or BackgroundLoader(widget=self)
 
         # Instance variables to store data
         self.session_files = {} # Maps display name to full file path
-        self.current_session_data = [] # Raw rows of data for the selected session
-        self.current_session_headers = []
+        self.current_session = None # SessionIndex of the selected session
         self.calibrated_max_angle = None
         self.saved_target_angle = None
         
         # Variables to hold plotting data for interactivity (all synchronized by index)
-        self.times = []
-        self.angles = []
-        self.x_coords = [] # CoP X-coordinates
-        self.y_coords = [] # CoP Y-coordinates
+        self.times = np.empty(0)
+        self.angles = np.empty(0)
+        self.x_coords = np.empty(0) # CoP X-coordinates
+        self.y_coords = np.empty(0) # CoP Y-coordinates
+
+        # Sorted time index for the cursor lookups
+        self.sorted_times = np.empty(0)
+        self.sorted_angles = np.empty(0)
+        self.time_order = None # Sorted position -> sample index, None when the times are already sorted
+
+        # Level-of-detail rendering
+        self.lod_cache = {}        # Set number -> (angle pyramid, CoP pyramid) for the open session
+        self.angle_pyramid = None
+        self.angle_line = None
 
         # References to the cursor visual elements
         self.cursor_angle_dot = None # The dot on the Angle plot
         self.cursor_cop_dot = None   # The dot on the CoP plot
+        self.cursor_position = None  # Position of the cursor in sorted_times
         self.is_dragging = False     # Track if mouse button is held down
+        self.background = None       # The figure without the cursor dots, for blitting
+
+        # Playback state
+        self.play_job = None
+        self.play_origin = None # (wall clock, session time) when playback (re)started
 
         self.setup_widgets()
         self.load_session_files()
@@ -79,8 +163,16 @@ class HistoryTab(ttk.Frame):
         meta_label = ttk.Label(control_frame, textvariable=self.metadata_label_var, font=("Helvetica", 10, "italic"))
         meta_label.grid(row=0, column=4, sticky='w')
 
+        self.play_button = ttk.Button(control_frame, text="Play", command=self.toggle_playback)
+        self.play_button.grid(row=0, column=5, padx=(10, 0), sticky='e')
+
         refresh_btn = ttk.Button(control_frame, text="Refresh Data", command=self.refresh_history)
-        refresh_btn.grid(row=0, column=5, padx=(10, 0), sticky='e')
+        refresh_btn.grid(row=0, column=6, padx=(10, 0), sticky='e')
+
+        # Shown only while a session or set is loading
+        self.progress_bar = ttk.Progressbar(control_frame, length=120)
+        self.progress_bar.grid(row=0, column=7, padx=(10, 0), sticky='e')
+        self.progress_bar.grid_remove()
 
         control_frame.columnconfigure(4, weight=1) 
 
@@ -101,6 +193,23 @@ class HistoryTab(ttk.Frame):
         self.canvas.mpl_connect('button_press_event', self.on_click)
         self.canvas.mpl_connect('motion_notify_event', self.on_drag)
         self.canvas.mpl_connect('button_release_event', self.on_release)
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
+
+        # Keyboard stepping and playback (the plot takes focus when clicked)
+        widget = self.canvas.get_tk_widget()
+        widget.bind('<Left>', lambda e: self.step(-1))
+        widget.bind('<Right>', lambda e: self.step(1))
+        widget.bind('<Shift-Left>', lambda e: self.step_seconds(-STEP_SECONDS))
+        widget.bind('<Shift-Right>', lambda e: self.step_seconds(STEP_SECONDS))
+        widget.bind('<Home>', lambda e: self.jump_to(0))
+        widget.bind('<End>', lambda e: self.jump_to(len(self.sorted_times) - 1))
+        widget.bind('<space>', self.toggle_playback)
+        for key in ('<plus>', '<equal>', '<KP_Add>'):
+            widget.bind(key, lambda e: self.zoom(self.zoom_center(), ZOOM_STEP))
+        for key in ('<minus>', '<KP_Subtract>'):
+            widget.bind(key, lambda e: self.zoom(self.zoom_center(), 1 / ZOOM_STEP))
+        widget.bind('<Key-0>', lambda e: self.reset_zoom())
 
         self.reset_plots()
 
@@ -110,6 +219,8 @@ class HistoryTab(ttk.Frame):
 
     def refresh_history(self):
         """Clears the current view, reloads the list of available session files, and resets the plots."""
+        self.cancel_loading()
+        self.current_session = None
         self.load_session_files()
         self.set_combo.set('')
         self.set_combo.config(state="disabled")
@@ -117,13 +228,19 @@ class HistoryTab(ttk.Frame):
 
     def reset_plots(self, message="Select a session to load data"):
         """Clears both plot axes and sets them to their default, empty state."""
+        self.stop_playback()
         self.ax_cop.clear()
         self.ax_angle.clear()
 
         # Reset cursor references
         self.cursor_angle_dot = None
         self.cursor_cop_dot = None
+        self.cursor_position = None
         self.is_dragging = False
+        self.times = self.sorted_times = self.sorted_angles = np.empty(0)
+        self.time_order = None
+        self.angle_pyramid = None
+        self.angle_line = None
 
         cop_x_lim = config.getfloat('Plotting', 'cop_x_limit', fallback=10)
         cop_y_lim = config.getfloat('Plotting', 'cop_y_limit', fallback=10)
@@ -159,18 +276,15 @@ class HistoryTab(ttk.Frame):
                 return
 
             session_files_found = []
-            for filename in os.listdir(user_sessions_dir):
-                if filename.startswith('datalog_') and filename.endswith('.csv'):
-                    full_path = os.path.join(user_sessions_dir, filename)
-                    try:
-                        # Extract timestamp from filename format: datalog_YYYYMMDD_HHMMSS.csv
-                        timestamp_str = filename[8:-4] 
-                        dt = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
-                        display_name = dt.strftime('%Y-%m-%d %H:%M:%S')
-                        self.session_files[display_name] = full_path
-                        session_files_found.append(display_name)
-                    except ValueError:
-                        logging.warning(f"Skipping file with unexpected name: {filename}")
+            for timestamp_str, full_path in list_sessions(user_sessions_dir).items():
+                try:
+                    # Timestamp from filename format: datalog_YYYYMMDD_HHMMSS.lgs / .csv
+                    dt = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S')
+                    display_name = dt.strftime('%Y-%m-%d %H:%M:%S')
+                    self.session_files[display_name] = full_path
+                    session_files_found.append(display_name)
+                except ValueError:
+                    logging.warning(f"Skipping file with unexpected name: {os.path.basename(full_path)}")
             
             if session_files_found:
                 # Display the most recent sessions first
@@ -189,74 +303,46 @@ class HistoryTab(ttk.Frame):
         """
         Event handler for the session combobox selection.
 
-        Parses the selected CSV file, extracts metadata and all raw data rows, 
-        and populates the set combobox.
+        Opens the selected session file (binary or legacy CSV) through its set
+        index on the background loader; `on_session_loaded` continues once the
+        index is built. Records are only read when a set is plotted.
         """
         selected_display_name = self.session_combo.get()
         file_path = self.session_files.get(selected_display_name)
         if not file_path:
             return
 
-        self.current_session_data = []  
-        self.current_session_headers = []
+        self.current_session = None
         self.calibrated_max_angle = None 
         self.saved_target_angle = None 
-        sets = set()
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                try:
-                    # Parse metadata (Max angle)
-                    line1 = next(reader)
-                    if line1 and line1[0] == 'Max':
-                        self.calibrated_max_angle = float(line1[1])
-                    else:
-                        self.current_session_headers = line1 
-                except StopIteration:
-                    messagebox.showerror("Error", "File is empty.", parent=self)
-                    return
-
-                if not self.current_session_headers:
-                    try:
-                        # Parse metadata (Target angle) and get headers
-                        line2 = next(reader)
-                        if line2 and line2[0] == 'Target':
-                            self.saved_target_angle = float(line2[1])
-                            self.current_session_headers = next(reader)
-                        else:
-                            self.current_session_headers = line2
-                    except StopIteration:
-                        pass 
-
-                # Update metadata label
-                meta_text = ""
-                if self.calibrated_max_angle:
-                    meta_text += f"Max: {self.calibrated_max_angle:.1f}°"
-                if self.saved_target_angle:
-                    meta_text += f" | Target: {self.saved_target_angle:.1f}°"
-                self.metadata_label_var.set(meta_text if meta_text else "No metadata found.")
-
-                # Read remaining data rows
-                if self.current_session_headers and 'Set' in self.current_session_headers:
-                    set_col_idx = self.current_session_headers.index('Set')
-                    for row in reader:
-                        if len(row) == len(self.current_session_headers):
-                            self.current_session_data.append(row)
-                            sets.add(row[set_col_idx])  
-                        else:
-                            logging.warning(f"Skipping row with incorrect column count: {row}")
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to read file: {e}", parent=self)
-            self.metadata_label_var.set("Error reading file.")
-            self.current_session_headers = []  
-            return
-
-        sorted_sets = sorted(list(sets), key=lambda x: int(x) if x.isdigit() else 0)
-        
-        # --- MODIFIED CODE START ---
-        self.set_combo['values'] = sorted_sets # Removed: ["All Sets"] + 
+        self.lod_cache = {}
+        self.set_combo.set('')
+        self.set_combo.config(state="disabled")
+        self.reset_plots(f"Loading {selected_display_name}...")
+
+        self.metadata_label_var.set("Loading session...")
+        self.show_loading()
+        self.loader.submit(LOAD_KEY, lambda task, path: open_session_index(path, progress=task.report), file_path,
+                           on_done=self.on_session_loaded, on_error=self.on_load_error,
+                           on_progress=self.on_load_progress)
+
+    def on_session_loaded(self, session):
+        """Loader callback: shows the metadata and the sets of the opened session."""
+        self.hide_loading()
+        self.current_session = session
+        self.calibrated_max_angle = session.max_angle
+        self.saved_target_angle = session.target_angle
+
+        # Update metadata label
+        meta_text = ""
+        if self.calibrated_max_angle:
+            meta_text += f"Max: {self.calibrated_max_angle:.1f}°"
+        if self.saved_target_angle:
+            meta_text += f" | Target: {self.saved_target_angle:.1f}°"
+        self.metadata_label_var.set(meta_text if meta_text else "No metadata found.")
+
+        sorted_sets = [str(s) for s in session.sets()]
+        self.set_combo['values'] = sorted_sets
         
         if sorted_sets:
             self.set_combo.set(sorted_sets[0]) # Set the default to the first set
@@ -266,8 +352,38 @@ class HistoryTab(ttk.Frame):
             self.set_combo.set('') # No sets found
             self.set_combo.config(state="disabled")
             self.reset_plots("Session loaded, but no sets found.")
-            
-        # --- MODIFIED CODE END ---
+
+    def on_load_error(self, error):
+        """Loader callback: reports a session or set that could not be read."""
+        self.hide_loading()
+        messagebox.showerror("Error", f"Failed to read file: {error}", parent=self)
+        self.metadata_label_var.set("Error reading file.")
+        self.reset_plots("Error reading file.")
+
+    # --- BACKGROUND LOADING ---
+
+    def show_loading(self):
+        """Shows the progress bar, moving indeterminately until progress is reported."""
+        self.progress_bar.config(mode='indeterminate', value=0)
+        self.progress_bar.grid()
+        self.progress_bar.start(15)
+
+    def on_load_progress(self, done, total):
+        """Loader callback: shows the fraction of the file indexed so far."""
+        if self.progress_bar['mode'] != 'determinate':
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate')
+        self.progress_bar.config(maximum=max(total, 1), value=done)
+
+    def hide_loading(self):
+        """Hides the progress bar."""
+        self.progress_bar.stop()
+        self.progress_bar.grid_remove()
+
+    def cancel_loading(self):
+        """Cancels the session or set load in flight, if any."""
+        self.loader.cancel(LOAD_KEY)
+        self.hide_loading()
 
     def on_set_selected(self, event=None):
         """Event handler for the set combobox selection; triggers plotting of the selected set."""
@@ -278,61 +394,70 @@ class HistoryTab(ttk.Frame):
 
     def plot_data(self, selected_set):
         """
-        Filters the raw data by the selected set, extracts the plotting vectors, 
-        and redraws both the CoP and Angle charts.
+        Decodes only the selected set's records on the background loader;
+        `draw_set` redraws both the CoP and Angle charts once they are ready.
         """
+        self.stop_playback()
+        if self.current_session is None or len(self.current_session) == 0:
+            self.reset_plots("No data to display.")
+            return
+
+        try:
+            set_num = int(selected_set)
+        except ValueError:
+            self.reset_plots(f"No data found for '{selected_set}'.")
+            return
+
+        self.show_loading()
+        self.loader.submit(LOAD_KEY, prepare_set, self.current_session, set_num, self.lod_cache.get(set_num),
+                           on_done=lambda data: self.draw_set(selected_set, set_num, data),
+                           on_error=self.on_load_error)
+
+    def draw_set(self, selected_set, set_num, data):
+        """
+        Loader callback: takes over the decoded set and redraws both charts.
+
+        Args:
+            selected_set (str): The set as shown in the combobox.
+            set_num (int): The set number.
+            data (dict): The result of `prepare_set`.
+        """
+        self.hide_loading()
+        self.stop_playback()
         self.ax_cop.clear()
         self.ax_angle.clear()
 
         # Reset cursors when plotting new data
         self.cursor_angle_dot = None
         self.cursor_cop_dot = None
+        self.cursor_position = None
         self.is_dragging = False
-
-        if not self.current_session_data or not self.current_session_headers:
-            self.reset_plots("No data to display.")
-            return
-
-        try:
-            # Get column indices
-            set_idx = self.current_session_headers.index('Set')
-            time_idx = self.current_session_headers.index('Time')
-            angle_idx = self.current_session_headers.index('Angle')
-            x_idx = self.current_session_headers.index('X')
-            y_idx = self.current_session_headers.index('Y')
-        except ValueError as e:
-            logging.error(f"Missing expected column in CSV: {e}")
-            self.reset_plots(f"Error: Missing column {e}")
-            return
-
-        # Clear previous instance data
-        self.times = []
-        self.angles = []
-        self.x_coords = []
-        self.y_coords = []
-
-        # Filter data based on selected set
-        # Since 'selected_set' will now always be a specific set number (e.g., '1', '2'), 
-        # the 'All Sets' check is effectively removed for filtering.
-        for row in self.current_session_data:
-            if row[set_idx] == selected_set: # Simplified filtering
-                try:
-                    self.times.append(float(row[time_idx]))
-                    self.angles.append(float(row[angle_idx]))
-                    self.x_coords.append(float(row[x_idx]))
-                    self.y_coords.append(float(row[y_idx]))
-                except (ValueError, IndexError):
-                    continue
+        self.angle_pyramid = None
+        self.angle_line = None
+
+        # Plotting vectors for the selected set
+        self.times = data['times']
+        self.angles = data['angles']
+        self.x_coords = data['x']
+        self.y_coords = data['y']
         
-        if not self.times:
+        if len(self.times) == 0:
             self.reset_plots(f"No data found for '{selected_set}'.")
             return
+        self.time_order = data['time_order']
+        self.sorted_times = data['sorted_times']
+        self.sorted_angles = data['sorted_angles']
+
+        # Min/max pyramids, built once per set of the open session
+        self.lod_cache[set_num] = data['pyramids']
+        self.angle_pyramid, cop_pyramid = data['pyramids']
 
         # --- CoP Plot (X vs Y) ---
         cop_x_lim = config.getfloat('Plotting', 'cop_x_limit', fallback=10)
         cop_y_lim = config.getfloat('Plotting', 'cop_y_limit', fallback=10)
         
-        self.ax_cop.plot(self.x_coords, self.y_coords, 'b-', alpha=0.5, lw=2)
+        cop_indices = cop_pyramid.indices(0, len(self.x_coords), self.pixel_width(self.ax_cop))
+        self.ax_cop.plot(self.x_coords[cop_indices], self.y_coords[cop_indices], 'b-', alpha=0.5, lw=2)
         self.ax_cop.set_xlim(-cop_x_lim, cop_x_lim)
         self.ax_cop.set_ylim(-cop_y_lim, cop_y_lim)
         self.ax_cop.set_title("Center of Pressure")
@@ -345,13 +470,14 @@ class HistoryTab(ttk.Frame):
         angle_y_min = config.getfloat('Plotting', 'angle_y_min', fallback=-10)
         angle_y_max = config.getfloat('Plotting', 'angle_y_max', fallback=100)
         
-        self.ax_angle.plot(self.times, self.angles, 'g-')
+        self.angle_line, = self.ax_angle.plot([], [], 'g-')
         self.ax_angle.set_title("Relative Angle")
         self.ax_angle.set_xlabel("Time (s)")
         self.ax_angle.set_ylabel("Angle (degrees)")
         self.ax_angle.grid(True)
         self.ax_angle.set_ylim(angle_y_min, angle_y_max)
-        self.ax_angle.set_xlim(min(self.times), max(self.times))
+        self.ax_angle.set_xlim(self.sorted_times[0], self.sorted_times[-1])
+        self.refresh_detail()
 
         # Add Target/Max Line
         target_to_plot = None
@@ -367,10 +493,132 @@ class HistoryTab(ttk.Frame):
             self.ax_angle.axhline(y=target_to_plot, color='green', linestyle='--', linewidth=1.5, label=label_text)
             self.ax_angle.legend(loc='upper right', fontsize='small')
 
+        # Cursor dots, left out of full draws and blitted over the background
+        self.cursor_angle_dot, = self.ax_angle.plot([], [], 'ro', markersize=6, zorder=5, animated=True)
+        self.cursor_cop_dot, = self.ax_cop.plot([], [], 'ro', markersize=8, zorder=5, animated=True)
+
         self.canvas.draw()
 
+    # --- LEVEL OF DETAIL AND ZOOM ---
+
+    @staticmethod
+    def pixel_width(ax):
+        """Returns the width of an axes in pixels (at least 100 before the first layout)."""
+        return max(100, int(ax.bbox.width))
+
+    def refresh_detail(self):
+        """Sets the angle trace to the pyramid level matching the visible time range."""
+        if self.angle_line is None or self.angle_pyramid is None:
+            return
+        low, high = self.ax_angle.get_xlim()
+        # One sample beyond each edge, so the trace reaches the borders
+        start = int(np.searchsorted(self.sorted_times, low)) - 1
+        stop = int(np.searchsorted(self.sorted_times, high, side='right')) + 1
+        indices = self.angle_pyramid.indices(start, stop, self.pixel_width(self.ax_angle))
+        self.angle_line.set_data(self.sorted_times[indices], self.sorted_angles[indices])
+
+    def set_view(self, low, high):
+        """Shows a time range on the angle plot at the matching level of detail."""
+        self.ax_angle.set_xlim(low, high)
+        self.refresh_detail()
+        self.canvas.draw_idle()
+
+    def zoom_center(self):
+        """Returns the time to zoom around from the keyboard: the cursor, or the middle of the view."""
+        if self.cursor_position is not None:
+            return self.sorted_times[self.cursor_position]
+        low, high = self.ax_angle.get_xlim()
+        return (low + high) / 2
+
+    def zoom(self, center, factor):
+        """
+        Scales the visible time span around a time, within the set.
+
+        Args:
+            center (float): The time that keeps its position on screen.
+            factor (float): New span / current span (< 1 zooms in).
+        """
+        if len(self.sorted_times) < 2 or self.angle_line is None:
+            return
+        full_low, full_high = self.sorted_times[0], self.sorted_times[-1]
+        low, high = self.ax_angle.get_xlim()
+        span = min(full_high - full_low, max(MIN_ZOOM_SPAN, (high - low) * factor))
+        low = center - (center - low) * span / (high - low)
+        low = min(max(low, full_low), full_high - span)
+        self.set_view(low, low + span)
+
+    def reset_zoom(self):
+        """Shows the whole set again."""
+        if len(self.sorted_times) and self.angle_line is not None:
+            self.set_view(self.sorted_times[0], self.sorted_times[-1])
+
+    def on_scroll(self, event):
+        """Matplotlib event: zooms the angle plot around the pointer."""
+        if event.inaxes == self.ax_angle:
+            self.zoom(event.xdata, ZOOM_STEP if event.button == 'up' else 1 / ZOOM_STEP)
+
     # --- INTERACTIVE CURSOR LOGIC ---
 
+    def nearest_position(self, t):
+        """
+        Binary search for the sample nearest in time.
+
+        Args:
+            t (float): A time in seconds.
+
+        Returns:
+            int: The position in `sorted_times` of the nearest sample.
+        """
+        position = int(np.searchsorted(self.sorted_times, t))
+        if position >= len(self.sorted_times):
+            return len(self.sorted_times) - 1
+        if position > 0 and t - self.sorted_times[position - 1] <= self.sorted_times[position] - t:
+            return position - 1
+        return position
+
+    def on_draw(self, event):
+        """Matplotlib event: captures the background after a full draw and puts the cursor dots back."""
+        self.background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_cursors()
+
+    def draw_cursors(self):
+        """Draws the cursor dots into the figure buffer."""
+        for dot in (self.cursor_angle_dot, self.cursor_cop_dot):
+            if dot is not None:
+                self.fig.draw_artist(dot)
+
+    def show_cursor(self, position):
+        """
+        Moves both cursor dots to a sample and blits them.
+
+        Args:
+            position (int): Position in `sorted_times`; clamped to the set.
+        """
+        if len(self.sorted_times) == 0 or self.cursor_angle_dot is None:
+            return
+        position = min(max(position, 0), len(self.sorted_times) - 1)
+        self.cursor_position = position
+        idx = self.time_order[position] if self.time_order is not None else position
+
+        self.cursor_angle_dot.set_data([self.times[idx]], [self.angles[idx]])
+        self.cursor_cop_dot.set_data([self.x_coords[idx]], [self.y_coords[idx]])
+
+        # Follow the cursor when it leaves a zoomed view (keyboard or playback)
+        low, high = self.ax_angle.get_xlim()
+        if not low <= self.times[idx] <= high:
+            span = high - low
+            start = min(max(self.times[idx] - span / 2, self.sorted_times[0]), self.sorted_times[-1] - span)
+            self.set_view(start, start + span) # The redraw puts the dots back
+            return
+
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.draw_cursors()
+        self.canvas.blit(self.ax_angle.bbox)
+        self.canvas.blit(self.ax_cop.bbox)
+
     def update_cursors(self, x_input):
         """
         Updates the position of the marker dots on both plots based on a time 
@@ -382,38 +630,72 @@ class HistoryTab(ttk.Frame):
         Args:
             x_input (float): The time value (x-coordinate) from the mouse event on the angle plot.
         """
-        if not self.times:
+        if len(self.sorted_times) == 0:
             return
+        self.show_cursor(self.nearest_position(x_input))
 
-        # 1. Find nearest index
-        # Finds the index with the minimum absolute difference from x_input
-        idx = min(range(len(self.times)), key=lambda i: abs(self.times[i] - x_input))
-
-        # 2. Get values at that index
-        t = self.times[idx]
-        ang = self.angles[idx]
-        cx = self.x_coords[idx]
-        cy = self.y_coords[idx]
-
-        # 3. Update Angle Graph Dot (Red Dot)
-        if self.cursor_angle_dot:
-            self.cursor_angle_dot.set_data([t], [ang])
+    def step(self, samples):
+        """Keyboard: moves the cursor by a number of samples."""
+        self.stop_playback()
+        if self.cursor_position is None:
+            self.show_cursor(0 if samples > 0 else len(self.sorted_times) - 1)
         else:
-            # Create the dot, setting zorder to ensure it is visible over the line
-            self.cursor_angle_dot, = self.ax_angle.plot(t, ang, 'ro', markersize=6, zorder=5)
+            self.show_cursor(self.cursor_position + samples)
 
-        # 4. Update CoP Graph Dot (Red Dot)
-        if self.cursor_cop_dot:
-            self.cursor_cop_dot.set_data([cx], [cy])
+    def step_seconds(self, seconds):
+        """Keyboard: moves the cursor by a number of seconds."""
+        self.stop_playback()
+        if len(self.sorted_times) == 0:
+            return
+        current = self.sorted_times[self.cursor_position] if self.cursor_position is not None else self.sorted_times[0]
+        self.show_cursor(self.nearest_position(current + seconds))
+
+    def jump_to(self, position):
+        """Keyboard: moves the cursor to a position (Home/End)."""
+        self.stop_playback()
+        self.show_cursor(position)
+
+    def toggle_playback(self, event=None):
+        """Starts or pauses playback of the set from the cursor."""
+        if self.play_job:
+            self.stop_playback()
         else:
-            self.cursor_cop_dot, = self.ax_cop.plot(cx, cy, 'ro', markersize=8, zorder=5)
+            self.start_playback()
 
-        # 5. Efficient redraw
-        self.canvas.draw_idle()
+    def start_playback(self):
+        """Plays the set back in real time from the cursor (from the start if it is at the end)."""
+        if len(self.sorted_times) == 0 or self.cursor_angle_dot is None:
+            return
+        if self.cursor_position is None or self.cursor_position >= len(self.sorted_times) - 1:
+            self.show_cursor(0)
+        self.play_origin = (time.monotonic(), self.sorted_times[self.cursor_position])
+        self.play_button.config(text="Pause")
+        self.play_job = self.after(PLAYBACK_INTERVAL_MS, self.playback_step)
+
+    def playback_step(self):
+        """Moves the cursor to the sample matching the elapsed time and schedules the next step."""
+        started, session_time = self.play_origin
+        position = self.nearest_position(session_time + time.monotonic() - started)
+        self.show_cursor(position)
+        if position >= len(self.sorted_times) - 1:
+            self.stop_playback()
+            return
+        self.play_job = self.after(PLAYBACK_INTERVAL_MS, self.playback_step)
+
+    def stop_playback(self):
+        """Pauses playback."""
+        if self.play_job:
+            self.after_cancel(self.play_job)
+            self.play_job = None
+            self.play_button.config(text="Play")
 
     def on_click(self, event):
         """Matplotlib event: Initiates the dragging state if the click occurs on the angle plot."""
-        if event.inaxes == self.ax_angle:
+        self.canvas.get_tk_widget().focus_set()
+        if event.inaxes == self.ax_angle and event.dblclick:
+            self.reset_zoom()
+        elif event.inaxes == self.ax_angle:
+            self.stop_playback()
             self.is_dragging = True
             self.update_cursors(event.xdata)
 
@@ -424,4 +706,4 @@ class HistoryTab(ttk.Frame):
 
     def on_release(self, event):
         """Matplotlib event: Terminates the dragging state."""
-        self.is_dragging = False
\ No newline at end of file
+        self.is_dragging = False
@@ -6,6 +6,8 @@ import sys
 import platform
 import subprocess
 from core.config_manager import config
+from core.cop_protocol import PROTOCOLS
+from core.filters import FILTER_KINDS
 
 # ---------------------
 # File: settings_tab.py
@@ -103,6 +105,11 @@ class SettingsTab(ttk.Frame):
         self.vars['baudrate'] = tk.StringVar()
         ttk.Entry(hw_frame, textvariable=self.vars['baudrate']).grid(row=1, column=1, sticky="ew", padx=5)
 
+        # Serial Protocol (text lines, binary frames, or auto-detect)
+        ttk.Label(hw_frame, text="Protocol:").grid(row=2, column=0, sticky="w", pady=5)
+        self.vars['protocol'] = tk.StringVar()
+        ttk.Combobox(hw_frame, textvariable=self.vars['protocol'], values=PROTOCOLS, state="readonly").grid(row=2, column=1, sticky="ew", padx=5)
+
         hw_frame.columnconfigure(1, weight=1)
 
         # 2. Data & Paths
@@ -121,14 +128,20 @@ class SettingsTab(ttk.Frame):
 
         self.create_entry_row(algo_frame, 0, "Smoothing Window:", 'smoothing_window', 
                               "This averages sensor data to remove jitters.\n- Higher number = smoother lines but more delay (lag).\n- Lower number = very responsive but 'noisy'.\nDefault: 7")
+
+        # Smoothing Filter (applied with the window above)
+        ttk.Label(algo_frame, text="Smoothing Filter:").grid(row=1, column=0, sticky="w", pady=5)
+        self.vars['smoothing_filter'] = tk.StringVar()
+        ttk.Combobox(algo_frame, textvariable=self.vars['smoothing_filter'], values=FILTER_KINDS, state="readonly").grid(row=1, column=1, sticky="ew", padx=5)
+        self.help_info.append(("Smoothing Filter", "How the angle is smoothed over the window.\n- moving_average: plain average.\n- ema: same delay, reacts more smoothly.\n- savgol: almost no delay but noisier.\n- one_euro: smooth when still, responsive when moving.\nDefault: moving_average"))
         
-        self.create_entry_row(algo_frame, 1, "Start Velocity:", 'velocity_pos_threshold',
+        self.create_entry_row(algo_frame, 2, "Start Velocity:", 'velocity_pos_threshold',
                               "How fast you must move to START a repetition.\n- Lower number = more sensitive (easier to start).\n- Higher number = requires faster movement.\nDefault: 10.0")
 
-        self.create_entry_row(algo_frame, 2, "Return Velocity:", 'velocity_neg_threshold',
+        self.create_entry_row(algo_frame, 3, "Return Velocity:", 'velocity_neg_threshold',
                               "How fast you must move DOWN to register the return.\n- Must be a negative number.\nDefault: -10.0")
         
-        self.create_entry_row(algo_frame, 3, "Target Angle (%):", 'max_angle_tolerance_percent',
+        self.create_entry_row(algo_frame, 4, "Target Angle (%):", 'max_angle_tolerance_percent',
                               "How close to your calibration max you must get to count a rep.\n- Example: 90 means you must reach 90% of your max height.\nDefault: 90")
 
         algo_frame.columnconfigure(1, weight=1)
@@ -260,9 +273,11 @@ class SettingsTab(ttk.Frame):
             # Serial
             self.vars['port'].set(config.get('Serial', 'port', fallback=''))
             self.vars['baudrate'].set(config.get('Serial', 'baudrate', fallback='115200'))
+            self.vars['protocol'].set(config.get('Serial', 'protocol', fallback='auto'))
             
             # Algo (RepCounter)
             self.vars['smoothing_window'].set(config.get('RepCounter', 'smoothing_window', fallback='7'))
+            self.vars['smoothing_filter'].set(config.get('RepCounter', 'smoothing_filter', fallback='moving_average'))
             self.vars['velocity_pos_threshold'].set(config.get('RepCounter', 'velocity_pos_threshold', fallback='10.0'))
             self.vars['velocity_neg_threshold'].set(config.get('RepCounter', 'velocity_neg_threshold', fallback='-10.0'))
             self.vars['max_angle_tolerance_percent'].set(config.get('RepCounter', 'max_angle_tolerance_percent', fallback='90.0'))
@@ -282,7 +297,9 @@ class SettingsTab(ttk.Frame):
         if confirm:
             # Hardcoded Defaults
             self.vars['baudrate'].set('115200')
+            self.vars['protocol'].set('auto')
             self.vars['smoothing_window'].set('7')
+            self.vars['smoothing_filter'].set('moving_average')
             self.vars['velocity_pos_threshold'].set('10.0')
             self.vars['velocity_neg_threshold'].set('-10.0')
             self.vars['max_angle_tolerance_percent'].set('90.0')
@@ -300,8 +317,10 @@ class SettingsTab(ttk.Frame):
             # Update config object sections
             config.set('Serial', 'port', self.vars['port'].get())
             config.set('Serial', 'baudrate', self.vars['baudrate'].get())
+            config.set('Serial', 'protocol', self.vars['protocol'].get())
             
             config.set('RepCounter', 'smoothing_window', self.vars['smoothing_window'].get())
+            config.set('RepCounter', 'smoothing_filter', self.vars['smoothing_filter'].get())
             config.set('RepCounter', 'velocity_pos_threshold', self.vars['velocity_pos_threshold'].get())
             config.set('RepCounter', 'velocity_neg_threshold', self.vars['velocity_neg_threshold'].get())
             config.set('RepCounter', 'max_angle_tolerance_percent', self.vars['max_angle_tolerance_percent'].get())
@@ -36,7 +36,7 @@ class CalibrationWindow(tk.Toplevel):
         Args:
             parent (tk.Tk): The main application window (Dashboard).
             sensor (object): The BNO055 sensor object.
-            shared_queue (queue.Queue): The queue used for reading serial data (cleared here).
+            shared_queue (RingChannel): The channel used for reading serial data (cleared here).
             sensor_thread (SensorThread): The active thread providing angle data.
             serial_thread (SerialThread): The active thread managing serial communication.
             on_complete_callback (callable): A function to call upon completion, 
@@ -121,8 +121,7 @@ class CalibrationWindow(tk.Toplevel):
             logging.info("Sending start command to Wii Board...")
             self.serial_thread.send('c')
             # Clear old queue data to start fresh for the session
-            with self.shared_queue.mutex:
-                self.shared_queue.queue.clear()
+            self.shared_queue.clear()
 
         self.zero_sensor()
             
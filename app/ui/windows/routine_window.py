@@ -1,20 +1,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import serial
-import threading
 import queue
-import re
-import csv
 import time
-import math
-import os
-from datetime import datetime
 from collections import deque
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.animation import FuncAnimation
 import logging
 from core.config_manager import config
+from core.channels import channel_from_config
+from core.processing import DataProcessor
+from core.pipeline import ProcessPipeline, pipeline_mode, MODE_THREAD, MODE_PROCESS, MODE_ASYNCIO
+from core.async_core import AsyncPipeline
+from core import metrics
+from ui.performance_overlay import PerformanceOverlay
+from ui.live_plot import live_plot_from_config, FramePacer
 
 # ---------------------
 # File: routine_window.py
@@ -24,245 +22,14 @@ from core.config_manager import config
 # ---------------------
 
 """
-Module containing the DataProcessor thread for high-frequency data analysis and
-rep counting, and the RoutineWindow for real-time visualization and session management.
+Module containing the RoutineWindow for real-time visualization and session
+management. The processing runs in a DataProcessor (core.processing), either as
+a thread of this process or inside the pipeline process (core.pipeline).
 """
 
-class DataProcessor(threading.Thread):
-    """
-    A dedicated thread that continuously reads raw data from the shared queue
-    and sensor thread, performs smoothing, calculates velocity, executes the
-    rep counting algorithm, and logs all processed data to a CSV file.
-    """
-    def __init__(self, sensor_thread, data_queue, plot_queue, username, initial_angle=None, max_angle=None):
-        """
-        Initializes the DataProcessor thread.
-
-        Args:
-            sensor_thread (SensorThread): Active thread for angle data (BNO055).
-            data_queue (queue.Queue): Shared queue for serial data (Wii Board/CoP).
-            plot_queue (queue.Queue): Output queue to send processed data/commands to the RoutineWindow.
-            username (str): Current user's username for file logging.
-            initial_angle (float, optional): The zeroed baseline angle from calibration.
-            max_angle (float, optional): The maximum angle from calibration (used to set target).
-        """
-        super().__init__(daemon=True)
-        self.running = False
-        self.sensor_thread = sensor_thread
-        self.data_queue = data_queue
-        self.plot_queue = plot_queue
-        self.username = username
-        self.csv_file = None
-        self.csv_writer = None
-        self.start_time = 0.0
-        self.initial_angle_w = initial_angle
-        self.cop_pattern = re.compile(r"\(([-]?\d+\.\d+), ([-]?\d+\.\d+)\)")
-        self.last_known_angle = 0.0
-        
-        # Rep Counting State Machine variables
-        self.rep_count = 0
-        self.rep_state = 0 # 0: Ready, 1: Positive movement, 2: Negative movement, 3: Peak/Trough reached
-        self.last_time = 0.0
-        self.last_smoothed_angle = 0.0
-        self.consecutive_failed_reps = 0
-        self.max_angle_for_current_rep = 0.0
-        self.is_first_smooth_calc = True
-        self.readings_to_discard = 0
-        
-        # Configuration parameters loaded from config.ini
-        self.SMOOTHING_WINDOW = config.getint('RepCounter', 'smoothing_window')
-        self.angle_buffer = deque(maxlen=self.SMOOTHING_WINDOW)
-        self.VELOCITY_SMOOTHING_WINDOW = config.getint('RepCounter', 'velocity_smoothing_window', fallback=5)
-        self.velocity_buffer = deque(maxlen=self.VELOCITY_SMOOTHING_WINDOW)
-        self.VELOCITY_NEG_THRESHOLD = config.getfloat('RepCounter', 'velocity_neg_threshold', fallback=-20.0)
-        self.VELOCITY_POS_THRESHOLD = config.getfloat('RepCounter', 'velocity_pos_threshold', fallback=20.0)
-        self.VELOCITY_ZERO_THRESHOLD = config.getfloat('RepCounter', 'velocity_zero_threshold', fallback=10.0)
-        
-        self.current_set = 1
-        self.set_active = False
-        
-        self.calibrated_max_angle = max_angle if max_angle is not None else 90.0
-        
-        if self.calibrated_max_angle <= 0:
-            self.target_angle_threshold = 9999.0
-        else:
-            self.MAX_ANGLE_TOLERANCE_PERCENT = config.getfloat('RepCounter', 'max_angle_tolerance_percent', fallback=90.0)
-            self.target_angle_threshold = self.calibrated_max_angle * (self.MAX_ANGLE_TOLERANCE_PERCENT / 100.0)
-            
-        self.should_save = True
-        self.log_filename = None
-
-    def run(self):
-        """The core thread loop: initializes CSV, reads raw queue, processes data, and logs."""
-        self.running = True
-        self.setup_csv()
-        
-        while self.running:
-            try:
-                line = self.data_queue.get(timeout=1)
-                # Only process if set is active, otherwise we just drain the queue
-                if self.set_active:
-                    self.parse_and_process(line)
-            except queue.Empty:
-                continue
-            except Exception:
-                time.sleep(0.1)
-                
-        self.close_csv()
-
-    def start_set(self):
-        """Resets rep counting variables, starts the timer, and enables data processing."""
-        logging.info(f"--- Starting Set {self.current_set} ---")
-        self.rep_count = 0
-        self.rep_state = 0
-        self.start_time = time.monotonic()
-        self.last_time = self.start_time
-        self.consecutive_failed_reps = 0
-        self.max_angle_for_current_rep = 0.0
-        self.angle_buffer.clear()
-        self.velocity_buffer.clear()
-        self.last_known_angle = 0.0
-        self.is_first_smooth_calc = True
-        self.readings_to_discard = 0
-        self.set_active = True
-        self.plot_queue.put(f"SET_START:{self.current_set}")
-
-    def end_set(self, reason=""):
-        """Stops data processing for the current set, sends an END command to the GUI, and increments the set counter."""
-        if not self.set_active: return
-        logging.info(f"--- Ending Set {self.current_set} ({reason}) ---")
-        self.set_active = False
-        rep_count_at_stop = self.rep_count
-        self.plot_queue.put(f"SET_END:{self.current_set}:{reason}:{rep_count_at_stop}")
-        self.current_set += 1
-
-    def parse_and_process(self, line):
-        """
-        Parses the raw serial data (CoP), fetches the angle from the SensorThread,
-        performs smoothing, calculates velocity, runs the rep detection algorithm,
-        sends data to the plot queue, and writes to CSV.
-        """
-        cop_match = self.cop_pattern.match(line)
-        if not cop_match: return
-
-        try:
-            x, y = map(float, cop_match.groups())
-            if not (-20 < x < 20 and -20 < y < 20): return
-            
-            relative_angle = self.last_known_angle
-            
-            # Read Angle from Sensor Thread
-            if self.sensor_thread:
-                qw = self.sensor_thread.get_quaternion()[0]
-                if qw is not None:
-                    qw = max(min(qw, 1.0), -1.0)
-                    abs_angle = math.acos(qw) * 2 * (180 / math.pi)
-                    
-                    if self.initial_angle_w is None: self.initial_angle_w = abs_angle
-                    angle_candidate = abs_angle - self.initial_angle_w
-                    
-                    if angle_candidate >= 0 and abs(angle_candidate - self.last_known_angle) < 180:
-                        relative_angle = angle_candidate
-                        self.last_known_angle = relative_angle
-
-            # Smoothing
-            self.angle_buffer.append(relative_angle)
-            if len(self.angle_buffer) < self.SMOOTHING_WINDOW: return
-            
-            smoothed_angle = sum(self.angle_buffer) / self.SMOOTHING_WINDOW
-            current_time = time.monotonic() - self.start_time 
-            delta_time = current_time - self.last_time
-
-            # Velocity Calculation
-            delta_angle = 0.0
-            raw_velocity = 0.0
-
-            if self.is_first_smooth_calc:
-                self.is_first_smooth_calc = False
-            elif delta_time > 0:
-                delta_angle = smoothed_angle - self.last_smoothed_angle
-                raw_velocity = delta_angle / delta_time
-            
-            self.velocity_buffer.append(raw_velocity)
-            smoothed_velocity = sum(self.velocity_buffer) / len(self.velocity_buffer) if self.velocity_buffer else 0.0
-
-            self.last_time = current_time
-            self.last_smoothed_angle = smoothed_angle
-            is_moving = abs(smoothed_velocity) >= self.VELOCITY_ZERO_THRESHOLD
-            
-            # Rep Detection State Machine
-            if self.set_active:
-                if self.rep_state == 0: # Ready to start rep (must be still)
-                    if smoothed_velocity > self.VELOCITY_POS_THRESHOLD: self.rep_state = 1
-                    elif smoothed_velocity < self.VELOCITY_NEG_THRESHOLD: self.rep_state = 2
-                elif self.rep_state == 1: # Moving positively (upward)
-                    self.max_angle_for_current_rep = max(self.max_angle_for_current_rep, smoothed_angle)
-                    if smoothed_velocity < self.VELOCITY_NEG_THRESHOLD: self.rep_state = 3 # Reached peak/reversing
-                elif self.rep_state == 2: # Moving negatively (downward)
-                    self.max_angle_for_current_rep = max(self.max_angle_for_current_rep, smoothed_angle)
-                    if smoothed_velocity > self.VELOCITY_POS_THRESHOLD: self.rep_state = 3 # Reached trough/reversing
-                elif self.rep_state == 3: # In reversal/transition, waiting to stop
-                    if not is_moving:
-                        # Rep completed check
-                        if self.max_angle_for_current_rep < self.target_angle_threshold:
-                            self.consecutive_failed_reps += 1
-                        else:
-                            self.consecutive_failed_reps = 0 
-                        
-                        self.rep_count += 1
-                        self.rep_state = 0
-                        self.max_angle_for_current_rep = 0.0
-                        
-                        if self.consecutive_failed_reps >= 3:
-                            self.end_set(reason="3 failed reps")
-                            return
-
-                # Output data
-                data_packet = (current_time, smoothed_angle, smoothed_velocity, x, y, self.rep_count, self.current_set)
-                self.plot_queue.put(data_packet)
-                
-                # CSV logging
-                if self.csv_writer:
-                    self.csv_writer.writerow([self.current_set, f"{current_time:.4f}", self.rep_count, f"{smoothed_angle:.4f}", f"{smoothed_velocity:.4f}", f"{x:.4f}", f"{y:.4f}"])
-
-        except (ValueError, TypeError):
-            pass
-            
-    def setup_csv(self):
-        """Creates the session directory and initializes the CSV file with metadata and headers."""
-        try:
-            sessions_dir = config.get('Paths', 'sessions_base_dir')
-            user_session_path = os.path.join(sessions_dir, self.username)
-            os.makedirs(user_session_path, exist_ok=True)
-            self.log_filename = os.path.join(user_session_path, f"datalog_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-            self.csv_file = open(self.log_filename, 'w', newline='', encoding='utf-8')
-            self.csv_writer = csv.writer(self.csv_file)
-            
-            # Write Max and Target Angle Metadata
-            self.csv_writer.writerow(['Max', f"{self.calibrated_max_angle:.4f}"])
-            
-            target_val = self.target_angle_threshold if self.target_angle_threshold != 9999.0 else 0.0
-            self.csv_writer.writerow(['Target', f"{target_val:.4f}"])
-            
-            # Data Headers
-            self.csv_writer.writerow(['Set', 'Time', 'Reps', 'Angle', 'Velocity', 'X', 'Y'])
-        except IOError: self.csv_file = None
-
-    def close_csv(self):
-        """Closes the CSV file, and if `should_save` is False, deletes the file."""
-        if self.csv_file:
-            self.csv_file.close(); self.csv_file = None
-            if not self.should_save:
-                try: os.remove(self.log_filename)
-                except OSError: pass
-
-    def discard_data(self): 
-        """Sets the flag to delete the CSV file upon closing."""
-        self.should_save = False
-        
-    def stop(self): 
-        """Stops the thread's execution loop."""
-        self.running = False
+FRAME_TIME = metrics.histogram('frame_seconds', "animate_plot time per frame.")
+FRAMES = metrics.counter('frames_total', "Frames produced by animate_plot.")
+FRAME_INTERVAL = metrics.gauge('frame_interval_seconds', "Current interval between frames.")
 
 class RestTimerWindow(tk.Toplevel):
     """
@@ -318,7 +85,8 @@ class RoutineWindow(tk.Toplevel):
     The main live session window for the exercise routine.
 
     It manages the UI, starts and stops sets, displays real-time plots (CoP and
-    Angle) using Matplotlib's FuncAnimation, and handles inter-set breaks.
+    Angle) through a live renderer (ui.live_plot) driven by a Tk `after` frame
+    loop, and handles inter-set breaks.
     """
     def __init__(self, parent, username, sensor, shared_queue, sensor_thread, serial_thread, initial_angle=None, max_angle=None):
         """
@@ -328,7 +96,7 @@ class RoutineWindow(tk.Toplevel):
             parent (tk.Tk): The parent window (Dashboard).
             username (str): Current user's username.
             sensor (object): BNO055 sensor object.
-            shared_queue (queue.Queue): Shared queue for serial data.
+            shared_queue (RingChannel): Shared channel for serial data.
             sensor_thread (SensorThread): Active thread providing angle data.
             serial_thread (SerialThread): Active thread managing serial communication.
             initial_angle (float, optional): Zeroed angle from calibration.
@@ -354,7 +122,20 @@ class RoutineWindow(tk.Toplevel):
             self.target_angle_threshold = self.calibrated_max_angle * (MAX_ANGLE_TOLERANCE_PERCENT / 100.0)
 
         self.data_processor_thread = None
-        self.plot_queue = queue.Queue() # Queue to receive processed data from DataProcessor
+        self.pipeline_mode = pipeline_mode()
+        if self.pipeline_mode == MODE_PROCESS:
+            # The pipeline process owns the serial port; the sensor keeps its calibrated state
+            # in this process and its quaternions are forwarded. The output arrives through a shared-memory ring
+            self.data_processor_thread = ProcessPipeline(self.username, self.release_hardware(release_sensor=False),
+                                                         self.sensor_thread, initial_angle, self.calibrated_max_angle)
+            self.plot_queue = self.data_processor_thread.ring
+        else:
+            # Bounded channel receiving processed data from DataProcessor; command strings are never dropped
+            self.plot_queue = channel_from_config(config, 'plot', 512, protect=lambda item: isinstance(item, str))
+        if self.pipeline_mode == MODE_ASYNCIO:
+            # Acquisition and processing run as tasks on one background event loop
+            self.data_processor_thread = AsyncPipeline(self.username, self.release_hardware(), self.sensor,
+                                                       self.plot_queue, initial_angle, self.calibrated_max_angle)
         
         self.current_set = 1
         self.total_sets = 3
@@ -362,6 +143,19 @@ class RoutineWindow(tk.Toplevel):
         # Plotting configuration and data history
         self.PLOT_HISTORY_LENGTH = config.getint('Plotting', 'plot_history_length')
         self.TIME_WINDOW_SECONDS = config.getint('Plotting', 'time_window_seconds')
+        self.FRAME_INTERVAL_MS = config.getint('Plotting', 'frame_interval_ms', fallback=16)
+        self.frame_number = 0
+        self.frame_job = None
+
+        # Adaptive frames: pace by frame cost and coalesce every pending sample;
+        # otherwise a fixed interval and at most 20 samples per frame
+        self.frame_pacer = None
+        self.max_samples_per_frame = 20
+        if config.getboolean('Plotting', 'adaptive_frames', fallback=True):
+            self.frame_pacer = FramePacer(self.FRAME_INTERVAL_MS,
+                                          config.getint('Plotting', 'max_frame_interval_ms', fallback=100),
+                                          config.getfloat('Plotting', 'frame_budget', fallback=0.5))
+            self.max_samples_per_frame = self.plot_queue.stats()['capacity']
         
         self.x_cop_history = deque(maxlen=self.PLOT_HISTORY_LENGTH)
         self.y_cop_history = deque(maxlen=self.PLOT_HISTORY_LENGTH)
@@ -371,6 +165,19 @@ class RoutineWindow(tk.Toplevel):
         self.rep_count_var = tk.StringVar(value="0")
         self.current_set_var = tk.StringVar(value=f"Set: {self.current_set}")
 
+        # Queue depths for the performance overlay (F3). The dashboard's serial queue
+        # only carries this routine's samples in thread mode; the asyncio pipeline has
+        # its own channel, and in process mode the serial channel lives in the child
+        if self.pipeline_mode == MODE_THREAD:
+            metrics.register_channel('serial', self.data_queue)
+        elif self.pipeline_mode == MODE_ASYNCIO:
+            metrics.register_channel('serial', self.data_processor_thread.serial_channel)
+        else:
+            metrics.unregister_channel('serial')
+            if self.data_processor_thread.sensor_ring:
+                metrics.register_channel('sensor', self.data_processor_thread.sensor_ring)
+        metrics.register_channel('plot', self.plot_queue)
+
         self.setup_ui()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
         
@@ -378,16 +185,48 @@ class RoutineWindow(tk.Toplevel):
         logging.basicConfig(level=log_level, format='%(asctime)s - %(threadName)s - %(levelname)s - %(message)s')
         
         # Start Data Processor
-        self.data_processor_thread = DataProcessor(
-            self.sensor_thread, 
-            self.data_queue, 
-            self.plot_queue, 
-            self.username, 
-            initial_angle, 
-            self.calibrated_max_angle
-        )
+        if self.pipeline_mode == MODE_THREAD:
+            self.data_processor_thread = DataProcessor(
+                self.sensor_thread, 
+                self.data_queue, 
+                self.plot_queue, 
+                self.username, 
+                initial_angle, 
+                self.calibrated_max_angle
+            )
         self.data_processor_thread.start()
 
+    def release_hardware(self, release_sensor=True):
+        """
+        Stops the Dashboard's acquisition threads so the process or asyncio
+        pipeline can take over the serial port and the sensor (the port can only
+        be opened once). The Dashboard starts new threads for the next routine.
+
+        Args:
+            release_sensor (bool): Also stop the SensorThread. The process pipeline
+                                   keeps it running and forwards its readings,
+                                   since reopening the BNO055 would reset it.
+
+        Returns:
+            dict or None: SerialThread settings for reopening the port, or None
+                          without a serial device.
+        """
+        serial_settings = None
+        if self.serial_thread:
+            serial_settings = {
+                'port': self.serial_thread.port,
+                'baudrate': self.serial_thread.baudrate,
+                'protocol': self.serial_thread.protocol, # Already detected, so the new reader skips probing
+                'read_mode': self.serial_thread.read_mode,
+                'read_interval': self.serial_thread.read_interval,
+            }
+            self.serial_thread.stop()
+            self.serial_thread.join(timeout=2)
+        if self.sensor_thread and release_sensor:
+            self.sensor_thread.stop()
+            self.sensor_thread.join(timeout=1)
+        return serial_settings
+
     def setup_ui(self):
         """Constructs the UI, including the control panel and the Matplotlib plots."""
         main_frame = ttk.Frame(self)
@@ -426,38 +265,18 @@ class RoutineWindow(tk.Toplevel):
         data_frame = ttk.Frame(main_frame)
         data_frame.grid(row=0, column=1, sticky="nsew")
 
-        # Matplotlib Setup
-        self.fig, (self.ax_cop, self.ax_angle) = plt.subplots(1, 2, figsize=(9, 3), dpi=100, constrained_layout=True)
-        
-        cop_x_lim = config.getfloat('Plotting', 'cop_x_limit')
-        cop_y_lim = config.getfloat('Plotting', 'cop_y_limit')
-        angle_y_min = config.getfloat('Plotting', 'angle_y_min')
-        angle_y_max = config.getfloat('Plotting', 'angle_y_max')
-
-        # CoP Plot
-        self.trail_line, = self.ax_cop.plot([], [], 'b-', alpha=0.5, lw=2)
-        self.current_point_marker, = self.ax_cop.plot([], [], 'ro', markersize=8)
-        self.ax_cop.set_xlim(-cop_x_lim, cop_x_lim); self.ax_cop.set_ylim(-cop_y_lim, cop_y_lim)
-        self.ax_cop.set_xticklabels([]); self.ax_cop.set_yticklabels([])
-        self.ax_cop.set_title("Center of Pressure"); self.ax_cop.grid(True)
-        self.ax_cop.set_aspect('equal', adjustable='box')
-        
-        # Angle Plot
-        self.angle_line, = self.ax_angle.plot([], [], 'g-')
-        self.ax_angle.set_title("Relative Angle"); self.ax_angle.set_xlabel("Time (s)"); self.ax_angle.set_ylabel("Angle (degrees)")
-        self.ax_angle.grid(True)
-        self.ax_angle.set_xlim(0, self.TIME_WINDOW_SECONDS)
-        self.ax_angle.set_ylim(angle_y_min, angle_y_max)
-        
-        if self.target_angle_threshold is not None:
-            self.ax_angle.axhline(y=self.target_angle_threshold, color='green', linestyle='--', linewidth=1.5)
-        
-        self.canvas = FigureCanvasTkAgg(self.fig, master=data_frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        
-        # Start Matplotlib Animation Loop
-        self.ani = FuncAnimation(self.fig, self.animate_plot, interval=16, blit=True, cache_frame_data=False)
+        # Live CoP and Angle plots ([Plotting] live_renderer)
+        self.live_plot = live_plot_from_config(data_frame, self.target_angle_threshold)
+        self.live_plot.widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+        # Hot-path metrics drawn over the plots, toggled with F3
+        self.performance_overlay = PerformanceOverlay(data_frame)
+        self.bind('<F3>', self.performance_overlay.toggle)
+        if config.getboolean('Metrics', 'overlay', fallback=False):
+            self.performance_overlay.show()
+
+        # Start the frame loop
+        self.frame_job = self.after(self.FRAME_INTERVAL_MS, self.run_frame)
 
     def toggle_stream(self):
         """Toggles the state of the exercise session (Start Set / Stop Set)."""
@@ -527,24 +346,40 @@ class RoutineWindow(tk.Toplevel):
             
             self.rep_count_var.set("0")
 
+    def run_frame(self):
+        """
+        Runs one frame and schedules the next one: `FRAME_INTERVAL_MS` after
+        this one started, or as chosen by the FramePacer in adaptive mode.
+        """
+        started = time.perf_counter()
+        self.animate_plot(self.frame_number)
+        self.frame_number += 1
+        finished = time.perf_counter()
+        if self.frame_pacer:
+            delay_ms = self.frame_pacer.next_delay(started, finished)
+            FRAME_INTERVAL.set(self.frame_pacer.interval)
+        else:
+            delay_ms = max(1, int(self.FRAME_INTERVAL_MS - (finished - started) * 1000))
+            FRAME_INTERVAL.set(self.FRAME_INTERVAL_MS / 1000)
+        self.frame_job = self.after(delay_ms, self.run_frame)
+
     def animate_plot(self, frame):
         """
-        The Matplotlib animation callback function, executed frequently (16ms interval).
+        The frame callback, executed every `FRAME_INTERVAL_MS` (16 ms by default).
 
         It drains the `plot_queue`, updates the historical data lists (deques), 
-        updates the rep count display, and redraws the plots with the latest data.
+        updates the rep count display, and hands the history to the live renderer.
         
         Args:
             frame (int): The current frame number (unused in this context).
-
-        Returns:
-            tuple: A tuple of Matplotlib Artist objects that need redrawing (for blitting).
         """
+        frame_start = time.perf_counter()
         processed_in_frame = 0
         latest_rep_count = self.rep_count_var.get()
 
-        # Drain the plot queue to get the latest processed data
-        while processed_in_frame < 20:
+        # Drain the plot queue to get the latest processed data; commands are
+        # handled as they come and do not count towards the limit
+        while processed_in_frame < self.max_samples_per_frame:
             try:
                 data = self.plot_queue.get_nowait()
                 if isinstance(data, str):
@@ -570,24 +405,11 @@ class RoutineWindow(tk.Toplevel):
                 self.time_history.popleft()
                 self.angle_history.popleft()
 
-        # Update CoP Plot
-        self.trail_line.set_data(self.x_cop_history, self.y_cop_history)
-        if self.x_cop_history:
-             self.current_point_marker.set_data([self.x_cop_history[-1]], [self.y_cop_history[-1]])
-        else:
-             self.current_point_marker.set_data([], [])
-
-        # Update Angle Plot
-        self.angle_line.set_data(self.time_history, self.angle_history)
-        
-        if self.time_history:
-            latest_time = self.time_history[-1]
-            if latest_time > self.TIME_WINDOW_SECONDS:
-                self.ax_angle.set_xlim(latest_time - self.TIME_WINDOW_SECONDS, latest_time)
-            else:
-                self.ax_angle.set_xlim(0, self.TIME_WINDOW_SECONDS)
+        # Update the CoP and Angle plots
+        self.live_plot.draw(self.time_history, self.angle_history, self.x_cop_history, self.y_cop_history)
 
-        return self.trail_line, self.current_point_marker, self.angle_line # Return artists for blitting
+        FRAMES.inc()
+        FRAME_TIME.observe(time.perf_counter() - frame_start)
 
     def on_closing(self):
         """
@@ -595,5 +417,8 @@ class RoutineWindow(tk.Toplevel):
         if data has been recorded, then safely closes the data processing thread.
         """
         # Automatically set to save (answer = True logic)
+        if self.frame_job:
+            self.after_cancel(self.frame_job)
+            self.frame_job = None
         self.disconnect()
         self.destroy()
\ No newline at end of file